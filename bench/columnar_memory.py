@@ -0,0 +1,95 @@
+"""
+Пам'ять датасету: рядки csv.DictReader у списку vs словникове колонкове сховище (dataset_store),
+плюс top-k по кодах проти скану CSV.
+
+    python -m bench.columnar_memory --rows 200000 --cardinality 50
+    python -m bench.columnar_memory --csv /tmp/big.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+from src.app.dataset_service import get_top_values, set_default, set_uploaded_path
+from src.app.dataset_store import build_store
+
+from .gen_dataset import DatasetSpec, generate_csv
+
+
+def traced(fn: Callable[[], Any]) -> Tuple[Any, int, float]:
+    """(результат, байт утримано після виклику, секунд) - tracemalloc"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    kept = fn()
+    seconds = time.perf_counter() - t0
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, after - before, seconds
+
+
+def run(path: str) -> Dict[str, Any]:
+    def dictreader_rows() -> list:
+        with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+            return list(csv.DictReader(f))
+
+    rows, before_bytes, before_s = traced(dictreader_rows)
+    n = len(rows)
+    header = list(rows[0].keys()) if rows else []
+    del rows
+    store, after_bytes, after_s = traced(lambda: build_store(path))
+
+    out: Dict[str, Any] = {
+        "rows": n,
+        "dictreader_bytes_per_row": before_bytes / n if n else 0.0,
+        "store_bytes_per_row": after_bytes / n if n else 0.0,
+        "dictreader_load_s": before_s,
+        "store_build_s": after_s,
+        "encoding": {name: c["encoding"] for name, c in store.memory_report()["columns"].items()},
+    }
+    cat = next((c for c in header if c in store.dict_columns and c.startswith("cat")), None)
+    if cat:
+        set_uploaded_path(path)
+        try:
+            t0 = time.perf_counter()
+            csv_top = get_top_values(cat)
+            out["top_csv_s"] = time.perf_counter() - t0
+        finally:
+            set_default()
+        t0 = time.perf_counter()
+        codes_top = store.top_values(cat)
+        out["top_codes_s"] = time.perf_counter() - t0
+        out["top_same"] = csv_top == codes_top
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Columnar store memory benchmark")
+    ap.add_argument("--csv", default="", help="existing CSV (otherwise a synthetic one is generated)")
+    ap.add_argument("--rows", type=int, default=200000)
+    ap.add_argument("--cardinality", type=int, default=50)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.csv or generate_csv(
+            os.path.join(workdir, "columnar.csv"), DatasetSpec(rows=args.rows, cardinality=args.cardinality),
+        )
+        r = run(path)
+
+    print(f"rows {r['rows']:,}")
+    print(f"DictReader rows  {r['dictreader_bytes_per_row']:>10.1f} bytes/row   load {r['dictreader_load_s']:.2f} s")
+    print(f"columnar store   {r['store_bytes_per_row']:>10.1f} bytes/row   build {r['store_build_s']:.2f} s")
+    print(f"memory x{r['dictreader_bytes_per_row'] / max(r['store_bytes_per_row'], 1e-9):.1f} smaller")
+    for name, enc in r["encoding"].items():
+        print(f"  {name:20s} {enc}")
+    if "top_csv_s" in r:
+        print(f"top-k: CSV scan {r['top_csv_s'] * 1000:.1f} ms, codes {r['top_codes_s'] * 1000:.1f} ms, same={r['top_same']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Локальний fake eBay (OAuth + Browse API) для бенчмарків і перевірки лімітера.
+
+Запуск:
+    python -m bench.fake_ebay --port 9100 --latency 0.05 --rps 5
+
+Потім запуск застосунку проти нього:
+    EBAY_API_BASE=http://127.0.0.1:9100 EBAY_CLIENT_ID=x EBAY_CLIENT_SECRET=y \\
+        python -m uvicorn main:app --port 8080
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+CONDITIONS = ["New", "Used", "Open box", "For parts or not working"]
+COUNTRIES = ["US", "GB", "DE", "CN", "JP", "CA"]
+CATEGORIES = [("9355", "Cell Phones & Smartphones"), ("171485", "Tablets & eBook Readers"), ("175672", "Laptops")]
+
+
+@dataclass
+class FakeConfig:
+    latency: float = 0.0 # затримка кожної відповіді (с)
+    jitter: float = 0.0 # випадкова добавка до затримки (с)
+    total: int = 10000 # total у відповіді пошуку
+    pad_bytes: int = 0 # додатковий "баласт" у кожному item (імітація великих payload)
+    rps: float = 0.0 # ліміт запитів/с (0 - без ліміту); понад ліміт -> 429
+    retry_after: float = 1.0 # Retry-After у відповідях 429
+    error_rate: float = 0.0 # частка випадкових 503
+    token_ttl: int = 7200 # expires_in для OAuth токена
+
+
+@dataclass
+class FakeStats:
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    tokens: int = 0
+    by_path: Dict[str, int] = field(default_factory=dict)
+
+
+def make_item(i: int, pad_bytes: int = 0) -> Dict[str, Any]:
+    """Детермінований itemSummary у форматі Browse API"""
+    rnd = random.Random(i)
+    cat_id, cat_name = CATEGORIES[i % len(CATEGORIES)]
+    item: Dict[str, Any] = {
+        "itemId": f"v1|{110000000000 + i}|0",
+        "title": f"Fake item #{i} {rnd.choice(['iPhone', 'Galaxy', 'Pixel', 'iPad'])}",
+        "categories": [{"categoryId": cat_id, "categoryName": cat_name}],
+        "leafCategoryIds": [cat_id],
+        "condition": CONDITIONS[i % len(CONDITIONS)],
+        "price": {"value": f"{rnd.uniform(5, 900):.2f}", "currency": "USD"},
+        "shippingOptions": [{"shippingCost": {"value": f"{rnd.choice([0, 4.99, 9.99, 14.5]):.2f}", "currency": "USD"}}],
+        "seller": {"username": f"seller{i % 97}", "feedbackScore": rnd.randint(0, 50000)},
+        "itemWebUrl": f"https://www.ebay.com/itm/{110000000000 + i}",
+        "itemHref": f"https://api.ebay.com/buy/browse/v1/item/v1%7C{110000000000 + i}%7C0",
+        "itemLocation": {"country": COUNTRIES[i % len(COUNTRIES)]},
+        "buyingOptions": ["FIXED_PRICE"],
+    }
+    if pad_bytes:
+        item["shortDescription"] = "x" * pad_bytes
+    return item
+
+
+def make_details(item_id: str) -> Dict[str, Any]:
+    """Деталі товару у форматі getItem"""
+    return {
+        "itemId": item_id,
+        "shortDescription": f"Short description of {item_id}",
+        "description": f"<p>Description of {item_id}</p>",
+        "localizedAspects": [{"name": "Brand", "value": "Fake"}, {"name": "Model", "value": item_id[-6:]}],
+    }
+
+
+class FakeEbayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, config: FakeConfig) -> None:
+        super().__init__(addr, _Handler)
+        self.config = config
+        self.stats = FakeStats()
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def admit(self) -> Optional[int]:
+        """None - обслуговуємо; інакше HTTP-статус помилки (429/503)"""
+        cfg = self.config
+        with self._lock:
+            if cfg.rps > 0:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                if self._window_count > cfg.rps:
+                    self.stats.throttled += 1
+                    return 429
+            if cfg.error_rate > 0 and random.random() < cfg.error_rate:
+                self.stats.errors += 1
+                return 503
+        return None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeEbayServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: Any) -> None: # без логів у консоль
+        pass
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay(self) -> None:
+        cfg = self.server.config
+        d = cfg.latency + (random.uniform(0, cfg.jitter) if cfg.jitter else 0.0)
+        if d > 0:
+            time.sleep(d)
+
+    def _count(self, path: str) -> None:
+        st = self.server.stats
+        with self.server._lock:
+            st.requests += 1
+            st.by_path[path] = st.by_path.get(path, 0) + 1
+
+    def _reject_if_needed(self) -> bool:
+        status = self.server.admit()
+        if status is None:
+            return False
+        headers = {"Retry-After": str(self.server.config.retry_after)} if status == 429 else {}
+        self._send(status, {"errors": [{"message": "fake throttling" if status == 429 else "fake outage"}]}, headers)
+        return True
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        self._count(url.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if url.path != "/identity/v1/oauth2/token":
+            self._send(404, {"errors": [{"message": "not found"}]})
+            return
+        if self._reject_if_needed():
+            return
+        self._delay()
+        with self.server._lock:
+            self.server.stats.tokens += 1
+        self._send(200, {"access_token": f"fake-{time.time():.0f}", "expires_in": self.server.config.token_ttl})
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        qs = parse_qs(url.query)
+        self._count(url.path)
+
+        if url.path == "/_fake/stats":
+            st = self.server.stats
+            self._send(200, {"requests": st.requests, "throttled": st.throttled, "errors": st.errors,
+                             "tokens": st.tokens, "by_path": st.by_path})
+            return
+
+        if self._reject_if_needed():
+            return
+        self._delay()
+        cfg = self.server.config
+
+        if url.path == "/buy/browse/v1/item_summary/search":
+            limit = int((qs.get("limit") or ["20"])[0])
+            offset = int((qs.get("offset") or ["0"])[0])
+            n = max(0, min(limit, cfg.total - offset))
+            items = [make_item(offset + i, cfg.pad_bytes) for i in range(n)]
+            self._send(200, {
+                "href": self.path,
+                "total": cfg.total,
+                "limit": limit,
+                "offset": offset,
+                "next": None if offset + limit >= cfg.total else f"{url.path}?offset={offset + limit}&limit={limit}",
+                "itemSummaries": items,
+            })
+            return
+
+        if url.path in ("/buy/browse/v1/item/", "/buy/browse/v1/item") and qs.get("item_ids"):
+            ids = [i for i in qs["item_ids"][0].split(",") if i]
+            self._send(200, {"items": [make_details(i) for i in ids]})
+            return
+
+        if url.path.startswith("/buy/browse/v1/item/"):
+            item_id = unquote(url.path[len("/buy/browse/v1/item/"):])
+            self._send(200, make_details(item_id))
+            return
+
+        self._send(404, {"errors": [{"message": "not found"}]})
+
+
+def start_fake_ebay(config: Optional[FakeConfig] = None, host: str = "127.0.0.1", port: int = 0) -> FakeEbayServer:
+    """Запуск fake-сервера у фоновому потоці (port=0 - вільний порт)"""
+    server = FakeEbayServer((host, port), config or FakeConfig())
+    t = threading.Thread(target=server.serve_forever, name="fake-ebay", daemon=True)
+    t.start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Fake eBay Browse API server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--total", type=int, default=10000)
+    ap.add_argument("--pad-bytes", type=int, default=0)
+    ap.add_argument("--rps", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args(argv)
+
+    cfg = FakeConfig(
+        latency=args.latency, jitter=args.jitter, total=args.total, pad_bytes=args.pad_bytes,
+        rps=args.rps, retry_after=args.retry_after, error_rate=args.error_rate,
+    )
+    server = FakeEbayServer((args.host, args.port), cfg)
+    print(f"Fake eBay listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
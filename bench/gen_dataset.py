@@ -0,0 +1,109 @@
+"""
+Генератор синтетичного CSV для бенчмарків dataset_service:
+числові / категоріальні колонки, частка пропусків (NA, N/A, порожньо, -),
+числа з $ / % / комами і текстові поля в лапках з переносами рядків.
+
+    python -m bench.gen_dataset --rows 100000 --numeric 8 --categorical 6 --na 0.05 --out /tmp/bench.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from dataclasses import dataclass
+from typing import List
+
+NA_TOKENS = ["", "NA", "N/A", "null", "-"]
+WORDS = ["alpha", "beta", "gamma", "delta", "omega", "phone", "tablet", "laptop", "used", "new", "refurb"]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    rows: int = 10000
+    numeric: int = 6 # числових колонок
+    categorical: int = 4 # категоріальних колонок
+    text: int = 1 # вільний текст (лапки, коми, переноси рядків)
+    na_ratio: float = 0.05 # частка пропусків у кожній клітинці
+    multiline_ratio: float = 0.02 # частка текстових значень з \n
+    cardinality: int = 50 # кількість різних значень у категоріальній колонці
+    seed: int = 42
+
+    @property
+    def columns(self) -> List[str]:
+        return (
+            [f"num_{i}" for i in range(self.numeric)]
+            + [f"cat_{i}" for i in range(self.categorical)]
+            + [f"text_{i}" for i in range(self.text)]
+        )
+
+
+def _numeric(rnd: random.Random, col: int) -> str:
+    v = rnd.lognormvariate(3 + col % 3, 1.0)
+    kind = col % 4
+    if kind == 1:
+        return f"${v:,.2f}" # з $ і комами - як ціни у вивантаженнях
+    if kind == 2:
+        return f"{v % 100:.1f}%"
+    if kind == 3:
+        return str(int(v))
+    return f"{v:.4f}"
+
+
+def _text(rnd: random.Random, multiline_ratio: float) -> str:
+    words = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(3, 12)))
+    if rnd.random() < 0.3:
+        words = f'{words}, "quoted", {rnd.choice(WORDS)}'
+    if rnd.random() < multiline_ratio:
+        words = words.replace(" ", "\n", 2)
+    return words
+
+
+def generate_csv(path: str, spec: DatasetSpec = DatasetSpec()) -> str:
+    """Пише CSV за spec у path; однаковий seed -> однаковий файл"""
+    rnd = random.Random(spec.seed)
+    categories = [[f"{rnd.choice(WORDS)}_{c}_{k}" for k in range(spec.cardinality)] for c in range(spec.categorical)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(spec.columns)
+        for _ in range(spec.rows):
+            row: List[str] = []
+            for c in range(spec.numeric):
+                row.append(rnd.choice(NA_TOKENS) if rnd.random() < spec.na_ratio else _numeric(rnd, c))
+            for c in range(spec.categorical):
+                # перекіс частот (як у реальних даних): перші значення зустрічаються частіше
+                idx = min(int(rnd.paretovariate(1.2)) - 1, spec.cardinality - 1)
+                row.append(rnd.choice(NA_TOKENS) if rnd.random() < spec.na_ratio else categories[c][idx])
+            for _ in range(spec.text):
+                row.append("" if rnd.random() < spec.na_ratio else _text(rnd, spec.multiline_ratio))
+            w.writerow(row)
+    return path
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Synthetic CSV generator")
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--numeric", type=int, default=6)
+    ap.add_argument("--categorical", type=int, default=4)
+    ap.add_argument("--text", type=int, default=1)
+    ap.add_argument("--na", type=float, default=0.05, help="missing value ratio")
+    ap.add_argument("--multiline", type=float, default=0.02, help="ratio of text values with line breaks")
+    ap.add_argument("--cardinality", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default="bench_dataset.csv")
+    args = ap.parse_args()
+
+    spec = DatasetSpec(
+        rows=args.rows,
+        numeric=args.numeric,
+        categorical=args.categorical,
+        text=args.text,
+        na_ratio=args.na,
+        multiline_ratio=args.multiline,
+        cardinality=args.cardinality,
+        seed=args.seed,
+    )
+    print(generate_csv(args.out, spec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Навантажувальний тест усього застосунку: uvicorn main:app + локальний fake eBay.
+
+Віртуальні користувачі (потоки) відтворюють сценарії з UI:
+  - search:  /api/search -> /api/analytics -> /api/export (той самий запит)
+  - dataset: upload CSV -> summary -> colstats -> top -> гортання preview
+Concurrency зростає ступенями (--stages 1,2,4,8,16); на кожному ступені - throughput,
+p50/p95/p99 і частка помилок по кожному маршруту.
+
+    python -m bench.loadtest --stages 1,4,16 --duration 10 --latency 0.05
+    python -m bench.loadtest --url http://127.0.0.1:8080 --dataset-share 0   # вже запущений сервер
+
+Завантажений CSV лишається в uploads/ сервера: це один content-addressed blob (той самий вміст
+щоразу), його прибирає GC сховища за квотою/терміном - бенчмарк файли сервера не видаляє.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from .fake_ebay import FakeConfig, start_fake_ebay
+from .gen_dataset import DatasetSpec, generate_csv
+from .startup import ROOT, app_env, free_port
+
+QUERIES = ["iphone", "galaxy", "pixel", "ipad", "macbook", "thinkpad", "airpods", "switch"]
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list) # мс, тільки успішні
+    errors: int = 0
+    total: int = 0
+
+
+class Recorder:
+    """Потокобезпечний збір латентностей по маршрутах"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.routes: Dict[str, RouteStats] = defaultdict(RouteStats)
+
+    def call(self, session: requests.Session, route: str, method: str, url: str, **kwargs: Any) -> Optional[requests.Response]:
+        t0 = time.perf_counter()
+        try:
+            r = session.request(method, url, timeout=120, **kwargs)
+            ok = r.status_code < 400
+        except requests.RequestException:
+            r, ok = None, False
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            st = self.routes[route]
+            st.total += 1
+            if ok:
+                st.latencies.append(ms)
+            else:
+                st.errors += 1
+        return r if ok else None
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """Перцентиль q (0..1) відсортованого списку (найближчий ранг); порожній - 0.0"""
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))]
+
+
+def search_flow(base: str, session: requests.Session, rec: Recorder, rnd: random.Random) -> None:
+    params = {"q": rnd.choice(QUERIES), "limit": rnd.choice([20, 50, 100])}
+    if rec.call(session, "GET /api/search", "GET", f"{base}/api/search", params=params) is None:
+        return
+    if rec.call(session, "GET /api/analytics", "GET", f"{base}/api/analytics", params=params) is None:
+        return
+    if rnd.random() < 0.3: # експорт роблять не всі
+        rec.call(session, "GET /api/export", "GET", f"{base}/api/export", params=params)
+
+
+def dataset_flow(base: str, session: requests.Session, rec: Recorder, rnd: random.Random, csv_path: str, spec: DatasetSpec) -> None:
+    with open(csv_path, "rb") as f:
+        r = rec.call(session, "POST /api/dataset/upload", "POST", f"{base}/api/dataset/upload",
+                     files={"file": ("load.csv", f, "text/csv")})
+    if r is None:
+        return
+
+    if rec.call(session, "GET /api/dataset/summary", "GET", f"{base}/api/dataset/summary") is None:
+        return
+    num_col = f"num_{rnd.randrange(spec.numeric)}"
+    cat_col = f"cat_{rnd.randrange(spec.categorical)}"
+    rec.call(session, "GET /api/dataset/colstats", "GET", f"{base}/api/dataset/colstats", params={"name": num_col})
+    rec.call(session, "GET /api/dataset/top", "GET", f"{base}/api/dataset/top", params={"name": cat_col})
+    for page in range(rnd.randint(1, 5)): # гортання таблиці
+        rec.call(session, "GET /api/dataset/preview", "GET", f"{base}/api/dataset/preview",
+                 params={"offset": page * 50, "limit": 50})
+
+
+def run_stage(base: str, users: int, duration: float, dataset_share: float, think: float,
+              csv_path: str, spec: DatasetSpec) -> Dict[str, Any]:
+    rec = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def user(uid: int) -> None:
+        rnd = random.Random(uid)
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            if rnd.random() < dataset_share:
+                dataset_flow(base, session, rec, rnd, csv_path, spec)
+            else:
+                search_flow(base, session, rec, rnd)
+            if think:
+                time.sleep(rnd.uniform(0, think))
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    routes: Dict[str, Any] = {}
+    for route, st in sorted(rec.routes.items()):
+        lat = sorted(st.latencies)
+        routes[route] = {
+            "requests": st.total,
+            "rps": st.total / elapsed,
+            "error_rate": st.errors / st.total if st.total else 0.0,
+            "p50_ms": percentile(lat, 0.50),
+            "p95_ms": percentile(lat, 0.95),
+            "p99_ms": percentile(lat, 0.99),
+        }
+    total = sum(st.total for st in rec.routes.values())
+    errors = sum(st.errors for st in rec.routes.values())
+    return {
+        "users": users,
+        "elapsed_s": elapsed,
+        "rps": total / elapsed,
+        "error_rate": errors / total if total else 0.0,
+        "routes": routes,
+    }
+
+
+def start_app(fake_base: str) -> tuple[str, subprocess.Popen]:
+    """uvicorn main:app на вільному порту проти fake eBay; чекає /health, повертає (base url, процес)"""
+    port = free_port()
+    env = app_env()
+    env["EBAY_API_BASE"] = fake_base
+    env.setdefault("EBAY_RATE_LIMIT_RPS", "1000")
+    env.setdefault("EBAY_RATE_LIMIT_BURST", "1000")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < 30:
+        try:
+            if requests.get(f"{base}/health", timeout=1).status_code == 200:
+                return base, proc
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+
+def _print_stage(stage: Dict[str, Any]) -> None:
+    print(f"\n== users={stage['users']}  total {stage['rps']:.1f} req/s  errors {stage['error_rate']:.1%}")
+    print(f"{'route':30s} {'req':>6s} {'req/s':>7s} {'err':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    for route, r in stage["routes"].items():
+        print(f"{route:30s} {r['requests']:6d} {r['rps']:7.1f} {r['error_rate']:6.1%} "
+              f"{r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['p99_ms']:9.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Load test: realistic user flows under rising concurrency")
+    ap.add_argument("--stages", default="1,2,4,8,16", help="concurrent users per stage")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per stage")
+    ap.add_argument("--dataset-share", type=float, default=0.3, help="share of dataset flows (vs search)")
+    ap.add_argument("--think", type=float, default=0.0, help="max think time between flows, s")
+    ap.add_argument("--rows", type=int, default=5000, help="rows in uploaded CSV")
+    ap.add_argument("--latency", type=float, default=0.05, help="fake eBay latency, s")
+    ap.add_argument("--url", default="", help="already running app (fake eBay is not started)")
+    ap.add_argument("--json", default="", help="write results to this file")
+    args = ap.parse_args(argv)
+
+    spec = DatasetSpec(rows=args.rows)
+    server = None
+    proc = None
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = generate_csv(os.path.join(workdir, "load.csv"), spec)
+        try:
+            if args.url:
+                base = args.url.rstrip("/")
+            else:
+                server = start_fake_ebay(FakeConfig(latency=args.latency))
+                base, proc = start_app(server.base_url)
+
+            stages = []
+            for users in (int(s) for s in args.stages.split(",") if s.strip()):
+                stage = run_stage(base, users, args.duration, args.dataset_share, args.think, csv_path, spec)
+                _print_stage(stage)
+                stages.append(stage)
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+            if server is not None:
+                server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"latency": args.latency, "rows": args.rows, "stages": stages}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Мікробенчмарк нормалізатора itemSummaries:
+  dict (normalize_item_summary, _get по кожному полю) vs
+  скомпільований normalize_item_compact (ItemSummary, tuple).
+
+    python -m bench.normalize_bench --items 200 --rounds 200
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from src.app.transform import normalize_item_compact, normalize_item_summary
+
+from .fake_ebay import make_item
+
+
+def items_per_sec(fn: Callable[[Dict[str, Any]], Any], items: List[Dict[str, Any]], rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for it in items:
+            fn(it)
+    return len(items) * rounds / (time.perf_counter() - t0)
+
+
+def bytes_per_item(fn: Callable[[Dict[str, Any]], Any], items: List[Dict[str, Any]]) -> float:
+    """Скільки пам'яті тримає один нормалізований item (tracemalloc)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [fn(it) for it in items]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(items)
+
+
+def run(n_items: int = 200, rounds: int = 200) -> Dict[str, Dict[str, float]]:
+    items = [make_item(i) for i in range(n_items)]
+    out = {}
+    for name, fn in (("dict", normalize_item_summary), ("compact", normalize_item_compact)):
+        out[name] = {
+            "items_per_sec": items_per_sec(fn, items, rounds),
+            "bytes_per_item": bytes_per_item(fn, items),
+        }
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Normalizer microbenchmark")
+    ap.add_argument("--items", type=int, default=200)
+    ap.add_argument("--rounds", type=int, default=200)
+    args = ap.parse_args()
+
+    res = run(args.items, args.rounds)
+    for name, r in res.items():
+        print(f"{name:8s} {r['items_per_sec']:>12,.0f} items/s {r['bytes_per_item']:>8.0f} bytes/item")
+    speedup = res["compact"]["items_per_sec"] / res["dict"]["items_per_sec"]
+    print(f"speedup x{speedup:.2f}, memory x{res['dict']['bytes_per_item'] / res['compact']['bytes_per_item']:.2f} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Набір бенчмарків з записом у JSON і перевіркою регресій відносно baseline.
+
+Покриває:
+  - search: EbayClient -> fake Browse API (затримка і розмір payload налаштовуються) -> normalize
+  - normalize / analytics / excel (build_excel) на 200 товарах
+  - dataset_service: preview, summary, column, top, colstats на синтетичному CSV
+  - dataset_corr: кореляційна матриця числових колонок
+  - dataset_excel: build_filtered_excel, build_report_excel
+
+    python -m bench.run                       # прогін, results -> bench/results/latest.json
+    python -m bench.run --update-baseline     # зберегти як bench/baseline.json
+    python -m bench.run --only dataset --rows 100000 --tolerance 0.15
+
+Код виходу 1, якщо медіана хоча б одного кейсу гірша за baseline більш ніж на tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.app import dataset_service as ds
+from src.app.analytics import compute_analytics
+from src.app.config import Settings
+from src.app.dataset_corr import correlation_matrix
+from src.app.dataset_excel import build_filtered_excel, build_report_excel
+from src.app.ebay_client import EbayClient
+from src.app.excel_export import build_excel
+from src.app.export_formats import ITEM_HEADERS, item_rows, stream_csv
+from src.app.transform import normalize_search_response
+
+from .fake_ebay import FakeConfig, make_item, start_fake_ebay
+from .gen_dataset import DatasetSpec, generate_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT = os.path.join(ROOT, "bench", "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+NOISE_FLOOR_MS = 0.5 # різниця менше за це - шум, не регресія
+
+Case = Tuple[str, Callable[[], Any], int] # (назва, функція, кількість повторів)
+
+
+def measure(fn: Callable[[], Any], runs: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    times: List[float] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    times.sort()
+    return {
+        "median_ms": statistics.median(times),
+        "p95_ms": times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))],
+        "min_ms": times[0],
+        "runs": runs,
+    }
+
+
+def search_cases(latency: float, pad_bytes: int, runs: int) -> Tuple[List[Case], Callable[[], None]]:
+    server = start_fake_ebay(FakeConfig(latency=latency, pad_bytes=pad_bytes))
+    client = EbayClient(Settings(
+        ebay_env="sandbox",
+        client_id="bench",
+        client_secret="bench",
+        marketplace_id="EBAY_US",
+        api_base_override=server.base_url,
+        rate_limit_rps=1000.0,
+        rate_limit_burst=1000,
+        token_refresh_ahead=0,
+    ))
+
+    def search() -> None:
+        normalize_search_response(client.search(q="iphone", limit=200, offset=0))
+
+    payload = {"itemSummaries": [make_item(i, pad_bytes) for i in range(200)], "total": 200}
+    items = normalize_search_response(payload)["items"]
+    cases: List[Case] = [
+        ("search.fake_api_200", search, runs),
+        ("search.normalize_200", lambda: normalize_search_response(payload), runs * 5),
+        ("search.analytics_200", lambda: compute_analytics(items), runs * 5),
+        ("search.build_excel_200", lambda: build_excel(query="iphone", items=items, total=200, limit=200, offset=0), runs),
+        ("search.export_csv_200", lambda: b"".join(stream_csv(ITEM_HEADERS, item_rows(items))), runs * 5),
+    ]
+    return cases, server.shutdown
+
+
+def dataset_cases(spec: DatasetSpec, runs: int, workdir: str) -> List[Case]:
+    path = generate_csv(os.path.join(workdir, "bench_dataset.csv"), spec)
+    ds.set_uploaded_path(path)
+
+    num_col, cat_col = spec.columns[0], spec.columns[spec.numeric]
+    preview = ds.read_preview(offset=0, limit=500)
+    colstats = ds.get_column_stats(num_col)
+    labels, counts = ds.get_top_values(cat_col)
+    common = dict(
+        dataset_name="bench_dataset.csv",
+        mode_text=ds.get_mode_text(),
+        columns=preview["columns"],
+        rows=preview["rows"],
+        filter_col="",
+        filter_text="",
+    )
+    return [
+        ("dataset.preview", lambda: ds.read_preview(offset=spec.rows // 2, limit=100), runs),
+        ("dataset.summary", ds.compute_summary, runs),
+        ("dataset.column_values", lambda: ds.get_column_values(num_col), runs),
+        ("dataset.top_values", lambda: ds.get_top_values(cat_col), runs),
+        ("dataset.column_stats", lambda: ds.get_column_stats(num_col), runs),
+        ("dataset.corr", correlation_matrix, runs),
+        ("dataset.excel_filtered_500", lambda: build_filtered_excel(**common), runs),
+        ("dataset.excel_report_500", lambda: build_report_excel(
+            **common,
+            numeric_col=num_col,
+            colstats=colstats,
+            hist_labels=[f"b{i}" for i in range(10)],
+            hist_counts=list(range(10)),
+            cat_col=cat_col,
+            top_labels=labels,
+            top_counts=counts,
+        ), runs),
+    ]
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Список регресій: кейси, медіана яких гірша за baseline більш ніж на tolerance"""
+    out: List[str] = []
+    base_cases = baseline.get("cases") or {}
+    for name, r in results["cases"].items():
+        b = base_cases.get(name)
+        if not b:
+            continue
+        cur, prev = r["median_ms"], b["median_ms"]
+        if cur > prev * (1 + tolerance) and cur - prev > NOISE_FLOOR_MS:
+            out.append(f"{name}: {prev:.2f} ms -> {cur:.2f} ms (+{(cur / prev - 1) * 100:.0f}%)")
+    return out
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark suite")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--only", default="", help="run only cases whose name contains this substring")
+    ap.add_argument("--rows", type=int, default=20000, help="synthetic dataset rows")
+    ap.add_argument("--na", type=float, default=0.05)
+    ap.add_argument("--latency", type=float, default=0.0, help="fake eBay latency, s")
+    ap.add_argument("--pad-bytes", type=int, default=0, help="extra bytes per fake item")
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.20, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    # великі файли: dataset_corr бере кількість процесів із Settings (потрібні EBAY_* змінні)
+    os.environ.setdefault("EBAY_CLIENT_ID", "bench")
+    os.environ.setdefault("EBAY_CLIENT_SECRET", "bench")
+
+    spec = DatasetSpec(rows=args.rows, na_ratio=args.na)
+    results: Dict[str, Any] = {
+        "meta": {
+            "git": _git_rev(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": args.rows,
+            "latency": args.latency,
+            "pad_bytes": args.pad_bytes,
+        },
+        "cases": {},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cases, stop_server = search_cases(args.latency, args.pad_bytes, args.runs)
+        try:
+            cases += dataset_cases(spec, args.runs, workdir)
+            for name, fn, runs in cases:
+                if args.only and args.only not in name:
+                    continue
+                r = measure(fn, runs)
+                results["cases"][name] = r
+                print(f"{name:32s} median {r['median_ms']:9.2f} ms   p95 {r['p95_ms']:9.2f} ms   min {r['min_ms']:9.2f} ms")
+        finally:
+            stop_server()
+            ds.set_default()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results -> {args.out}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline -> {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline (run with --update-baseline to create one)")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"no regressions vs baseline {baseline.get('meta', {}).get('git', '')} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
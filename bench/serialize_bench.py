@@ -0,0 +1,75 @@
+"""
+Бенчмарк серіалізації відповідей гарячих ендпоінтів:
+  - stdlib: jsonable_encoder + json.dumps (як FastAPI за замовчуванням)
+  - fast:   jsonresp.dumps (orjson, якщо встановлено)
+  - hit:    готові байти з ENCODED_CACHE (кодування немає)
+
+    python -m bench.serialize_bench --rounds 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+
+from src.app.analytics import compute_analytics
+from src.app.jsonresp import ENCODED_CACHE, cached_json_response, dumps, orjson
+from src.app.transform import normalize_search_response, search_response_to_json
+
+from .fake_ebay import make_item
+
+
+def _payloads() -> Dict[str, Any]:
+    norm = normalize_search_response({"itemSummaries": [make_item(i) for i in range(200)], "total": 200})
+    cols = [f"col_{c}" for c in range(30)]
+    preview = {
+        "columns": cols,
+        "rows": [{c: f"value {r}-{i} lorem ipsum" if i % 3 else str(r * i * 1.5) for i, c in enumerate(cols)} for r in range(500)],
+        "offset": 0,
+        "limit": 500,
+    }
+    return {
+        "search (200 items)": search_response_to_json(norm),
+        "analytics (200 items)": {"meta": {"q": "iphone"}, "analytics": compute_analytics(norm["items"])},
+        "dataset/preview (500x30)": preview,
+    }
+
+
+def _time(fn: Callable[[], Any], rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) / rounds * 1000.0
+
+
+def run(rounds: int = 50) -> Dict[str, Dict[str, float]]:
+    out: Dict[str, Dict[str, float]] = {}
+    for name, payload in _payloads().items():
+        ENCODED_CACHE.clear()
+        cached_json_response(name, lambda: payload) # прогрів кешу
+        out[name] = {
+            "stdlib_ms": _time(lambda: json.dumps(jsonable_encoder(payload), ensure_ascii=False,
+                                                  allow_nan=False, separators=(",", ":")).encode("utf-8"), rounds),
+            "fast_ms": _time(lambda: dumps(payload), rounds),
+            "cache_hit_ms": _time(lambda: cached_json_response(name, lambda: payload), rounds),
+            "bytes": len(dumps(payload)),
+        }
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Response serialization benchmark")
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+
+    print(f"serializer: {'orjson' if orjson is not None else 'stdlib json (orjson not installed)'}")
+    print(f"{'endpoint':28s} {'stdlib ms':>10s} {'fast ms':>10s} {'hit ms':>10s} {'bytes':>10s}")
+    for name, r in run(args.rounds).items():
+        print(f"{name:28s} {r['stdlib_ms']:10.3f} {r['fast_ms']:10.3f} {r['cache_hit_ms']:10.4f} {r['bytes']:10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Бенчмарк холодного старту:
+  - import time `main` (окремий процес на кожен прогін, медіана)
+  - time-to-first-request: від запуску uvicorn до першої відповіді /health
+
+    python -m bench.startup --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import sys, time; t = time.perf_counter(); import main; "
+    "print(time.perf_counter() - t, 'openpyxl' in sys.modules)"
+)
+
+
+def app_env() -> Dict[str, str]:
+    """Оточення процесу застосунку: тестові ключі eBay (якщо не задані), PYTHONPATH - корінь репо"""
+    env = dict(os.environ)
+    env.setdefault("EBAY_CLIENT_ID", "bench")
+    env.setdefault("EBAY_CLIENT_SECRET", "bench")
+    env["PYTHONPATH"] = ROOT
+    return env
+
+
+def free_port() -> int:
+    """Вільний TCP-порт на 127.0.0.1"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(runs: int) -> Dict[str, Any]:
+    """Час `import main` у свіжому інтерпретаторі"""
+    times: List[float] = []
+    openpyxl_loaded = False
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=app_env(),
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        openpyxl_loaded = openpyxl_loaded or out[1] == "True"
+    return {
+        "import_main_s_median": statistics.median(times),
+        "import_main_s_min": min(times),
+        "openpyxl_loaded_at_import": openpyxl_loaded,
+    }
+
+
+def measure_first_request(runs: int, timeout: float = 30.0) -> Dict[str, Any]:
+    """Час від старту uvicorn до першої успішної відповіді /health"""
+    times: List[float] = []
+    for _ in range(runs):
+        port = free_port()
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT, env=app_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                if time.perf_counter() - t0 > timeout:
+                    raise RuntimeError("uvicorn did not answer /health in time")
+                try:
+                    r = requests.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                    if r.status_code == 200:
+                        times.append(time.perf_counter() - t0)
+                        break
+                except requests.RequestException:
+                    pass
+                time.sleep(0.01)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+    return {
+        "first_request_s_median": statistics.median(times),
+        "first_request_s_min": min(times),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Cold start benchmark")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="вивести результат як JSON")
+    args = ap.parse_args()
+
+    result = {**measure_import(args.runs), **measure_first_request(args.runs)}
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for k, v in result.items():
+        print(f"{k:28s} {v:.4f}" if isinstance(v, float) else f"{k:28s} {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Перевірка лімітера/повторів EbayClient проти fake eBay з тротлінгом.
+
+    python -m bench.throttle_check --callers 20 --fake-rps 4 --client-rps 8
+
+Очікування: усі виклики успішні (повтори поглинають 429), помилок 0.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app.config import Settings
+from src.app.ebay_client import EbayAPIError, EbayClient
+
+from .fake_ebay import FakeConfig, start_fake_ebay
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="EbayClient rate limiter / retry check")
+    ap.add_argument("--callers", type=int, default=20)
+    ap.add_argument("--fake-rps", type=float, default=4.0)
+    ap.add_argument("--client-rps", type=float, default=8.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=float, default=0.5)
+    args = ap.parse_args()
+
+    server = start_fake_ebay(FakeConfig(rps=args.fake_rps, retry_after=args.retry_after, error_rate=args.error_rate))
+    settings = Settings(
+        ebay_env="sandbox",
+        client_id="bench",
+        client_secret="bench",
+        marketplace_id="EBAY_US",
+        api_base_override=server.base_url,
+        rate_limit_rps=args.client_rps,
+        rate_limit_burst=max(1, int(args.client_rps)),
+        max_retries=8,
+        queue_timeout=120.0,
+    )
+    client = EbayClient(settings)
+
+    def call(i: int) -> str:
+        try:
+            client.search(q="iphone", limit=10, offset=i * 10)
+            return "ok"
+        except EbayAPIError as e:
+            return f"error: {e}"
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.callers) as pool:
+        results = list(pool.map(call, range(args.callers)))
+    elapsed = time.perf_counter() - t0
+
+    ok = sum(1 for r in results if r == "ok")
+    print(f"callers={args.callers} ok={ok} failed={args.callers - ok} elapsed={elapsed:.2f}s")
+    print("client:", client.stats())
+    print("fake server:", server.stats)
+    for r in results:
+        if r != "ok":
+            print(" ", r)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
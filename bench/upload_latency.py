@@ -0,0 +1,130 @@
+"""
+Латентність /api/search під час великого upload (перевірка, що upload не блокує event loop).
+
+Запускає fake eBay + uvicorn main:app, міряє /api/search у кількох потоках:
+  1) без навантаження (baseline)
+  2) поки інший клієнт потоково вантажить CSV на --size-mb МБ
+Якщо p99 під час upload більший за p99 baseline у --max-p99-ratio разів - upload блокує worker,
+скрипт завершується з кодом 1.
+
+    python -m bench.upload_latency --size-mb 150 --probes 4 --max-p99-ratio 3
+
+Завантажений файл після прогону прибирається зі сховища uploads/ (якщо це не повтор уже наявного).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List
+
+import requests
+
+from src.app.upload_store import UploadStore
+from src.app.uploads import UPLOAD_DIR
+
+from .fake_ebay import FakeConfig, start_fake_ebay
+from .loadtest import percentile, start_app
+from .startup import ROOT
+
+BOUNDARY = "benchuploadboundary"
+CHUNK = 256 * 1024
+
+
+def multipart_body(size_mb: int) -> Iterator[bytes]:
+    """Потоковий multipart з CSV потрібного розміру (без буферизації в пам'яті)"""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="upload_bench.csv"\r\n'
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode()
+    row = b"1,2.5,alpha,some text value\n"
+    chunk = b"a,b,c,d\n" + row * (CHUNK // len(row))
+    sent = 0
+    while sent < size_mb * 1024 * 1024:
+        yield chunk
+        sent += len(chunk)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def probe(base: str, stop: threading.Event, out: List[float]) -> None:
+    session = requests.Session()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        session.get(f"{base}/api/search", params={"q": "iphone", "limit": 20}, timeout=60)
+        out.append((time.perf_counter() - t0) * 1000.0)
+        time.sleep(0.01)
+
+
+def measure(base: str, probes: int, duration: float = 0.0, during: threading.Thread | None = None) -> Dict[str, float]:
+    stop = threading.Event()
+    lat: List[float] = []
+    threads = [threading.Thread(target=probe, args=(base, stop, lat), daemon=True) for _ in range(probes)]
+    for t in threads:
+        t.start()
+    if during is not None:
+        during.start()
+        during.join()
+    else:
+        time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    lat.sort()
+    return {"n": len(lat), "p50": statistics.median(lat), "p99": percentile(lat, 0.99), "max": lat[-1]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="/api/search latency during a large upload")
+    ap.add_argument("--size-mb", type=int, default=150)
+    ap.add_argument("--probes", type=int, default=4, help="concurrent /api/search callers")
+    ap.add_argument("--baseline-s", type=float, default=3.0)
+    ap.add_argument("--max-p99-ratio", type=float, default=3.0, help="fail if p99 during upload / idle p99 is above this")
+    args = ap.parse_args()
+
+    server = start_fake_ebay(FakeConfig())
+    base, proc = start_app(server.base_url)
+    result: Dict[str, object] = {}
+    try:
+        requests.get(f"{base}/api/search", params={"q": "iphone", "limit": 20}, timeout=30) # прогрів
+        idle = measure(base, args.probes, duration=args.baseline_s)
+
+        def upload() -> None:
+            t0 = time.perf_counter()
+            r = requests.post(
+                f"{base}/api/dataset/upload",
+                data=multipart_body(args.size_mb),
+                headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+                timeout=600,
+            )
+            result["status"] = r.status_code
+            result["seconds"] = time.perf_counter() - t0
+            if r.status_code == 200:
+                body = r.json()
+                result["sha256"], result["reused"] = body["sha256"], body["reused"]
+
+        busy = measure(base, args.probes, during=threading.Thread(target=upload))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        server.shutdown()
+        if "sha256" in result and not result["reused"]: # blob цього прогону (сотні МБ) - не чекати GC
+            UploadStore(os.path.join(ROOT, UPLOAD_DIR)).discard(str(result["sha256"]))
+
+    print(f"upload: {args.size_mb} MB, HTTP {result.get('status')}, {result.get('seconds', 0):.1f} s")
+    print(f"{'':14s} {'n':>6s} {'p50 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for name, r in (("idle", idle), ("during upload", busy)):
+        print(f"{name:14s} {r['n']:6d} {r['p50']:9.1f} {r['p99']:9.1f} {r['max']:9.1f}")
+
+    ratio = busy["p99"] / idle["p99"]
+    ok = result.get("status") == 200 and ratio <= args.max_p99_ratio
+    print(f"p99 during upload / idle: {ratio:.2f} (max {args.max_p99_ratio:g}) - {'OK' if ok else 'FAIL'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 
+from src.app.admission import AdmissionMiddleware
 from src.app.api import router as api_router
+from src.app.compression import CompressionMiddleware
+from src.app.profiler import ProfileMiddleware
+from src.app.server_timing import ServerTimingMiddleware
 from src.app.web import router as web_router
 from src.app.config import get_settings
+from src.app import metrics
 import src.app.api as api_mod
 
 app = FastAPI(title="eBay Live Search", version="1.0.0")
 
+app.add_middleware(ProfileMiddleware) # ?profile=1 + X-Admin-Token
+app.add_middleware(ServerTimingMiddleware) # Server-Timing з етапами для /api/*
+app.add_middleware(CompressionMiddleware, minimum_size=1024) # gzip/br для відповідей від 1 КБ
+app.add_middleware(AdmissionMiddleware) # ліміти одночасних запитів heavy/upstream/light, інакше 503
+app.add_middleware(metrics.MetricsMiddleware) # латентність по маршрутах для /metrics
+
 app.mount("/static", StaticFiles(directory="static"), name="static")  # /static/* - папка static
 
 app.include_router(web_router) # web-роутер (/, /ui/...)
@@ -27,6 +39,11 @@ def health():
     }
 
 
+@app.get("/metrics", include_in_schema=False) # Prometheus scrape
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/debug/routes") # дебаг: показати всі шляхи, які реально існують в app.routes
 def debug_routes():
     return sorted({r.path for r in app.routes}) # унікальні paths, відсортовані
\ No newline at end of file
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from . import metrics
+from .jsonresp import FastJSONResponse
+
+# класи маршрутів: heavy - скани датасету й експорти (CPU/диск), upstream - виклики eBay, light - решта
+HEAVY_PREFIXES = ("/api/dataset/", "/api/export")
+UPSTREAM_PREFIXES = ("/api/search", "/api/analytics", "/api/item/", "/api/items")
+LIGHT_PREFIXES = ("/api/export/jobs/",) # стан/завантаження готового фонового експорту - дешево
+
+# за замовчуванням heavy + upstream < 40 потоків threadpool Starlette - light завжди має вільний потік
+DEFAULT_LIMITS = {"heavy": 4, "upstream": 16, "light": 64}
+DEFAULT_QUEUE_FACTOR = 2.0
+DEFAULT_TIMEOUT = 5.0
+
+
+def route_class(path: str) -> str:
+    """heavy | upstream | light за шляхом запиту (до routing, тому за префіксом, а не шаблоном маршруту)"""
+    if path.startswith(LIGHT_PREFIXES):
+        return "light"
+    if path.startswith(HEAVY_PREFIXES):
+        return "heavy"
+    if path.startswith(UPSTREAM_PREFIXES):
+        return "upstream"
+    return "light"
+
+
+class Shed(Exception):
+    """Запит не допущено: reason - queue_full (черга заповнена) або timeout (не дочекався слота)"""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Gate:
+    """
+    Обмеження одночасних запитів класу: limit виконуються, до queue_max чекають (FIFO) не довше timeout.
+    Лише в event loop (без lock-ів): слот передається першому в черзі напряму при release.
+    """
+
+    def __init__(self, limit: int, queue_max: int, timeout: float) -> None:
+        self.limit = limit
+        self.queue_max = queue_max
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.limit <= 0: # 0 - без обмеження
+            self.active += 1
+            return
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_max:
+            raise Shed("queue_full")
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except asyncio.TimeoutError:
+            if fut.done(): # слот передали саме в момент timeout - беремо його
+                return
+            fut.cancel()
+            raise Shed("timeout")
+        except BaseException: # клієнт відключився / скасування задачі
+            if fut.done() and not fut.cancelled():
+                self.release() # слот уже наш - повертаємо наступному
+            else:
+                fut.cancel()
+            raise
+        finally:
+            if not fut.done() or fut.cancelled():
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+
+    def release(self) -> None:
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None) # active не змінюється - слот переходить до fut
+                return
+        self.active -= 1
+
+
+_GATES: Dict[str, Gate] = {}
+
+
+def _settings_limits() -> Tuple[Dict[str, int], float, float]:
+    from .config import get_settings
+    try:
+        s = get_settings()
+    except RuntimeError: # немає ключів eBay - сторінки й датасет працюють, ліміти - за замовчуванням
+        return dict(DEFAULT_LIMITS), DEFAULT_QUEUE_FACTOR, DEFAULT_TIMEOUT
+    limits = {"heavy": s.admit_heavy, "upstream": s.admit_upstream, "light": s.admit_light}
+    return limits, s.admit_queue_factor, s.admit_timeout
+
+
+def get_gate(cls: str) -> Gate:
+    gate = _GATES.get(cls)
+    if gate is None:
+        limits, factor, timeout = _settings_limits()
+        limit = limits[cls]
+        gate = _GATES[cls] = Gate(limit, max(0, math.ceil(limit * factor)), timeout)
+    return gate
+
+
+def _collect(field: str):
+    def collect() -> Dict[Tuple[str, ...], float]:
+        return {(cls,): float(getattr(g, field)) for cls, g in _GATES.items()}
+    return collect
+
+
+ADMISSION_SHED = metrics.counter(
+    "admission_shed_total", "Requests rejected with 503 by admission control", ("class", "reason"),
+)
+ADMISSION_WAIT = metrics.histogram(
+    "admission_wait_seconds", "Time a request waited for an admission slot", ("class",),
+)
+metrics.gauge("admission_in_flight", "Requests currently admitted, by route class", ("class",), collect=_collect("active"))
+metrics.gauge("admission_queue_depth", "Requests waiting for admission, by route class", ("class",), collect=_collect("waiting"))
+metrics.gauge("admission_limit", "Concurrent requests allowed, by route class (0 - unlimited)", ("class",), collect=_collect("limit"))
+
+
+class AdmissionMiddleware:
+    """
+    Admission control: кожен HTTP-запит займає слот свого класу (route_class) до кінця відповіді
+    (у т.ч. потокової). Не дочекався слота за APP_ADMIT_TIMEOUT або черга повна - одразу 503 + Retry-After,
+    щоб важкі скани й експорти не забирали весь threadpool у /api/search і /health.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cls = route_class(scope.get("path", ""))
+        gate = get_gate(cls)
+        t0 = time.perf_counter()
+        try:
+            await gate.acquire()
+        except Shed as e:
+            ADMISSION_SHED.inc(**{"class": cls, "reason": e.reason})
+            await self._reject(cls, gate, e.reason, scope, receive, send)
+            return
+        ADMISSION_WAIT.observe(time.perf_counter() - t0, **{"class": cls})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    @staticmethod
+    async def _reject(cls: str, gate: Gate, reason: str, scope: Scope, receive: Receive, send: Send) -> None:
+        retry_after = max(1, math.ceil(gate.timeout))
+        response = FastJSONResponse(
+            {"detail": f"Server is busy ({cls} requests: {reason}), retry later", "class": cls, "reason": reason},
+            status_code=503,
+            headers={"Retry-After": str(retry_after)},
+        )
+        await response(scope, receive, send)
+
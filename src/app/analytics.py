@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from collections import Counter
 from statistics import mean, median, pstdev
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import timed
+from .transform import ItemSummary
 
 
 def _to_float(x: Any) -> Optional[float]:
@@ -104,10 +107,11 @@ def _histogram(values: List[float], bins: int = 10) -> Dict[str, Any]:
     return {"bins": out}
 
 
-def compute_analytics(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+@timed("analytics")
+def compute_analytics(items: Sequence[ItemSummary]) -> Dict[str, Any]:
     """
     Головна функція аналітики по товарах.
-    Очікує нормалізовані дані з /api/search.
+    Очікує нормалізовані записи ItemSummary (normalize_search_response).
     """
 
     prices: List[float] = []
@@ -124,12 +128,12 @@ def compute_analytics(items: List[Dict[str, Any]]) -> Dict[str, Any]:
 
     for it in items or []:
         # безпечне перетворення
-        pv = _to_float(it.get("price_value"))
-        sv = _to_float(it.get("shipping_value"))
-        sf = _to_float(it.get("seller_feedback"))
+        pv = _to_float(it.price_value)
+        sv = _to_float(it.shipping_value)
+        sf = _to_float(it.seller_feedback)
 
         # визначення валюти
-        cur = (it.get("price_currency") or it.get("shipping_currency") or "").strip()
+        cur = (it.price_currency or it.shipping_currency or "").strip()
         if cur:
             currencies[cur] += 1
 
@@ -158,13 +162,13 @@ def compute_analytics(items: List[Dict[str, Any]]) -> Dict[str, Any]:
             seller_scores.append(sf)
 
         # групування
-        cond = (it.get("condition") or "—").strip()
+        cond = (it.condition or "—").strip()
         by_condition[cond] += 1
 
-        ctry = (it.get("location_country") or "—").strip()
+        ctry = (it.location_country or "—").strip()
         by_country[ctry] += 1
 
-        cat = (it.get("category") or "—").strip()
+        cat = (it.category or "—").strip()
         by_category[cat] += 1
 
     # функція для топ-N
@@ -1,35 +1,61 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Tuple
 from urllib.parse import quote
-import os
 
-from fastapi import APIRouter, Query, HTTPException, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
+from .cache import TTLCache
 from .config import get_settings
 from .ebay_client import EbayClient
-from .transform import normalize_search_response, normalize_item_details
+from .filters import SearchFilters
+from .http_cache import make_etag
+from .jsonresp import FastJSONResponse, cached_json_response, dumps
+from .transform import normalize_search_response, parse_fields, search_response_to_json
+from .item_details import ITEM_DETAIL_FIELDS, MAX_BATCH_IDS, fetch_item_details, get_item_details
 
 from .analytics import compute_analytics
-from .excel_export import build_excel
+from .snapshots import STORE as SNAPSHOTS, snapshot_key
+from .uploads import UPLOADS, receive_upload
+from .dataset_groupby import group_by
+from .dataset_corr import correlation_matrix
+from .dataset_store import current_store, start_store, store_report, top_values
+from .dataset_sample import approx_column_stats, approx_column_values, approx_top_values, get_sample, start_sample
+from .dataset_formats import check_supported
+from .export_formats import MEDIA_TYPES, check_export_format
+from .export_jobs import RETRY_AFTER_SECONDS, QueueFull, build_export, dataset_state, get_jobs
+from .dataset_columns import COLUMN_MEDIA_TYPE, parse_numeric, read_column_raw
 
 from .dataset_service import (
     compute_summary,
     read_preview,
     get_column_values,
-    get_top_values,
     get_column_stats,
     set_uploaded_path,
     get_mode_text,
+    get_dataset_version,
+    get_current_path,
+    export_columns,
+    STATE as DATASET_STATE,
 )
-from .dataset_excel import build_filtered_excel, build_report_excel
 
-router = APIRouter(prefix="/api", tags=["api"])
+# excel_export / dataset_excel (openpyxl) імпортуються ліниво в export_jobs.build_export,
+# щоб не платити за openpyxl на старті кожного worker
+
+router = APIRouter(prefix="/api", tags=["api"], default_response_class=FastJSONResponse)
 
 _client: EbayClient | None = None
 
+EXPORT_FORMAT_PATTERN = "^(xlsx|csv|parquet)$"
+
+SEARCH_CACHE_TTL = 60 # результати пошуку живуть у кеші 60 с
+SEARCH_CACHE = TTLCache(maxsize=256, ttl=SEARCH_CACHE_TTL, name="search")
+
 def _client_instance() -> EbayClient:
     """Повертає існуючий клієнт або створює новий"""
     global _client
@@ -38,135 +64,440 @@ def _client_instance() -> EbayClient:
     return _client
 
 
+def search_filters(
+    price_min: float | None = Query(None, ge=0), # мінімальна ціна
+    price_max: float | None = Query(None, ge=0), # максимальна ціна
+    currency: str | None = Query(None), # валюта ціни (USD, EUR...)
+    condition: str | None = Query(None), # NEW,USED,UNSPECIFIED (через кому)
+    item_location_country: str | None = Query(None), # US, GB, DE...
+    buying_options: str | None = Query(None), # FIXED_PRICE,AUCTION,BEST_OFFER (через кому)
+    category_ids: str | None = Query(None), # ID категорій eBay (через кому)
+) -> SearchFilters:
+    """Dependency: query-параметри фільтрів -> SearchFilters (400, якщо невалідні)"""
+    try:
+        return SearchFilters.parse(
+            price_min=price_min,
+            price_max=price_max,
+            currency=currency,
+            condition=condition,
+            item_location_country=item_location_country,
+            buying_options=buying_options,
+            category_ids=category_ids,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _search_key(
+    q: str,
+    limit: int,
+    page: int,
+    sort: str | None,
+    filters: SearchFilters,
+    fields: Tuple[str, ...] | None = None,
+) -> tuple:
+    """Ключ кешу пошуку: параметри + скомпільовані фільтри + проєкція"""
+    return (q, limit, (page - 1) * limit, sort or "") + filters.cache_key() + (fields or (),)
+
+
+def _search_normalized(
+    q: str,
+    limit: int,
+    page: int,
+    sort: str | None,
+    filters: SearchFilters,
+    fresh: bool = False,
+    fields: Tuple[str, ...] | None = None,
+) -> Dict[str, Any]:
+    """
+    Пошук + нормалізація з кешем.
+    Фільтри виконує eBay (filter= / category_ids) і вони входять у ключ кешу.
+    fresh=True - завжди йти в eBay (результат все одно кладеться в кеш).
+    fields - проєкція: нормалізуються лише ці поля, items як dict (теж частина ключа).
+    """
+    offset = (page - 1) * limit  # розрахунок offset
+    key = _search_key(q, limit, page, sort, filters, fields)
+
+    if not fresh:
+        cached = SEARCH_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    payload = _client_instance().search(
+        q=q,
+        limit=limit,
+        offset=offset,
+        sort=(sort or None),
+        category_ids=filters.category_param(),
+        filter_expr=filters.filter_expr(),
+    )
+    norm = normalize_search_response(payload, fields=fields)
+    SEARCH_CACHE.set(key, norm)
+    return norm
+
+
+def _parse_fields_or_400(raw: str | None) -> Tuple[str, ...] | None:
+    """fields= -> кортеж полів (400, якщо є невідомі)"""
+    try:
+        return parse_fields(raw)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # SEARCH API
 @router.get("/search")
 def api_search(
+    request: Request,
     q: str = Query(..., min_length=1), # пошуковий запит
     limit: int = Query(20, ge=1, le=200), # кількість результатів
     page: int = Query(1, ge=1), # сторінка
     sort: str | None = Query(None), # сортування
+    filters: SearchFilters = Depends(search_filters), # фільтри eBay
+    fields: str | None = Query(None), # проєкція: title,price_value,... (усі поля, якщо не задано)
 ):
-    offset = (page - 1) * limit  # розрахунок offset
-    payload = _client_instance().search(q=q, limit=limit, offset=offset, sort=(sort or None))
-    return normalize_search_response(payload)  # нормалізована відповідь
+    proj = _parse_fields_or_400(fields)
+    # на hit готові JSON-байти віддаються без нормалізації та кодування
+    return cached_json_response(
+        ("search",) + _search_key(q, limit, page, sort, filters, proj),
+        lambda: search_response_to_json(_search_normalized(q, limit, page, sort, filters, fields=proj)),
+        ttl=SEARCH_CACHE_TTL,
+        request=request, # ETag з вмісту: повтор у межах TTL -> 304
+    )
+
+
+@router.get("/search/diff")
+def api_search_diff(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=200),
+    page: int = Query(1, ge=1),
+    sort: str | None = Query(None),
+    filters: SearchFilters = Depends(search_filters),
+):
+    """Дельта відносно попереднього знімка цього ж запиту: added / removed / price_changed"""
+    norm = _search_normalized(q, limit, page, sort, filters, fresh=True) # дельта завжди по свіжих даних
+
+    key = snapshot_key(q=q, limit=limit, offset=norm.get("offset"), sort=sort or "", filters=filters.cache_key())
+    delta = SNAPSHOTS.diff_and_store(key, norm.get("items") or [])
+
+    delta["added"] = [it.to_dict() for it in delta["added"]]
+    delta["changed"] = [it.to_dict() for it in delta["changed"]]
+    return {"q": q, "total": norm.get("total"), "offset": norm.get("offset"), **delta}
 
 
 @router.get("/analytics")
 def api_analytics(
+    request: Request,
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=200),
     page: int = Query(1, ge=1),
     sort: str | None = Query(None),
+    filters: SearchFilters = Depends(search_filters),
 ):
-    offset = (page - 1) * limit
-    payload = _client_instance().search(q=q, limit=limit, offset=offset, sort=(sort or None))
-    norm = normalize_search_response(payload)
+    def build() -> Dict[str, Any]:
+        norm = _search_normalized(q, limit, page, sort, filters)
+        return {
+            "meta": { # метадані запиту
+                "q": q,
+                "limit": norm.get("limit"),
+                "offset": norm.get("offset"),
+                "total": norm.get("total"),
+                "sort": sort or "",
+                "filter": filters.filter_expr() or "",
+                "category_ids": filters.category_param() or "",
+            },
+            "analytics": compute_analytics(norm.get("items") or []), # обчислення статистики
+        }
+
+    return cached_json_response(
+        ("analytics",) + _search_key(q, limit, page, sort, filters), build,
+        ttl=SEARCH_CACHE_TTL, request=request,
+    )
+
+
+def _download(body: Iterable[bytes], filename: str, fmt: str) -> StreamingResponse:
+    """Файл експорту як attachment (body - ітератор шматків: csv/parquet пишуться потоково)"""
+    headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
 
+def _check_format(fmt: str) -> None:
+    try:
+        check_export_format(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _job_view(state: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = state["id"]
     return {
-        "meta": { # метадані запиту
-            "q": q,
-            "limit": norm.get("limit"),
-            "offset": norm.get("offset"),
-            "total": norm.get("total"),
-            "sort": sort or "",
-        },
-        "analytics": compute_analytics(norm.get("items") or []), # обчислення статистики
+        **state,
+        "status_url": f"/api/export/jobs/{job_id}",
+        "download_url": f"/api/export/jobs/{job_id}/download",
     }
 
 
+def _export(kind: str, fmt: str, params: Dict[str, Any], filename: str, job: bool, rows_total: int | None = None):
+    """
+    Синхронно - файл у відповіді; job=true - 202 + id фонової задачі (пул процесів),
+    прогрес: /api/export/jobs/{id}, файл: /api/export/jobs/{id}/download
+    """
+    if not job:
+        return _download(build_export(kind, fmt, params), filename, fmt)
+    try:
+        state = get_jobs().submit(kind, fmt, params, filename, rows_total=rows_total)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+    return FastJSONResponse(_job_view(state), status_code=202)
+
+
 @router.get("/export")
 def api_export_excel(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=200),
     page: int = Query(1, ge=1),
     sort: str | None = Query(None),
+    filters: SearchFilters = Depends(search_filters),
+    format: str = Query("xlsx", pattern=EXPORT_FORMAT_PATTERN), # xlsx | csv | parquet
+    job: bool = Query(False), # true - фонова задача замість файлу у відповіді
 ):
-    offset = (page - 1) * limit
-    payload = _client_instance().search(q=q, limit=limit, offset=offset, sort=(sort or None))
-    norm = normalize_search_response(payload)
-
-    content = build_excel(
-        query=q,
-        items=norm.get("items") or [],
-        total=norm.get("total"),
-        limit=norm.get("limit"),
-        offset=norm.get("offset"),
-        sort=sort,
-    )
+    _check_format(format)
+    norm = _search_normalized(q, limit, page, sort, filters)
+    items = norm.get("items") or []
 
     safe_q = "_".join([p for p in q.strip().split() if p])[:40] or "query"
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"ebay_{safe_q}_{ts}.xlsx"
-
-    headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
-
-    return StreamingResponse(
-        iter([content]),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
-    )
+    filename = f"ebay_{safe_q}_{ts}.{format}"
+
+    params = {
+        "query": q,
+        "items": items,
+        "total": norm.get("total"),
+        "limit": norm.get("limit"),
+        "offset": norm.get("offset"),
+        "sort": sort,
+        "filters": " ".join(p for p in (filters.filter_expr(), filters.category_param()) if p),
+    }
+    return _export("search", format, params, filename, job, rows_total=len(items))
 
 
 @router.get("/item/{item_id:path}")
 def api_item_details(item_id: str):
     """Отримання детальної інформації про товар"""
     try:
-        payload = _client_instance().get_item(item_id=item_id)
-        return normalize_item_details(payload)
+        return get_item_details(_client_instance(), item_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+class ItemsBatchPayload(BaseModel):
+    """Модель для batch-запиту деталей товарів"""
+    item_ids: list[str]
+    fields: list[str] | None = None # проєкція: itemId, shortDescription, description, aspects
+
+
+@router.post("/items")
+def api_items_batch(payload: ItemsBatchPayload):
+    """Деталі багатьох товарів за один виклик (кеш + getItems пачками + паралельність)"""
+    if len(payload.item_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many item ids (max {MAX_BATCH_IDS})")
+    if payload.fields is not None:
+        unknown = sorted(set(payload.fields) - set(ITEM_DETAIL_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    try:
+        res = fetch_item_details(_client_instance(), payload.item_ids)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if payload.fields is not None:
+        keep = set(payload.fields) | {"itemId"} # itemId завжди, щоб зіставити з таблицею
+        res["items"] = [{k: v for k, v in d.items() if k in keep} for d in res["items"]]
+    return res
+
+
+@router.get("/upstream/stats")
+def api_upstream_stats():
+    """Стан клієнта eBay: виклики, повтори, черга і швидкість лімітера"""
+    return _client_instance().stats()
+
+
 # DATASET API
+DATASET_JSON_TTL = 10 * 60 # готові JSON dataset-відповідей (ключ включає версію датасету)
+
+def _dataset_json(request: Request, kind: str, build: Callable[[], Any], media_type: str = "application/json", **params: Any):
+    """
+    JSON dataset-ендпоінта з кешем і ETag з версії датасету + параметрів:
+    збіг If-None-Match -> 304 без жодного скану файлу.
+    Для upload готові байти ще й зберігаються на диску поруч із файлом (UPLOADS),
+    тож повторний upload того самого CSV або рестарт не перераховують нічого.
+    build() може повернути готові bytes іншого формату - тоді передається media_type.
+    """
+    key = (kind, get_dataset_version()) + tuple(sorted(params.items()))
+    etag = make_etag(*key)
+    sha = DATASET_STATE.sha256 if DATASET_STATE.mode == "upload" else ""
+    if not sha:
+        return cached_json_response(key, build, ttl=DATASET_JSON_TTL, request=request, etag=etag, media_type=media_type)
+    UPLOADS.touch(sha) # LRU квоти: датасет використовується (і з кешу в пам'яті теж)
+
+    artifact = kind + "-" + etag.strip('"')
+
+    def build_persisted() -> bytes:
+        body = UPLOADS.load_artifact(sha, artifact)
+        if body is None:
+            body = dumps(build())
+            UPLOADS.save_artifact(sha, artifact, body)
+        return body
+
+    return cached_json_response(
+        key, build_persisted, ttl=DATASET_JSON_TTL, request=request, etag=etag, media_type=media_type,
+    )
+
 @router.get("/dataset/summary")
-def dataset_summary():
+def dataset_summary(request: Request):
     """Повертає загальну інформацію про датасет"""
-    return compute_summary()
+    # ім'я файлу входить у ключ: той самий вміст під іншою назвою -> свій summary
+    return _dataset_json(request, "summary", compute_summary, name=DATASET_STATE.display_name)
 
 @router.get("/dataset/preview")
 def dataset_preview(
+    request: Request,
     offset: int = Query(0, ge=0), # зміщення
     limit: int = Query(50, ge=1, le=500), # кількість рядків
 ):
-    return read_preview(offset=offset, limit=limit)
+    return _dataset_json(
+        request, "preview", lambda: read_preview(offset=offset, limit=limit),
+        offset=offset, limit=limit,
+    )
 
 @router.get("/dataset/column")
 def dataset_column(
+    request: Request,
     name: str = Query(..., min_length=1), # назва колонки
     limit: int = Query(5000, ge=100, le=20000),
+    approx: bool = Query(False), # значення з рівномірної вибірки + гістограма з інтервалами
+    format: str = Query("json", pattern="^(json|f64|f32)$"), # f64/f32 - бінарна колонка (DCOL) замість JSON-рядків
 ):
-    return {"name": name, "values": get_column_values(name=name, limit=limit)}
+    if format != "json":
+        def build_binary() -> bytes:
+            if approx:
+                raw = get_sample().column(name)[:limit]
+            else:
+                raw = read_column_raw(name=name, limit=limit)
+            return parse_numeric(raw).encode(format)
+
+        return _dataset_json(
+            request, "column_bin", build_binary, media_type=COLUMN_MEDIA_TYPE,
+            name=name, limit=limit, approx=approx, format=format,
+        )
+    if approx:
+        return _dataset_json(
+            request, "column_approx", lambda: approx_column_values(name=name, limit=limit), name=name, limit=limit,
+        )
+    return _dataset_json(
+        request, "column", lambda: {"name": name, "values": get_column_values(name=name, limit=limit)},
+        name=name, limit=limit,
+    )
 
 @router.get("/dataset/top")
 def dataset_top(
+    request: Request,
     name: str = Query(..., min_length=1),
     limit: int = Query(10, ge=3, le=30),
+    approx: bool = Query(False), # оцінка з вибірки з 95% інтервалами
 ):
-    labels, counts = get_top_values(name=name, limit=limit)
-    return {"name": name, "labels": labels, "counts": counts}
+    if approx:
+        return _dataset_json(request, "top_approx", lambda: approx_top_values(name=name, limit=limit), name=name, limit=limit)
+
+    def build() -> Dict[str, Any]:
+        labels, counts = top_values(name=name, limit=limit) # по словникових кодах, якщо сховище готове
+        return {"name": name, "labels": labels, "counts": counts}
+
+    return _dataset_json(request, "top", build, name=name, limit=limit)
 
 @router.get("/dataset/colstats")
 def dataset_colstats(
+    request: Request,
     name: str = Query(..., min_length=1),
+    approx: bool = Query(False), # stats з вибірки по всьому файлу з 95% інтервалами
 ):
-    return get_column_stats(name=name)
-
-@router.post("/dataset/upload")
-async def dataset_upload(file: UploadFile = File(...)):
-    """Завантаження CSV користувача"""
-    os.makedirs("uploads", exist_ok=True)
-
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_name = (file.filename or "dataset.csv").replace("/", "_").replace("\\", "_")
-    path = os.path.join("uploads", f"{ts}_{safe_name}")
+    if approx:
+        return _dataset_json(request, "colstats_approx", lambda: approx_column_stats(name=name), name=name)
+    return _dataset_json(request, "colstats", lambda: get_column_stats(name=name), name=name)
+
+@router.get("/dataset/groupby")
+def dataset_groupby(
+    request: Request,
+    value: str = Query(..., min_length=1), # числова колонка
+    by: str = Query(..., min_length=1), # 1-2 категоріальні колонки через кому
+    limit: int = Query(100, ge=1, le=1000), # скільки груп повернути
+    sort: str = Query("count"), # count | sum | mean | key
+):
+    """Агрегація value по групах by (count, sum, mean, min, max, median) за один прохід"""
+    by_cols = [c.strip() for c in by.split(",") if c.strip()]
+
+    def build() -> Dict[str, Any]:
+        try:
+            return group_by(value=value, by=by_cols, limit=limit, sort=sort)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return _dataset_json(request, "groupby", build, value=value, by=tuple(by_cols), limit=limit, sort=sort)
+
+@router.get("/dataset/store")
+def dataset_store(request: Request):
+    """Колонкове сховище активного датасету: кодування колонок і байт на рядок до/після"""
+    return _dataset_json(request, "store", store_report)
+
+@router.get("/dataset/corr")
+def dataset_corr(request: Request):
+    """Кореляційна/коваріаційна матриця і профіль усіх числових колонок (кеш на версію датасету)"""
+    return _dataset_json(request, "corr", correlation_matrix)
+
+@router.post(
+    "/dataset/upload",
+    openapi_extra={ # тіло читається вручну (потоково), тож описуємо форму для /docs
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"],
+            }}},
+        },
+    },
+)
+async def dataset_upload(request: Request):
+    """
+    Завантаження CSV користувача: потоково на диск, з sha256 і лімітом розміру.
+    Той самий вміст вдруге не зберігається і не аналізується заново (reused=true).
+    """
+    settings = get_settings()
+    stored = await receive_upload(request, max_bytes=settings.upload_max_bytes)
+    try:
+        fmt = await run_in_threadpool(check_supported, stored.path) # CSV (у т.ч. gzip/zstd), Parquet, Arrow IPC - за вмістом
+    except ValueError as e:
+        if not stored.reused: # файл уже збережений і в індексі - прибираємо, щоб не займав квоту
+            await run_in_threadpool(UPLOADS.discard, stored.sha256)
+        raise HTTPException(status_code=400, detail=str(e))
 
-    data = await file.read()
-    with open(path, "wb") as f:
-        f.write(data)
+    set_uploaded_path(stored.path, sha256=stored.sha256, display_name=stored.filename) # переключення режиму
+    start_sample() # вибірка для approx=true будується у фоні одразу після upload
+    start_store() # словникове кодування колонок (top/groupby по кодах) - теж у фоні
 
-    set_uploaded_path(path) # переключення режиму
+    # квота і retention для uploads/ (активний файл не чіпаємо)
+    await run_in_threadpool(
+        UPLOADS.gc, settings.upload_quota_bytes, settings.upload_retention_days, keep=[stored.sha256],
+    )
 
-    return {"ok": True, "path": path, "mode_text": get_mode_text()}
+    return {
+        "ok": True,
+        "path": stored.path,
+        "name": stored.filename,
+        "size": stored.size,
+        "sha256": stored.sha256,
+        "format": fmt,
+        "reused": stored.reused, # такий файл уже був - summary/stats з готових артефактів
+        "mode_text": get_mode_text(),
+    }
 
 
 # Dataset Excel
@@ -198,53 +529,68 @@ class ExportReportPayload(BaseModel):
 
 
 @router.post("/dataset/export_filtered")
-def dataset_export_filtered(payload: ExportFilteredPayload):
+def dataset_export_filtered(
+    payload: ExportFilteredPayload,
+    format: str = Query("xlsx", pattern=EXPORT_FORMAT_PATTERN), # xlsx | csv | parquet
+    job: bool = Query(False),
+):
     """Експорт поточної сторінки таблиці"""
-    content = build_filtered_excel(
-        dataset_name=payload.dataset_name,
-        mode_text=payload.mode_text,
-        columns=payload.columns,
-        rows=payload.rows,
-        filter_col=payload.filter_col,
-        filter_text=payload.filter_text,
-    )
+    _check_format(format)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"dataset_filtered_{ts}.{format}"
+    return _export("filtered", format, payload.model_dump(), filename, job, rows_total=len(payload.rows))
+
 
+@router.get("/dataset/export")
+def dataset_export(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN), # csv | parquet | xlsx
+    columns: str = Query(""), # колонки через кому (порожньо - усі)
+    job: bool = Query(False),
+):
+    """Експорт усього активного датасету: csv/parquet - потоково з файлу, xlsx - листи по 1 048 575 рядків"""
+    _check_format(format)
+    try:
+        cols = export_columns([c.strip() for c in columns.split(",") if c.strip()])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    dataset_name = DATASET_STATE.display_name or os.path.basename(get_current_path())
+    base = os.path.splitext(dataset_name)[0] or "dataset"
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"dataset_filtered_{ts}.xlsx"
-    headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    filename = f"{base}_{ts}.{format}"
 
-    return StreamingResponse(
-        iter([content]),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
-    )
+    params: Dict[str, Any] = {"columns": cols, "dataset_name": dataset_name, "mode_text": get_mode_text()}
+    if not job:
+        return _export("dataset", format, params, filename, job)
+    store = current_store() # кількість рядків відома, лише якщо сховище вже побудоване
+    params["dataset"] = dataset_state() # процес пулу відкриває той самий датасет
+    return _export("dataset", format, params, filename, job, rows_total=store.rows if store is not None else None)
 
 
 @router.post("/dataset/export_report")
-def dataset_export_report(payload: ExportReportPayload):
+def dataset_export_report(payload: ExportReportPayload, job: bool = Query(False)):
     """Експорт повного Excel-звіту"""
-    content = build_report_excel(
-        dataset_name=payload.dataset_name,
-        mode_text=payload.mode_text,
-        columns=payload.columns,
-        rows=payload.rows,
-        filter_col=payload.filter_col,
-        filter_text=payload.filter_text,
-        numeric_col=payload.numeric_col,
-        colstats=payload.colstats or {},
-        hist_labels=payload.hist_labels or [],
-        hist_counts=payload.hist_counts or [],
-        cat_col=payload.cat_col,
-        top_labels=payload.top_labels or [],
-        top_counts=payload.top_counts or [],
-    )
-
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"dataset_report_{ts}.xlsx"
-    headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
-
-    return StreamingResponse(
-        iter([content]),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
-    )
\ No newline at end of file
+    return _export("report", "xlsx", payload.model_dump(), f"dataset_report_{ts}.xlsx", job, rows_total=len(payload.rows))
+
+
+@router.get("/export/jobs/{job_id}")
+def export_job_status(job_id: str):
+    """Стан фонового експорту: status queued|running|done|error, progress 0..1, rows_done / rows_total"""
+    state = get_jobs().status(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _job_view(state)
+
+
+@router.get("/export/jobs/{job_id}/download")
+def export_job_download(job_id: str):
+    """Готовий файл фонового експорту (зберігається APP_EXPORT_TTL с після завершення)"""
+    jobs = get_jobs()
+    state = jobs.status(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    path = jobs.result_path(job_id)
+    if path is None:
+        raise HTTPException(status_code=409, detail=f"Export job is {state.get('status')}")
+    return FileResponse(path, media_type=state["media_type"], filename=state["filename"])
\ No newline at end of file
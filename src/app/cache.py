@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import register_cache
+
+_MISSING = object() # маркер "нема в кеші"
+
+
+class TTLCache:
+    """
+    Потокобезпечний кеш з TTL та LRU-витісненням.
+    maxsize - максимум записів, ttl - час життя запису в секундах.
+    maxbytes - додатково межа сумарного розміру значень за sizeof(value) (0 - без межі);
+    значення, більше за maxbytes, не кешується.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        name: str = "cache",
+        maxbytes: int = 0,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name # назва (для статистики)
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self._data: OrderedDict[Hashable, Tuple[float, Any, int]] = OrderedDict() # key -> (expires_at, value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        register_cache(self) # hit ratio видно в /metrics
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Значення з кешу або default (протерміновані записи видаляються)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key] # протермінований
+                    self._bytes -= entry[2]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key) # свіжий доступ -> в кінець LRU
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Запис у кеш; при переповненні викидається найдавніший за доступом"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        nbytes = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if self.maxbytes and nbytes > self.maxbytes: # один запис витіснив би весь кеш
+                return
+            self._data[key] = (expires_at, value, nbytes)
+            self._bytes += nbytes
+            while len(self._data) > self.maxsize or (self.maxbytes and self._bytes > self.maxbytes):
+                self._bytes -= self._data.popitem(last=False)[1][2]
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика кешу: розмір, hits/misses, hit ratio"""
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self._bytes,
+            "maxbytes": self.maxbytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try: # brotli - опційно; без нього тільки gzip
+    import brotli
+except ImportError: # pragma: no cover
+    brotli = None # type: ignore[assignment]
+
+# типи, які вже стиснуті (xlsx/zip/parquet...) або бінарні - не чіпаємо
+EXCLUDED_MEDIA_PREFIXES = (
+    "application/vnd.openxmlformats",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "application/vnd.apache",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Accept-Encoding -> {кодування: q}"""
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[token] = q
+    return out
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """br, якщо доступний і прийнятий клієнтом; інакше gzip; інакше None"""
+    acc = _accepted(header)
+    if brotli is not None and acc.get("br", 0) > 0:
+        return "br"
+    if acc.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Спільний інтерфейс для потокового gzip / brotli"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31) # 31 -> gzip-контейнер
+
+    def process(self, data: bytes, flush: bool = True) -> bytes:
+        """flush=True - віддати все стиснуте одразу (для потокових відповідей)"""
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + self._br.flush() if flush else out
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Стиснення відповідей gzip / brotli (за Accept-Encoding) з порогом розміру.
+    Маленькі, вже стиснуті та бінарні відповіді, а також 304 - без змін.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(send, encoding, self.minimum_size, self.gzip_level, self.brotli_quality)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int, gzip_level: int, brotli_quality: int) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.start: Optional[Message] = None # відкладений http.response.start
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False # вже стиснуто
+        media = headers.get("content-type", "").lower()
+        return not media.startswith(EXCLUDED_MEDIA_PREFIXES)
+
+    async def send(self, message: Message) -> None:
+        mtype = message["type"]
+        if mtype == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            if message["status"] in (204, 304) or not self._compressible(headers):
+                self.passthrough = True
+            return
+
+        if mtype != "http.response.body":
+            await self._send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more = message.get("more_body", False)
+
+        if self.passthrough:
+            if self.start is not None:
+                await self._send(self.start)
+                self.start = None
+            await self._send(message)
+            return
+
+        if self.compressor is None:
+            # перше тіло: вирішуємо, чи стискати
+            if not more and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start)
+                self.start = None
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.gzip_level, self.brotli_quality)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                # стиснуте представлення вже не байт-у-байт -> слабкий ETag (як nginx)
+                headers["ETag"] = "W/" + headers["etag"]
+
+            if not more:
+                data = self.compressor.process(body, flush=False) + self.compressor.finish()
+                headers["Content-Length"] = str(len(data))
+                await self._send(self.start)
+                self.start = None
+                await self._send({"type": "http.response.body", "body": data, "more_body": False})
+                return
+
+            del headers["Content-Length"] # потокове стиснення - довжина невідома
+            await self._send(self.start)
+            self.start = None
+
+        data = self.compressor.process(body, flush=more) if body else b""
+        if not more:
+            data += self.compressor.finish()
+        if data or not more:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more})
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 @dataclass(frozen=True)
 class Settings:
@@ -13,10 +14,35 @@ class Settings:
     client_id: str # EBAY_CLIENT_ID
     client_secret: str # EBAY_CLIENT_SECRET
     marketplace_id: str # напр. EBAY_US
+    api_base_override: str = "" # EBAY_API_BASE (напр. локальний fake-сервер)
+    rate_limit_rps: float = 5.0 # EBAY_RATE_LIMIT_RPS - запитів/с до eBay (0 - без ліміту)
+    rate_limit_burst: int = 5 # EBAY_RATE_LIMIT_BURST - запитів підряд без паузи
+    max_retries: int = 4 # EBAY_MAX_RETRIES - повтори на 429/5xx
+    daily_quota: int = 0 # EBAY_DAILY_QUOTA - добова квота викликів (0 - без ліміту)
+    queue_timeout: float = 30.0 # EBAY_QUEUE_TIMEOUT - скільки чекати в черзі лімітера (с)
+    token_cache_file: str = "" # EBAY_TOKEN_CACHE_FILE - спільний файл токена для всіх workers
+    token_refresh_ahead: float = 300.0 # EBAY_TOKEN_REFRESH_AHEAD - фонове оновлення за N с до завершення
+    admin_token: str = "" # APP_ADMIN_TOKEN - доступ до ?profile=1 (порожній - вимкнено)
+    profile_dir: str = "profiles" # APP_PROFILE_DIR - куди зберігати профілі
+    upload_max_bytes: int = 200 * 1024 * 1024 # APP_UPLOAD_MAX_BYTES - ліміт розміру CSV (413 понад нього)
+    upload_quota_bytes: int = 2 * 1024 * 1024 * 1024 # APP_UPLOAD_QUOTA_BYTES - квота uploads/ (0 - без квоти)
+    upload_retention_days: float = 30.0 # APP_UPLOAD_RETENTION_DAYS - видаляти невикористані довше (0 - ніколи)
+    dataset_workers: int = 0 # APP_DATASET_WORKERS - процеси для паралельних сканів датасету (0 - за кількістю CPU)
+    export_workers: int = 2 # APP_EXPORT_WORKERS - процеси для фонових експортів (?job=true)
+    export_queue_max: int = 16 # APP_EXPORT_QUEUE_MAX - незавершених експортів у черзі (понад - 503)
+    export_dir: str = "exports" # APP_EXPORT_DIR - готові файли і прогрес фонових експортів
+    export_ttl: float = 3600.0 # APP_EXPORT_TTL - скільки с зберігати готовий файл
+    admit_heavy: int = 4 # APP_ADMIT_HEAVY - одночасних сканів датасету / експортів (0 - без ліміту)
+    admit_upstream: int = 16 # APP_ADMIT_UPSTREAM - одночасних запитів, що йдуть в eBay
+    admit_light: int = 64 # APP_ADMIT_LIGHT - одночасних решти запитів (сторінки, /health, /metrics)
+    admit_queue_factor: float = 2.0 # APP_ADMIT_QUEUE_FACTOR - черга класу = ліміт * factor (понад - 503)
+    admit_timeout: float = 5.0 # APP_ADMIT_TIMEOUT - скільки с запит чекає слота в черзі (потім 503)
 
     @property
     def api_base(self) -> str:
         """Базовий URL API залежно від середовища"""
+        if self.api_base_override:
+            return self.api_base_override.rstrip("/")
         return (
             "https://api.sandbox.ebay.com"
             if self.ebay_env.lower() == "sandbox"
@@ -34,10 +60,29 @@ class Settings:
         return f"{self.api_base}/buy/browse/v1/item_summary/search"
 
 
+def _env_float(name: str, default: float) -> float:
+    """Число з env (або default, якщо не задано/некоректне)"""
+    try:
+        return float(os.getenv(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Ціле з env (або default, якщо не задано/некоректне)"""
+    try:
+        return int(os.getenv(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Зчитування налаштувань з environment variables.
     Якщо ключів немає - RuntimeError.
+    Результат кешується на весь процес (get_settings.cache_clear() - перечитати env);
+    помилка не кешується, тож після виправлення env наступний виклик спрацює.
     """
     env = os.getenv("EBAY_ENV", "sandbox").strip() # за замовчуванням sandbox
     cid = os.getenv("EBAY_CLIENT_ID", "").strip()
@@ -57,4 +102,27 @@ def get_settings() -> Settings:
         client_id=cid,
         client_secret=csec,
         marketplace_id=marketplace,
+        api_base_override=os.getenv("EBAY_API_BASE", "").strip(),
+        rate_limit_rps=_env_float("EBAY_RATE_LIMIT_RPS", 5.0),
+        rate_limit_burst=_env_int("EBAY_RATE_LIMIT_BURST", 5),
+        max_retries=_env_int("EBAY_MAX_RETRIES", 4),
+        daily_quota=_env_int("EBAY_DAILY_QUOTA", 0),
+        queue_timeout=_env_float("EBAY_QUEUE_TIMEOUT", 30.0),
+        token_cache_file=os.getenv("EBAY_TOKEN_CACHE_FILE", "").strip(),
+        token_refresh_ahead=_env_float("EBAY_TOKEN_REFRESH_AHEAD", 300.0),
+        admin_token=os.getenv("APP_ADMIN_TOKEN", "").strip(),
+        profile_dir=os.getenv("APP_PROFILE_DIR", "profiles").strip() or "profiles",
+        upload_max_bytes=_env_int("APP_UPLOAD_MAX_BYTES", 200 * 1024 * 1024),
+        upload_quota_bytes=_env_int("APP_UPLOAD_QUOTA_BYTES", 2 * 1024 * 1024 * 1024),
+        upload_retention_days=_env_float("APP_UPLOAD_RETENTION_DAYS", 30.0),
+        dataset_workers=_env_int("APP_DATASET_WORKERS", 0),
+        export_workers=max(1, _env_int("APP_EXPORT_WORKERS", 2)),
+        export_queue_max=max(1, _env_int("APP_EXPORT_QUEUE_MAX", 16)),
+        export_dir=os.getenv("APP_EXPORT_DIR", "exports").strip() or "exports",
+        export_ttl=_env_float("APP_EXPORT_TTL", 3600.0),
+        admit_heavy=max(0, _env_int("APP_ADMIT_HEAVY", 4)),
+        admit_upstream=max(0, _env_int("APP_ADMIT_UPSTREAM", 16)),
+        admit_light=max(0, _env_int("APP_ADMIT_LIGHT", 64)),
+        admit_queue_factor=max(0.0, _env_float("APP_ADMIT_QUEUE_FACTOR", 2.0)),
+        admit_timeout=max(0.0, _env_float("APP_ADMIT_TIMEOUT", 5.0)),
     )
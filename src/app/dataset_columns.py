@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from .dataset_formats import open_rows
+from .dataset_service import STATE, _is_missing, _try_float, get_current_path
+from .metrics import record_scan
+
+# бінарний формат колонки (little-endian):
+#   0..15   заголовок: magic b"DCOL", uint32 довжина, uint32 кількість null, uint8 розмір значення (8 | 4), 3 байти 0
+#   16..    значення float64/float32 (null -> NaN), вирівняні на 8 - браузер читає через Float64Array без копії
+#   далі    bitmap валідності: біт i (LSB-first, як в Arrow) = 1, якщо значення i є
+COLUMN_MAGIC = b"DCOL"
+COLUMN_HEADER = struct.Struct("<4sIIB3x")
+COLUMN_MEDIA_TYPE = "application/vnd.dataset-column"
+DTYPES = {"f64": "d", "f32": "f"} # format= -> typecode array
+DEFAULT_TRIM_CAP = 2000
+
+_NAN = math.nan
+_BITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+@dataclass(frozen=True)
+class NumericColumn:
+    """Розпарсена числова колонка: значення в array('d') (null = NaN) + bitmap валідності"""
+    values: array
+    valid: bytes
+    null_count: int
+
+    def encode(self, fmt: str = "f64") -> bytes:
+        """Колонка -> байти формату DCOL (f64 або f32)"""
+        typecode = DTYPES[fmt]
+        values = self.values if typecode == "d" else array(typecode, self.values)
+        if sys.byteorder == "big": # pragma: no cover - формат завжди little-endian
+            values = array(typecode, values)
+            values.byteswap()
+        header = COLUMN_HEADER.pack(COLUMN_MAGIC, len(values), self.null_count, values.itemsize)
+        pad = b"\0" * ((-len(values) * values.itemsize) % 8)
+        return b"".join((header, values.tobytes(), pad, self.valid))
+
+
+def parse_numeric(raw: Sequence[str]) -> NumericColumn:
+    """
+    Рядки -> NumericColumn. Кожен різний рядок парситься один раз (_try_float),
+    далі підстановка і bitmap будуються map/translate на C-рівні, без циклу по значеннях.
+    """
+    table: Dict[str, float] = {}
+    ok: Dict[str, bool] = {}
+    for v in set(raw):
+        f = _try_float(v)
+        table[v] = _NAN if f is None else f
+        ok[v] = f is not None
+    values = array("d", map(table.__getitem__, raw))
+    flags = bytes(map(ok.__getitem__, raw)) # 1 - число, 0 - пропуск/не парситься
+    n = len(values)
+    bits = flags.translate(_BITS)[::-1] # біт i -> розряд i числа
+    valid = int(bits, 2).to_bytes((n + 7) // 8, "little") if n else b""
+    return NumericColumn(values=values, valid=valid, null_count=n - flags.count(1))
+
+
+def read_column_raw(name: str, limit: int) -> List[str]:
+    """
+    Сирі значення колонки по рядках - те саме вікно, що й get_column_values
+    (до limit непорожніх значень), але пропуски залишаються на своїх місцях (-> null).
+    """
+    path = get_current_path()
+    hard_cap = DEFAULT_TRIM_CAP if STATE.mode == "default" else None
+    out: List[str] = []
+    found = 0
+    rows = 0
+    t0 = time.perf_counter()
+    with open_rows(path, [name]) as (header, reader):
+        if name in header:
+            i = header.index(name)
+            for r in reader:
+                if hard_cap is not None and rows >= hard_cap:
+                    break
+                rows += 1
+                v = r[i] if i < len(r) else ""
+                out.append(v)
+                if not _is_missing(v):
+                    found += 1
+                    if found >= limit:
+                        break
+    record_scan("column", rows, time.perf_counter() - t0)
+    return out
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from collections import deque
+from operator import itemgetter, mul
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .dataset_formats import open_rows
+from .dataset_service import STATE, _try_float, compute_summary, get_current_path
+from .metrics import record_scan
+from .workers import get_pool, worker_count
+
+CORR_MAX_COLUMNS = 40 # більше числових колонок - беремо перші 40 (матриця k x k)
+CORR_CHUNK_ROWS = 20000 # рядків в одному chunk (одиниця роботи для процесу)
+CORR_PARALLEL_MIN_BYTES = 16 * 1024 * 1024 # менші файли рахуються в поточному процесі
+DEFAULT_TRIM_CAP = 2000 # default датасет - перші 2000 рядків
+
+# акумулятори (списки - дешево pickle-яться між процесами):
+#   колонка: [n, mean, m2, min, max]           m2 = sum((x - mean)^2)
+#   пара:    [n, mean_x, mean_y, m2x, m2y, cxy] cxy = sum((x - mean_x)(y - mean_y)), лише рядки, де є обидва
+Moments = List[float]
+ChunkResult = Tuple[int, List[Moments], Dict[Tuple[int, int], Moments]]
+
+
+def _parse(raw: str) -> Optional[float]:
+    try:
+        v = float(raw) # швидкий шлях для звичайних чисел
+    except ValueError:
+        return _try_float(raw) # $, %, коми, NA
+    if v - v != 0.0: # nan / inf
+        return _try_float(raw)
+    return v
+
+
+def _parse_column(raw: Sequence[str]) -> List[Optional[float]]:
+    """
+    Колонка chunk-а -> float/None. Чисті числа - одним map(float) на C-швидкості;
+    інакше - таблиця різних значень chunk-а: повторювані рядки ($1,299, NA, категорії)
+    парсяться один раз, а підстановка йде через map без циклу на рівні Python.
+    """
+    try:
+        vals = list(map(float, raw))
+    except ValueError:
+        pass
+    else:
+        if all(map(math.isfinite, vals)): # немає nan/inf (fsum тут кидав би OverflowError/ValueError)
+            return vals
+    table = {v: _parse(v) for v in set(raw)} # кожен різний рядок парситься один раз
+    return list(map(table.__getitem__, raw))
+
+
+def _mean(vals: List[float]) -> float:
+    """Середнє через fsum; при переповненні суми (значення біля 1e308) - fsum уже поділених на n"""
+    n = len(vals)
+    try:
+        return math.fsum(vals) / n
+    except OverflowError:
+        return math.fsum(v / n for v in vals)
+
+
+def chunk_moments(rows: List[Tuple[str, ...]]) -> ChunkResult:
+    """
+    Моменти одного chunk (виконується в процесі пулу). Значення колонки зсуваються на її
+    середнє в chunk (d = x - mean, пропуск -> 0.0), тож суми малі й без втрати точності,
+    а попарні суми по рядках, де є обидва значення, - це sum(map(mul, ...)) з маскою 0/1
+    без циклів на рівні Python. Пропуски виключаються попарно (pairwise complete).
+    """
+    columns = [_parse_column(col) for col in zip(*rows)]
+    k = len(columns)
+    single: List[Moments] = []
+    shift: List[float] = []
+    dev: List[List[float]] = [] # x - shift, пропуск -> 0.0
+    sq: List[List[float]] = [] # dev^2
+    masks: List[Optional[List[float]]] = [] # 1.0 - є значення; None - колонка без пропусків
+    for col in columns:
+        vals = [v for v in col if v is not None]
+        n = len(vals)
+        if n == 0:
+            single.append([0, 0.0, 0.0, math.inf, -math.inf])
+            shift.append(0.0)
+            dev.append([])
+            sq.append([])
+            masks.append([])
+            continue
+        m = _mean(vals)
+        if n == len(col):
+            d = [v - m for v in col]
+            masks.append(None)
+        else:
+            d = [0.0 if v is None else v - m for v in col]
+            masks.append([0.0 if v is None else 1.0 for v in col])
+        d2 = list(map(mul, d, d))
+        shift.append(m)
+        dev.append(d)
+        sq.append(d2)
+        single.append([n, m, sum(d2), min(vals), max(vals)])
+
+    pairs: Dict[Tuple[int, int], Moments] = {}
+    for i in range(k):
+        if single[i][0] == 0:
+            continue
+        for j in range(i + 1, k):
+            if single[j][0] == 0:
+                continue
+            mi, mj = masks[i], masks[j]
+            sxy = sum(map(mul, dev[i], dev[j])) # пропуски дають 0 - сума лише по спільних рядках
+            if mi is None and mj is None: # частий випадок - обидві без пропусків
+                pairs[(i, j)] = [single[i][0], shift[i], shift[j], single[i][2], single[j][2], sxy]
+                continue
+            n = sum(mj) if mi is None else sum(mi) if mj is None else sum(map(mul, mi, mj))
+            if n == 0:
+                continue
+            # суми x по рядках, де є y (і навпаки)
+            sx = sum(dev[i]) if mj is None else sum(map(mul, dev[i], mj))
+            sy = sum(dev[j]) if mi is None else sum(map(mul, dev[j], mi))
+            sxx = sum(sq[i]) if mj is None else sum(map(mul, sq[i], mj))
+            syy = sum(sq[j]) if mi is None else sum(map(mul, sq[j], mi))
+            pairs[(i, j)] = [
+                int(n),
+                shift[i] + sx / n,
+                shift[j] + sy / n,
+                sxx - sx * sx / n,
+                syy - sy * sy / n,
+                sxy - sx * sy / n,
+            ]
+    return len(rows), single, pairs
+
+
+def _merge_single(a: Moments, b: Moments) -> None:
+    """Злиття моментів колонки (формула Chan et al.) - на місці в a"""
+    if b[0] == 0:
+        return
+    if a[0] == 0:
+        a[:] = b
+        return
+    n = a[0] + b[0]
+    d = b[1] - a[1]
+    a[2] += b[2] + d * d * a[0] * b[0] / n
+    a[1] += d * b[0] / n
+    a[0] = n
+    a[3] = min(a[3], b[3])
+    a[4] = max(a[4], b[4])
+
+
+def _merge_pair(a: Moments, b: Moments) -> None:
+    """Злиття co-moment акумуляторів пари - на місці в a"""
+    n = a[0] + b[0]
+    dx = b[1] - a[1]
+    dy = b[2] - a[2]
+    w = a[0] * b[0] / n
+    a[3] += b[3] + dx * dx * w
+    a[4] += b[4] + dy * dy * w
+    a[5] += b[5] + dx * dy * w
+    a[1] += dx * b[0] / n
+    a[2] += dy * b[0] / n
+    a[0] = n
+
+
+class _Totals:
+    """Накопичені моменти всього файлу (результати chunk-ів зливаються по черзі)"""
+
+    def __init__(self, k: int) -> None:
+        self.rows = 0
+        self.single: List[Moments] = [[0, 0.0, 0.0, math.inf, -math.inf] for _ in range(k)]
+        self.pairs: Dict[Tuple[int, int], Moments] = {}
+
+    def add(self, result: ChunkResult) -> None:
+        rows, single, pairs = result
+        self.rows += rows
+        for a, b in zip(self.single, single):
+            _merge_single(a, b)
+        for key, b in pairs.items():
+            a = self.pairs.get(key)
+            if a is None:
+                self.pairs[key] = b
+            else:
+                _merge_pair(a, b)
+
+
+def _scan(path: str, columns: List[str], hard_cap: Optional[int], submit: Callable[[List[Tuple[str, ...]]], None]) -> None:
+    """Читає датасет і віддає chunk-и з потрібними колонками (tuple рядків на рядок файлу)"""
+    with open_rows(path, columns) as (header, reader):
+        idx = [header.index(c) for c in columns]
+        width = max(idx) + 1
+        get = itemgetter(*idx) if len(idx) > 1 else (lambda r, i=idx[0]: (r[i],))
+        chunk: List[Tuple[str, ...]] = []
+        rows = 0
+        for r in reader:
+            if hard_cap is not None and rows >= hard_cap:
+                break
+            rows += 1
+            if len(r) < width:
+                r = r + [""] * (width - len(r)) # короткий рядок - решта пропуски
+            chunk.append(get(r))
+            if len(chunk) >= CORR_CHUNK_ROWS:
+                submit(chunk)
+                chunk = []
+        if chunk:
+            submit(chunk)
+
+
+def _r(x: float) -> Optional[float]:
+    return None if x is None or not math.isfinite(x) else x
+
+
+def correlation_matrix() -> Dict[str, Any]:
+    """
+    Кореляційна (Pearson) і коваріаційна матриця для всіх numeric_columns з compute_summary
+    за один потоковий прохід + профіль кожної колонки (count, mean, std, min, max).
+    Великі файли рахуються chunk-паралельно в пулі процесів: кожен chunk дає
+    mergeable co-moments, які зливаються в основному процесі (результат не залежить
+    від кількості процесів, крім останніх знаків float).
+    """
+    summary = compute_summary()
+    numeric = list(summary["numeric_columns"])
+    columns = numeric[:CORR_MAX_COLUMNS]
+    k = len(columns)
+
+    totals = _Totals(k)
+    path = get_current_path()
+    hard_cap = DEFAULT_TRIM_CAP if STATE.mode == "default" else None
+
+    t0 = time.perf_counter()
+    if k:
+        pool = get_pool() if os.path.getsize(path) >= CORR_PARALLEL_MIN_BYTES else None
+        if pool is None:
+            _scan(path, columns, hard_cap, lambda chunk: totals.add(chunk_moments(chunk)))
+        else:
+            pending: Deque[Any] = deque()
+            limit = 2 * worker_count() # chunk-ів у польоті: пам'ять обмежена, процеси не простоюють
+
+            def submit(chunk: List[Tuple[str, ...]]) -> None:
+                pending.append(pool.submit(chunk_moments, chunk))
+                while len(pending) > limit:
+                    totals.add(pending.popleft().result()) # по порядку - детерміноване злиття
+
+            try:
+                _scan(path, columns, hard_cap, submit)
+                while pending:
+                    totals.add(pending.popleft().result())
+            finally:
+                for fut in pending:
+                    fut.cancel()
+    record_scan("corr", totals.rows, time.perf_counter() - t0)
+
+    n_matrix = [[0] * k for _ in range(k)]
+    cov = [[None] * k for _ in range(k)]
+    corr = [[None] * k for _ in range(k)]
+    profile: Dict[str, Dict[str, Any]] = {}
+    for i, c in enumerate(columns):
+        n, m, m2, lo, hi = totals.single[i]
+        n_matrix[i][i] = n
+        var = m2 / (n - 1) if n > 1 else None
+        cov[i][i] = var
+        corr[i][i] = 1.0 if var else None
+        profile[c] = {
+            "count": n,
+            "missing": totals.rows - n, # пропуски і нечислові значення
+            "mean": m if n else None,
+            "std": math.sqrt(var) if var is not None else None,
+            "min": lo if n else None,
+            "max": hi if n else None,
+        }
+    for (i, j), (n, _mx, _my, m2x, m2y, cxy) in totals.pairs.items():
+        n_matrix[i][j] = n_matrix[j][i] = n
+        if n > 1:
+            cov[i][j] = cov[j][i] = _r(cxy / (n - 1))
+        if n > 1 and m2x > 0 and m2y > 0:
+            r = cxy / math.sqrt(m2x * m2y)
+            if math.isfinite(r): # значення біля 1e308: суми квадратів переповнюються в inf -> nan
+                corr[i][j] = corr[j][i] = _r(max(-1.0, min(1.0, r)))
+
+    return {
+        "columns": columns,
+        "rows_scanned": totals.rows,
+        "truncated_columns": numeric[CORR_MAX_COLUMNS:], # не увійшли в матрицю
+        "n": n_matrix, # рядків, де є обидва значення (pairwise complete)
+        "corr": corr, # Pearson; None - константа або < 2 спільних значень
+        "cov": cov, # вибіркова коваріація (n - 1)
+        "profile": profile,
+    }
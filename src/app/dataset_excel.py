@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from io import BytesIO
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Alignment
 from openpyxl.chart import BarChart, Reference
 
+from .metrics import stage, timed
+
+XLSX_MAX_ROWS = 1048576 # ліміт рядків на один лист Excel (разом із заголовком)
+
 def _safe_sheet_title(title: str) -> str:
     """Безпечна назва листа"""
     t = (title or "").strip()[:31]
@@ -58,6 +62,24 @@ def _write_table(ws, columns: List[str], rows: List[Dict[str, Any]], title: Opti
     _set_col_widths(ws, columns, rows) # підбір ширини
 
 
+def _write_tables(wb, columns: List[str], rows: List[Dict[str, Any]], title: str) -> int:
+    """
+    Таблиця на листах Data, Data 2, ...: якщо рядки не вміщаються в XLSX_MAX_ROWS
+    (з урахуванням title і header), решта йде на наступний лист. Повертає кількість листів.
+    """
+    per_sheet = XLSX_MAX_ROWS - 3 # title + порожній рядок + header
+    parts = [rows[i:i + per_sheet] for i in range(0, len(rows), per_sheet)] or [[]]
+    for n, part in enumerate(parts, start=1):
+        if n == 1:
+            ws = wb.active
+            ws.title = _safe_sheet_title("Data")
+        else:
+            ws = wb.create_sheet(_safe_sheet_title(f"Data {n}"))
+        suffix = f" (part {n}/{len(parts)})" if len(parts) > 1 else ""
+        _write_table(ws, columns, part, title=title + suffix)
+    return len(parts)
+
+
 def _write_kv(ws, kv: List[List[Any]], start_row: int = 1, start_col: int = 1, title: Optional[str] = None) -> int:
     """Запис ключ-значення (дані/summary) і повернення наступного рядка"""
     r = start_row
@@ -77,6 +99,7 @@ def _write_kv(ws, kv: List[List[Any]], start_row: int = 1, start_col: int = 1, t
     return r + 1
 
 
+@timed("dataset_excel")
 def build_filtered_excel(
     *,
     dataset_name: str, # назва датасету
@@ -88,11 +111,7 @@ def build_filtered_excel(
 ) -> bytes:
     """Excel: Data + Meta (експорт поточної таблиці/сторінки)"""
     wb = Workbook()
-    ws = wb.active
-    ws.title = _safe_sheet_title("Data")
-
-    title = f"Filtered export: {dataset_name}"
-    _write_table(ws, columns, rows, title=title)
+    sheets = _write_tables(wb, columns, rows, title=f"Filtered export: {dataset_name}")
 
     meta = wb.create_sheet(_safe_sheet_title("Meta"))
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -106,15 +125,18 @@ def build_filtered_excel(
             ["Filter text", filter_text or ""],
             ["Rows exported", len(rows)],
             ["Columns", len(columns)],
+            ["Data sheets", sheets],
         ],
         title="Export metadata",
     )
 
     bio = BytesIO() # збереження в пам’ять
-    wb.save(bio)
+    with stage("excel_save"):
+        wb.save(bio)
     return bio.getvalue() # bytes для StreamingResponse
 
 
+@timed("dataset_report")
 def build_report_excel(
     *,
     dataset_name: str,
@@ -134,10 +156,8 @@ def build_report_excel(
     """Excel-звіт: Data + Analytics + Charts (таблиці + діаграми)"""
     wb = Workbook()
 
-    # Data sheet (таблиця)
-    ws_data = wb.active
-    ws_data.title = _safe_sheet_title("Data")
-    _write_table(ws_data, columns, rows, title=f"Dataset report: {dataset_name}")
+    # Data sheet (таблиця; понад ліміт рядків - Data 2, ...)
+    _write_tables(wb, columns, rows, title=f"Dataset report: {dataset_name}")
 
     # Analytics sheet (метадані + stats)
     ws_a = wb.create_sheet(_safe_sheet_title("Analytics"))
@@ -244,5 +264,55 @@ def build_report_excel(
     ws_c.column_dimensions["B"].width = 12
 
     bio = BytesIO() # збереження xlsx в пам’ять
-    wb.save(bio)
-    return bio.getvalue() # bytes для StreamingResponse
\ No newline at end of file
+    with stage("excel_save"):
+        wb.save(bio)
+    return bio.getvalue() # bytes для StreamingResponse
+
+
+@timed("dataset_excel")
+def build_dataset_excel(
+    *,
+    dataset_name: str, # назва датасету
+    mode_text: str, # текст режиму (default/upload)
+    columns: List[str], # колонки
+    rows: Iterable[Sequence[Any]], # рядки-списки значень у порядку columns (потоково)
+) -> bytes:
+    """
+    Excel з усім датасетом: write_only workbook (рядки не тримаються як об'єкти комірок),
+    новий лист Data N кожні XLSX_MAX_ROWS - 1 рядків.
+    """
+    wb = Workbook(write_only=True)
+    per_sheet = XLSX_MAX_ROWS - 1 # мінус header
+    ws = None
+    in_sheet = per_sheet
+    sheets = 0
+    total = 0
+    for r in rows:
+        if in_sheet >= per_sheet:
+            sheets += 1
+            ws = wb.create_sheet(_safe_sheet_title("Data" if sheets == 1 else f"Data {sheets}"))
+            ws.append(columns)
+            in_sheet = 0
+        ws.append(list(r))
+        in_sheet += 1
+        total += 1
+    if ws is None:
+        wb.create_sheet(_safe_sheet_title("Data")).append(columns)
+        sheets = 1
+
+    meta = wb.create_sheet(_safe_sheet_title("Meta"))
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for row in (
+        ["Dataset", dataset_name],
+        ["Mode", mode_text],
+        ["Generated", now],
+        ["Rows exported", total],
+        ["Columns", len(columns)],
+        ["Data sheets", sheets],
+    ):
+        meta.append(row)
+
+    bio = BytesIO()
+    with stage("excel_save"):
+        wb.save(bio)
+    return bio.getvalue()
\ No newline at end of file
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import importlib.util
+import io
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try: # zstandard - опційно; без нього .zst не приймається
+    import zstandard
+except ImportError: # pragma: no cover
+    zstandard = None # type: ignore[assignment]
+
+# pyarrow - опційно (без нього Parquet / Arrow IPC не приймаються); імпорт лінивий - у гілках parquet/arrow,
+# щоб не додавати ~170 мс до старту кожного процесу, як і openpyxl
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+ARROW_BATCH_ROWS = 65536 # рядків в одному record batch при читанні Parquet
+PROBE_BYTES = 64 * 1024 # скільки розпакувати при перевірці стиснутого CSV
+
+# формат визначається за вмістом (magic bytes), а не за розширенням імені файлу
+_MAGIC = (
+    (b"\x1f\x8b", "csv.gz"),
+    (b"\x28\xb5\x2f\xfd", "csv.zst"),
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "arrow"), # Arrow IPC file (Feather v2)
+    (b"\xff\xff\xff\xff", "arrows"), # Arrow IPC stream
+)
+_MAGIC_LEN = max(len(m) for m, _ in _MAGIC)
+
+Rows = Iterable[List[str]]
+
+
+def detect_format(path: str) -> str:
+    """csv | csv.gz | csv.zst | parquet | arrow | arrows"""
+    with open(path, "rb") as f:
+        head = f.read(_MAGIC_LEN)
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return "csv"
+
+
+def _require(fmt: str) -> None:
+    """ValueError, якщо для формату не встановлена опційна залежність"""
+    if fmt == "csv.zst" and zstandard is None:
+        raise ValueError("zstd-compressed CSV requires the 'zstandard' package")
+    if fmt in ("parquet", "arrow", "arrows") and not HAS_PYARROW:
+        raise ValueError(f"{fmt} files require the 'pyarrow' package")
+
+
+def _probe(path: str, fmt: str) -> None:
+    """Відкриває контейнер: schema Parquet/Arrow, перший блок gzip/zstd (кидає помилку бібліотеки)"""
+    if fmt.startswith("csv"):
+        if fmt != "csv":
+            with _open_binary(path, fmt) as f:
+                if not f.read(PROBE_BYTES):
+                    raise EOFError("no data after decompression")
+        return
+    import pyarrow as pa
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.read_schema(path)
+    elif fmt == "arrow":
+        with pa.memory_map(path, "r") as source:
+            pa.ipc.open_file(source).schema
+    else:
+        with pa.memory_map(path, "r") as source:
+            pa.ipc.open_stream(source).schema
+
+
+def check_supported(path: str) -> str:
+    """
+    Формат файлу для upload; ValueError, якщо для нього не встановлена опційна залежність
+    або файл не відкривається (пошкоджений/обрізаний Parquet, Arrow, gzip, zstd).
+    """
+    fmt = detect_format(path)
+    _require(fmt)
+    try:
+        _probe(path, fmt)
+    except Exception as e: # ArrowInvalid, BadGzipFile, EOFError, zlib.error, ZstdError... - файл не читається
+        raise ValueError(f"Cannot read {fmt} file: {e}") from e
+    return fmt
+
+
+def _open_binary(path: str, fmt: str) -> io.BufferedIOBase:
+    """Розпакований байтовий потік стиснутого CSV"""
+    if fmt == "csv.gz":
+        return gzip.open(path, "rb")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+def _open_text(path: str, fmt: str) -> io.TextIOBase:
+    """Текстовий потік CSV; стиснуті файли розпаковуються потоково (без копії на диску)"""
+    if fmt == "csv.gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="ignore", newline="")
+    if fmt == "csv.zst":
+        return io.TextIOWrapper(_open_binary(path, fmt), encoding="utf-8", errors="ignore", newline="")
+    return open(path, "r", encoding="utf-8", errors="ignore", newline="")
+
+
+def _strings(arr: Any) -> List[str]:
+    """Колонка Arrow -> рядки, як у CSV (null -> ""); cast на рівні Arrow, Python - лише для складних типів"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    try:
+        return pc.fill_null(pc.cast(arr, pa.string()), "").to_pylist()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return ["" if v is None else str(v) for v in arr.to_pylist()]
+
+
+def _batch_rows(batches: Iterable[Any], select: Optional[List[str]] = None) -> Iterator[List[str]]:
+    """Record batch-і -> рядки; select - які колонки взяти з batch (None - усі, в порядку файлу)"""
+    for batch in batches:
+        arrays = batch.columns if select is None else [batch.column(batch.schema.get_field_index(n)) for n in select]
+        yield from map(list, zip(*map(_strings, arrays)))
+
+
+def _pruned(names: List[str], columns: Optional[Sequence[str]]) -> List[str]:
+    """Потрібні колонки в порядку файлу (невідомі ігноруються, як відсутні в header)"""
+    if columns is None:
+        return names
+    wanted = set(columns)
+    return [n for n in dict.fromkeys(names) if n in wanted]
+
+
+@contextmanager
+def open_rows(path: str, columns: Optional[Sequence[str]] = None) -> Iterator[Tuple[List[str], Rows]]:
+    """
+    Активний датасет як (header, рядки-списки рядків) - як csv.reader для будь-якого формату,
+    але без порожніх рядків (скани й ліміти рахують лише рядки даних, як DictReader).
+    columns - які колонки потрібні: Parquet/Arrow читають лише їх (header теж лише з них),
+    CSV все одно розбирається цілим рядком і повертає всі колонки.
+    """
+    fmt = detect_format(path)
+    _require(fmt)
+    if fmt.startswith("csv"):
+        with _open_text(path, fmt) as f:
+            reader = csv.reader(f)
+            header = next(reader, None) or []
+            yield header, filter(None, reader) # порожні рядки ([]) пропускаються, як у DictReader
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if fmt == "parquet":
+        with open(path, "rb") as f:
+            pf = pq.ParquetFile(f)
+            names = _pruned(pf.schema_arrow.names, columns)
+            # Parquet: читаються лише column chunk-и потрібних колонок
+            batches = pf.iter_batches(batch_size=ARROW_BATCH_ROWS, columns=names) if names else ()
+            yield names, _batch_rows(batches) # iter_batches уже повертає лише names
+        return
+
+    # Arrow IPC через memory map: сторінки непотрібних колонок не читаються з диска
+    with pa.memory_map(path, "r") as source:
+        if fmt == "arrow":
+            reader = pa.ipc.open_file(source)
+            batches: Iterable[Any] = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        else:
+            reader = pa.ipc.open_stream(source)
+            batches = reader
+        names = _pruned(reader.schema.names, columns)
+        yield names, _batch_rows(batches if names else (), None if columns is None else names)
+
+
+def iter_dicts(header: List[str], rows: Rows) -> Iterator[Dict[Any, Any]]:
+    """Те саме, що csv.DictReader: порожні рядки пропускаються, бракує значень -> None, зайві -> ключ None"""
+    width = len(header)
+    for row in rows:
+        if not row:
+            continue
+        d = dict(zip(header, row))
+        n = len(row)
+        if n < width:
+            for key in header[n:]:
+                d[key] = None
+        elif n > width:
+            d[None] = row[width:]
+        yield d
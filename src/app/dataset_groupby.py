@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import time
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .dataset_formats import open_rows
+from .dataset_service import NA_TOKENS, STATE, _quantile, _try_float, get_current_path
+from .dataset_store import current_store
+from .metrics import record_scan
+
+GROUPBY_MAX_GROUPS = 10000 # максимум різних груп у пам'яті; решта рахується в OTHER_KEY
+GROUPBY_RESERVOIR = 2048 # розмір reservoir sample на групу (для медіани)
+GROUPBY_MAX_BY = 2 # групування по одній або двох колонках
+DEFAULT_TRIM_CAP = 2000 # як в інших функціях dataset_service: default датасет - перші 2000 рядків
+
+MISSING_KEY = "(missing)" # пропуск у колонці групування
+OTHER_KEY = "(other)" # групи понад GROUPBY_MAX_GROUPS
+
+_NAN = math.nan
+
+
+# стан групи в гарячому циклі - список (швидше за атрибути об'єкта)
+_ROWS, _COUNT, _SUM, _MIN, _MAX, _SAMPLE, _NEXT, _W = range(8)
+
+
+def _new_group() -> List[Any]:
+    return [0, 0, 0.0, math.inf, -math.inf, [], 0, 1.0]
+
+
+def _reservoir_skip(g: List[Any], rnd: random.Random, reservoir: int) -> None:
+    """
+    Reservoir sample (Algorithm L): після заповнення sample заміна відбувається лише
+    на рядку _NEXT, тож random викликається O(k·log(n/k)) разів, а не на кожне значення.
+    """
+    g[_W] *= math.exp(math.log(rnd.random()) / reservoir)
+    g[_NEXT] += int(math.log(rnd.random()) / math.log(1 - g[_W])) + 1
+
+
+def _group_dict(keys: Sequence[str], g: List[Any]) -> Dict[str, Any]:
+    has = g[_COUNT] > 0
+    return {
+        "keys": list(keys),
+        "rows": g[_ROWS], # рядків у групі (разом з пропусками значення)
+        "count": g[_COUNT], # числових значень
+        "sum": g[_SUM] if has else None,
+        "mean": g[_SUM] / g[_COUNT] if has else None,
+        "min": g[_MIN] if has else None,
+        "max": g[_MAX] if has else None,
+        "median": _quantile(sorted(g[_SAMPLE]), 0.5) if has else None,
+        "median_exact": len(g[_SAMPLE]) == g[_COUNT], # False - оцінка з reservoir sample
+    }
+
+
+def _merge(into: List[Any], g: List[Any], rnd: random.Random, reservoir: int) -> None:
+    """Злиття груп з однаковим ключем після нормалізації ("a" / " a ")"""
+    into[_ROWS] += g[_ROWS]
+    into[_SUM] += g[_SUM]
+    into[_MIN] = min(into[_MIN], g[_MIN])
+    into[_MAX] = max(into[_MAX], g[_MAX])
+    merged = into[_SAMPLE] + g[_SAMPLE]
+    into[_COUNT] += g[_COUNT]
+    into[_SAMPLE] = merged if len(merged) <= reservoir else rnd.sample(merged, reservoir)
+
+
+def _label(raw: str) -> str:
+    s = raw.strip()
+    return MISSING_KEY if s.lower() in NA_TOKENS else s
+
+
+def _csv_pairs(rows: Iterable[List[str]], key_of: Callable[[List[str]], Any], vi: int, width: int) -> Iterator[Tuple[Any, float]]:
+    """Рядки CSV -> (сирий ключ, значення); пропуск або не число -> NaN"""
+    for r in rows:
+        if len(r) < width:
+            r = r + [""] * (width - len(r)) # короткий рядок - решта пропуски
+        raw = r[vi]
+        try:
+            v = float(raw) # швидкий шлях для звичайних чисел
+        except ValueError:
+            v = _try_float(raw) # $, %, коми, NA
+            if v is None:
+                v = _NAN
+        else:
+            if v - v != 0.0: # nan / inf - як у _try_float (пропуск або сміття)
+                v = _try_float(raw)
+                if v is None:
+                    v = _NAN
+        yield key_of(r), v
+
+
+def _aggregate(
+    pairs: Iterable[Tuple[Any, float]],
+    max_groups: int,
+    reservoir: int,
+    rnd: random.Random,
+) -> Tuple[Dict[Any, List[Any]], Optional[List[Any]], int]:
+    """Один прохід по (ключ, значення): стани груп, група OTHER_KEY (або None) і кількість рядків"""
+    groups: Dict[Any, List[Any]] = {} # сирий ключ -> стан групи (нормалізація ключів - після проходу)
+    other: Optional[List[Any]] = None
+    rows = 0
+    for key, v in pairs:
+        rows += 1
+        g = groups.get(key)
+        if g is None:
+            if len(groups) < max_groups:
+                g = groups[key] = _new_group()
+            else:
+                if other is None:
+                    other = _new_group()
+                g = other
+        g[_ROWS] += 1
+        if v != v: # NaN - пропуск або не число
+            continue
+
+        c = g[_COUNT] = g[_COUNT] + 1
+        g[_SUM] += v
+        if v < g[_MIN]:
+            g[_MIN] = v
+        if v > g[_MAX]:
+            g[_MAX] = v
+        if c <= reservoir:
+            g[_SAMPLE].append(v)
+            if c == reservoir:
+                g[_NEXT] = c
+                _reservoir_skip(g, rnd, reservoir)
+        elif c == g[_NEXT]:
+            g[_SAMPLE][rnd.randrange(reservoir)] = v
+            _reservoir_skip(g, rnd, reservoir)
+    return groups, other, rows
+
+
+def group_by(
+    value: str,
+    by: Sequence[str],
+    limit: int = 100,
+    sort: str = "count",
+    max_groups: int = GROUPBY_MAX_GROUPS,
+    reservoir: int = GROUPBY_RESERVOIR,
+) -> Dict[str, Any]:
+    """
+    Hash-агрегація числової колонки value по 1-2 категоріальних колонках за один прохід:
+    count, sum, mean, min, max, median.
+    Пам'ять обмежена: не більше max_groups груп (нові ключі понад ліміт -> OTHER_KEY)
+    і не більше reservoir значень на групу для медіани.
+    sort: count | sum | mean | key; повертаються перші limit груп.
+    """
+    if not 1 <= len(by) <= GROUPBY_MAX_BY:
+        raise ValueError(f"Group by one or two columns (got {len(by)})")
+    if sort not in ("count", "sum", "mean", "key"):
+        raise ValueError("sort must be one of: count, sum, mean, key")
+
+    path = get_current_path()
+    hard_cap = DEFAULT_TRIM_CAP if STATE.mode == "default" else None
+    rnd = random.Random(0) # детерміновано: однаковий файл -> однакова відповідь (кеш/ETag)
+
+    t0 = time.perf_counter()
+    store = current_store()
+    codes = store.group_keys(by) if store is not None else None
+    values = store.numeric(value) if codes is not None else None
+    if codes is not None and values is not None:
+        # словникові колонки зі сховища: ключ - ціле число, значення вже float (NaN - пропуск)
+        keys, raw_of = codes
+        groups, other, rows = _aggregate(zip(keys, values), max_groups, reservoir, rnd)
+        record_scan("groupby_codes", rows, time.perf_counter() - t0)
+    else:
+        # рядки-списки + індекси замість DictReader: без dict на рядок; Parquet/Arrow - лише ці колонки
+        with open_rows(path, [value, *by]) as (header, reader):
+            index = {name: i for i, name in enumerate(header)}
+            missing_cols = [c for c in [value, *by] if c not in index]
+            if missing_cols:
+                raise ValueError(f"Unknown column(s): {', '.join(missing_cols)}")
+            vi = index[value]
+            ki = [index[c] for c in by]
+            width = max([vi, *ki]) + 1
+            key_of = itemgetter(*ki) # один індекс -> рядок, два -> tuple (без listcomp на рядок)
+            source = reader if hard_cap is None else itertools.islice(reader, hard_cap)
+            groups, other, rows = _aggregate(_csv_pairs(source, key_of, vi, width), max_groups, reservoir, rnd)
+        record_scan("groupby", rows, time.perf_counter() - t0)
+        raw_of = (lambda k: (k,)) if len(by) == 1 else tuple
+
+    # нормалізація ключів: пробіли, NA-токени -> MISSING_KEY; однакові після нормалізації - зливаються
+    merged: Dict[Tuple[str, ...], List[Any]] = {}
+    for raw_key, g in groups.items():
+        key = tuple(map(_label, raw_of(raw_key)))
+        if key in merged:
+            _merge(merged[key], g, rnd, reservoir)
+        else:
+            merged[key] = g
+
+    items = list(merged.items())
+    if sort == "key":
+        items.sort(key=lambda kg: kg[0])
+    elif sort == "count":
+        items.sort(key=lambda kg: (-kg[1][_COUNT], -kg[1][_ROWS]))
+    elif sort == "sum":
+        items.sort(key=lambda kg: kg[1][_SUM], reverse=True)
+    else:
+        items.sort(key=lambda kg: kg[1][_SUM] / kg[1][_COUNT] if kg[1][_COUNT] else -math.inf, reverse=True)
+
+    return {
+        "value": value,
+        "by": list(by),
+        "sort": sort,
+        "rows_scanned": rows,
+        "group_count": len(merged), # різних груп (без OTHER_KEY)
+        "groups": [_group_dict(k, g) for k, g in items[:limit]],
+        "truncated": other is not None, # були ключі понад max_groups
+        "other": _group_dict([OTHER_KEY] * len(by), other) if other is not None else None,
+        "max_groups": max_groups,
+        "reservoir": reservoir,
+    }
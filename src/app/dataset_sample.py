@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dataset_formats import open_rows
+from .dataset_service import STATE, _is_missing, _quantile, _stats, _try_float, get_current_path, get_dataset_version
+from .jsonresp import dumps
+from .metrics import record_scan
+from .uploads import UPLOADS
+from .workers import BackgroundBuilds
+
+SAMPLE_ROWS = 10000 # розмір вибірки: частки оцінюються з точністю ~±1% (95%)
+SAMPLE_CONFIDENCE = 0.95
+Z = 1.959963984540054 # квантиль N(0, 1) для 95%
+DEFAULT_TRIM_CAP = 2000 # default датасет - перші 2000 рядків (вибірка = весь датасет)
+SAMPLES_IN_MEMORY = 4 # останні версії датасету, для яких вибірка тримається в пам'яті
+HIST_BINS = 12 # як buildHistogramBins у dataset.js
+
+
+@dataclass(frozen=True)
+class RowSample:
+    """Рівномірна вибірка рядків з усього файлу + точна кількість рядків"""
+    header: List[str]
+    rows: List[List[str]]
+    total_rows: int
+
+    @property
+    def exact(self) -> bool:
+        return len(self.rows) == self.total_rows # файл менший за вибірку - відповіді точні
+
+    def column(self, name: str) -> List[str]:
+        """Значення колонки у вибірці; як і в dataset_service, невідома колонка - усі значення порожні"""
+        i = self.header.index(name) if name in self.header else len(self.header)
+        return [r[i] if i < len(r) else "" for r in self.rows]
+
+
+def build_sample(path: str, size: int = SAMPLE_ROWS, hard_cap: Optional[int] = None, seed: int = 0) -> RowSample:
+    """
+    Один прохід по файлу: reservoir sample рядків (Algorithm L - random лише при заміні)
+    і точний лічильник рядків. Пам'ять - size рядків незалежно від розміру файлу.
+    """
+    rnd = random.Random(seed) # детерміновано: той самий файл -> та сама вибірка
+    rows: List[List[str]] = []
+    total = 0
+    t0 = time.perf_counter()
+    with open_rows(path) as (header, reader):
+        for r in reader:
+            if hard_cap is not None and total >= hard_cap:
+                break
+            total += 1
+            if total <= size:
+                rows.append(r)
+                if total == size:
+                    w = math.exp(math.log(rnd.random()) / size)
+                    nxt = total + int(math.log(rnd.random()) / math.log(1 - w)) + 1
+            elif total == nxt:
+                rows[rnd.randrange(size)] = r
+                w *= math.exp(math.log(rnd.random()) / size)
+                nxt += int(math.log(rnd.random()) / math.log(1 - w)) + 1
+    record_scan("sample", total, time.perf_counter() - t0)
+    return RowSample(header=header, rows=rows, total_rows=total)
+
+
+# вибірки: пам'ять -> артефакт на диску (upload) -> побудова (у фоні після upload)
+_SAMPLES = BackgroundBuilds("dataset-sample", keep=SAMPLES_IN_MEMORY)
+
+
+def _load_or_build(path: str, sha256: str, hard_cap: Optional[int]) -> RowSample:
+    if sha256:
+        body = UPLOADS.load_artifact(sha256, f"sample-{SAMPLE_ROWS}")
+        if body is not None:
+            data = json.loads(body)
+            return RowSample(header=data["header"], rows=data["rows"], total_rows=data["total_rows"])
+    sample = build_sample(path, hard_cap=hard_cap)
+    if sha256:
+        UPLOADS.save_artifact(sha256, f"sample-{SAMPLE_ROWS}", dumps({
+            "header": sample.header, "rows": sample.rows, "total_rows": sample.total_rows,
+        }))
+    return sample
+
+
+def _build_args() -> Tuple[str, str, Optional[int]]:
+    sha = STATE.sha256 if STATE.mode == "upload" else ""
+    hard_cap = DEFAULT_TRIM_CAP if STATE.mode == "default" else None
+    return get_current_path(), sha, hard_cap
+
+
+def start_sample() -> None:
+    """Запуск побудови вибірки для активного датасету у фоні (викликається після upload)"""
+    _SAMPLES.submit(get_dataset_version(), _load_or_build, *_build_args())
+
+
+def get_sample() -> RowSample:
+    """Вибірка активного датасету; якщо ще будується - чекаємо той самий прохід, а не запускаємо другий"""
+    return _SAMPLES.get(get_dataset_version(), _load_or_build, *_build_args())
+
+
+# довірчі інтервали
+def _fpc(n: int, total: int) -> float:
+    """Поправка на скінченну сукупність: вибірка = весь файл -> інтервал нульової ширини"""
+    return math.sqrt((total - n) / (total - 1)) if total > 1 and n < total else 0.0
+
+
+def _prop_ci(c: int, n: int, fpc: float) -> List[float]:
+    """Інтервал Wilson для частки c/n (з поправкою fpc)"""
+    if n == 0:
+        return [0.0, 0.0]
+    p = c / n
+    if fpc == 0.0:
+        return [p, p]
+    z2n = Z * Z * fpc * fpc / n
+    center = (p + z2n / 2) / (1 + z2n)
+    half = Z * fpc * math.sqrt(p * (1 - p) / n + z2n / (4 * n)) / (1 + z2n)
+    return [max(0.0, center - half), min(1.0, center + half)]
+
+
+def _count_ci(c: int, n: int, total: int) -> Tuple[int, List[int]]:
+    """Оцінка кількості рядків у файлі за c з n у вибірці: (оцінка, [низ, верх])"""
+    if n == 0:
+        return 0, [0, 0]
+    est = round(c / n * total)
+    fpc = _fpc(n, total)
+    if fpc == 0.0: # вибірка - весь файл: floor/ceil від p * total дали б [est - 1, est] через округлення float
+        return est, [est, est]
+    lo, hi = _prop_ci(c, n, fpc)
+    return est, [math.floor(lo * total), math.ceil(hi * total)]
+
+
+def _quantile_ci(sorted_vals: List[float], q: float, fpc: float) -> List[Optional[float]]:
+    """Інтервал для квантиля без припущень про розподіл: порядкові статистики навколо рангу n*q"""
+    n = len(sorted_vals)
+    if n == 0:
+        return [None, None]
+    half = Z * math.sqrt(n * q * (1 - q)) * fpc
+    lo = max(0, int(math.floor(n * q - half)) - 1)
+    hi = min(n - 1, int(math.ceil(n * q + half)))
+    if fpc == 0.0:
+        v = _quantile(sorted_vals, q)
+        return [v, v]
+    return [float(sorted_vals[lo]), float(sorted_vals[hi])]
+
+
+def _meta(sample: RowSample) -> Dict[str, Any]:
+    return {
+        "sample_rows": len(sample.rows),
+        "total_rows": sample.total_rows,
+        "exact": sample.exact,
+        "confidence": SAMPLE_CONFIDENCE,
+    }
+
+
+def approx_column_stats(name: str) -> Dict[str, Any]:
+    """get_column_stats з вибірки: ті самі поля (кількості - оцінки на весь файл) + approx.ci"""
+    sample = get_sample()
+    raw = sample.column(name)
+    n, total = len(raw), sample.total_rows
+    vals: List[float] = []
+    missing = unparsable = 0
+    for v in raw:
+        if _is_missing(v):
+            missing += 1
+            continue
+        fv = _try_float(v)
+        if fv is None:
+            unparsable += 1
+            continue
+        vals.append(fv)
+
+    fpc = _fpc(n, total)
+    s = _stats(vals)
+    missing_est, missing_ci = _count_ci(missing, n, total)
+    unparsable_est, unparsable_ci = _count_ci(unparsable, n, total)
+    parsed_est, parsed_ci = _count_ci(len(vals), n, total)
+    non_missing = n - missing
+    parse_ratio = len(vals) / non_missing if non_missing else 0.0
+
+    ci: Dict[str, Any] = {
+        "missing_count": missing_ci,
+        "unparsable_count": unparsable_ci,
+        "parsed_count": parsed_ci,
+        "parse_ratio": _prop_ci(len(vals), non_missing, fpc), # частка серед непорожніх
+    }
+    if vals:
+        ordered = sorted(vals)
+        sem = Z * (s["std"] or 0.0) / math.sqrt(len(vals)) * fpc
+        ci["avg"] = [s["avg"] - sem, s["avg"] + sem]
+        ci["median"] = _quantile_ci(ordered, 0.5, fpc)
+        ci["q1"] = _quantile_ci(ordered, 0.25, fpc)
+        ci["q3"] = _quantile_ci(ordered, 0.75, fpc)
+
+    return {
+        "name": name,
+        "rows_scanned": n,
+        "missing_count": missing_est,
+        "unparsable_count": unparsable_est,
+        "parsed_count": parsed_est,
+        "parse_ratio": parse_ratio,
+        "stats": s, # min/max - вибіркові (для всього файлу діапазон може бути ширшим)
+        "parsing_note": "Approximate: computed on a uniform random sample of rows; counts are scaled to the whole file.",
+        "approx": _meta(sample) | {"ci": ci},
+    }
+
+
+def approx_top_values(name: str, limit: int = 10) -> Dict[str, Any]:
+    """Top-N з вибірки: оцінка кількості у файлі + інтервал для кожного значення"""
+    sample = get_sample()
+    n, total = len(sample.rows), sample.total_rows
+    cnt: Counter = Counter()
+    for v in sample.column(name):
+        if _is_missing(v):
+            continue
+        s = str(v).strip()
+        if s:
+            cnt[s] += 1
+    labels: List[str] = []
+    counts: List[int] = []
+    ci: List[List[int]] = []
+    for label, c in cnt.most_common(limit):
+        est, interval = _count_ci(c, n, total)
+        labels.append(label)
+        counts.append(est)
+        ci.append(interval)
+    return {"name": name, "labels": labels, "counts": counts, "approx": _meta(sample) | {"ci": ci}}
+
+
+def approx_column_values(name: str, limit: int = 5000) -> Dict[str, Any]:
+    """
+    Значення колонки з вибірки (рівномірно з усього файлу, а не перші рядки)
+    + гістограма з оцінкою кількості в кожному біні для всього файлу.
+    """
+    sample = get_sample()
+    n, total = len(sample.rows), sample.total_rows
+    values = [v for v in sample.column(name) if not _is_missing(v)]
+
+    nums = [x for x in (_try_float(v) for v in values) if x is not None]
+    hist: Dict[str, Any] = {"labels": [], "counts": [], "ci": []}
+    if nums:
+        mn, mx = min(nums), max(nums)
+        bins = 1 if mn == mx else HIST_BINS
+        step = (mx - mn) / bins if bins > 1 else 0.0
+        raw_counts = [0] * bins
+        for x in nums:
+            i = min(bins - 1, max(0, int((x - mn) / step))) if step else 0
+            raw_counts[i] += 1
+        for i, c in enumerate(raw_counts):
+            est, interval = _count_ci(c, n, total)
+            if bins == 1:
+                hist["labels"].append(f"{mn}")
+            else:
+                hist["labels"].append(f"{mn + i * step:.0f}-{mn + (i + 1) * step:.0f}")
+            hist["counts"].append(est)
+            hist["ci"].append(interval)
+
+    return {"name": name, "values": values[:limit], "histogram": hist, "approx": _meta(sample)}
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import csv
 import os
 import re
+import time
+from operator import itemgetter
 from collections import Counter
 from statistics import mean, median, pstdev
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterator, List, Tuple, Optional
+
+from .dataset_formats import iter_dicts, open_rows
+from .metrics import record_scan
 
 
 DEFAULT_DATASET_FILENAME = "marketing_sample_for_ebay_com-ebay_com_product_details.csv"
@@ -23,6 +27,8 @@ class DatasetState:
     def __init__(self) -> None:
         self.mode = "default" # режим: default | upload
         self.path = DEFAULT_DATASET_FILENAME # шлях до активного файлу
+        self.sha256 = "" # хеш вмісту для upload (content-addressed сховище)
+        self.display_name = "" # ім'я файлу, яке дав користувач
 
 
 STATE = DatasetState() # глобальний стан датасету
@@ -41,15 +47,33 @@ def get_mode_text() -> str:
         return "Default dataset (прев'ю обмежено першими рядками, усього 2000 рядків)"
     return "User uploaded dataset (full file, NOT trimmed)"
 
-def set_uploaded_path(path: str) -> None:
+def get_dataset_version() -> str:
+    """
+    Версія активного датасету (режим + шлях + розмір + mtime).
+    Змінюється при upload/перезаписі файлу - нею ключуються кеші відповідей.
+    """
+    if STATE.mode == "upload" and STATE.sha256:
+        return f"upload:sha256:{STATE.sha256}" # вміст незмінний - версія стабільна між upload-ами
+    path = get_current_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"{STATE.mode}:{path}:missing"
+    return f"{STATE.mode}:{path}:{st.st_size}:{st.st_mtime_ns}"
+
+def set_uploaded_path(path: str, sha256: str = "", display_name: str = "") -> None:
     """Перемикає режим на upload і зберігає шлях до завантаженого файлу"""
     STATE.mode = "upload"
     STATE.path = path
+    STATE.sha256 = sha256
+    STATE.display_name = display_name
 
 def set_default() -> None:
     """Повертає режим на default"""
     STATE.mode = "default"
     STATE.path = DEFAULT_DATASET_FILENAME
+    STATE.sha256 = ""
+    STATE.display_name = ""
 
 _number_cleanup_re = re.compile(r"[,\s]") # прибрати коми/пробіли
 _keep_num_chars_re = re.compile(r"[^0-9\.\-]") # залишити тільки цифри
@@ -65,6 +89,7 @@ def _try_float(x: Any) -> Optional[float]:
     """
     Надійний парсер чисел:
     - пропуски None
+    - звичайні числа (у т.ч. 1e2) - як float(), так само, як швидкі шляхи groupby/corr/store
     - прибирає коми/пробіли
     - прибирає валюту/%
     """
@@ -72,6 +97,13 @@ def _try_float(x: Any) -> Optional[float]:
         return None
 
     s = str(x).strip()
+    try:
+        v = float(s)
+    except ValueError:
+        pass
+    else:
+        if v - v == 0.0: # не nan / inf
+            return v
     s = _number_cleanup_re.sub("", s) # прибрати , та пробіли
     s = _keep_num_chars_re.sub("", s) # прибрати всі нечислові символи
 
@@ -140,9 +172,9 @@ def read_preview(offset: int = 0, limit: int = 50) -> Dict[str, Any]:
     rows: List[Dict[str, Any]] = []
     cols: List[str] = []
 
-    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
-        reader = csv.DictReader(f)
-        cols = reader.fieldnames or []
+    t0 = time.perf_counter()
+    with open_rows(path) as (cols, raw_rows):
+        reader = iter_dicts(cols, raw_rows)
 
         i = 0
         for r in reader:
@@ -155,6 +187,7 @@ def read_preview(offset: int = 0, limit: int = 50) -> Dict[str, Any]:
 
             i += 1
 
+    record_scan("preview", i, time.perf_counter() - t0)
     return {"columns": cols, "rows": rows, "offset": offset, "limit": limit}
 
 
@@ -164,9 +197,9 @@ def compute_summary() -> Dict[str, Any]:
     is_default = (STATE.mode == "default")
     hard_cap = 2000 if is_default else None  # обрізання для default
 
-    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
-        reader = csv.DictReader(f)
-        cols = reader.fieldnames or []
+    t0 = time.perf_counter()
+    with open_rows(path) as (cols, raw_rows):
+        reader = iter_dicts(cols, raw_rows)
 
         row_count = 0
         missing = Counter() # кількість пропусків по колонках
@@ -215,8 +248,9 @@ def compute_summary() -> Dict[str, Any]:
             else:
                 categorical_cols.append(c)
 
+    record_scan("summary", row_count, time.perf_counter() - t0)
     return {
-        "dataset_name": os.path.basename(path), # ім'я файлу
+        "dataset_name": STATE.display_name or os.path.basename(path), # ім'я файлу
         "mode": STATE.mode, # default/upload
         "mode_text": get_mode_text(), # текст для UI
         "row_count": row_count, # скільки рядків проскановано
@@ -230,6 +264,42 @@ def compute_summary() -> Dict[str, Any]:
         "parsing_note": "Numbers are parsed by treating NA/N/A/null/empty/'-' as missing; removing commas/spaces and symbols like $ and %.",
     }
 
+def export_columns(columns: Optional[List[str]] = None) -> List[str]:
+    """Колонки для експорту: усі або columns (у заданому порядку); невідома колонка -> ValueError"""
+    with open_rows(get_current_path(), columns or None) as (header, _):
+        pass
+    if not columns:
+        return header
+    unknown = [c for c in columns if c not in header]
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+    return list(columns)
+
+
+def iter_export_rows(columns: List[str]) -> Iterator[List[str]]:
+    """Рядки активного датасету (значення columns, пропущені в кінці рядка -> ""), з cap для default"""
+    path = get_current_path()
+    hard_cap = 2000 if STATE.mode == "default" else None
+    i = 0
+    t0 = time.perf_counter()
+    with open_rows(path, columns) as (header, raw_rows):
+        if not columns:
+            return
+        idx = [header.index(c) for c in columns]
+        width = len(header)
+        get = itemgetter(*idx) if len(idx) > 1 else (lambda r, j=idx[0]: (r[j],))
+        for r in raw_rows:
+            if hard_cap is not None and i >= hard_cap:
+                break
+            if not r:
+                continue # порожній рядок - як у DictReader
+            i += 1
+            if len(r) < width:
+                r = r + [""] * (width - len(r)) # короткий рядок - решта пропуски
+            yield list(get(r))
+    record_scan("export", i, time.perf_counter() - t0)
+
+
 def get_column_values(name: str, limit: int = 5000) -> List[Any]:
     """Повертає значення однієї колонки (для гістограми), з cap для default"""
     path = get_current_path()
@@ -237,8 +307,9 @@ def get_column_values(name: str, limit: int = 5000) -> List[Any]:
     hard_cap = 2000 if is_default else None
 
     out: List[Any] = []
-    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
-        reader = csv.DictReader(f)
+    t0 = time.perf_counter()
+    with open_rows(path, [name]) as (cols, raw_rows): # Parquet/Arrow читають лише цю колонку
+        reader = iter_dicts(cols, raw_rows)
         i = 0
         for r in reader:
             if hard_cap is not None and i >= hard_cap:
@@ -250,6 +321,7 @@ def get_column_values(name: str, limit: int = 5000) -> List[Any]:
                     out.append(v)
             if len(out) >= limit:
                 break
+    record_scan("column", i, time.perf_counter() - t0)
     return out
 
 
@@ -260,8 +332,9 @@ def get_top_values(name: str, limit: int = 10) -> Tuple[List[str], List[int]]:
     hard_cap = 2000 if is_default else None
 
     cnt = Counter()
-    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
-        reader = csv.DictReader(f)
+    t0 = time.perf_counter()
+    with open_rows(path, [name]) as (cols, raw_rows): # Parquet/Arrow читають лише цю колонку
+        reader = iter_dicts(cols, raw_rows)
         i = 0
         for r in reader:
             if hard_cap is not None and i >= hard_cap:
@@ -274,6 +347,7 @@ def get_top_values(name: str, limit: int = 10) -> Tuple[List[str], List[int]]:
             if s:
                 cnt[s] += 1
 
+    record_scan("top", i, time.perf_counter() - t0)
     top = cnt.most_common(limit)
     labels = [k for k, _ in top]
     counts = [int(v) for _, v in top]
@@ -296,8 +370,9 @@ def get_column_stats(name: str, max_rows: int = 20000) -> Dict[str, Any]:
     unparsable_cnt = 0 # не парсяться як число
     seen = 0 # скільки рядків переглянули
 
-    with open(path, "r", encoding="utf-8", errors="ignore", newline="") as f:
-        reader = csv.DictReader(f)
+    t0 = time.perf_counter()
+    with open_rows(path, [name]) as (cols, raw_rows): # Parquet/Arrow читають лише цю колонку
+        reader = iter_dicts(cols, raw_rows)
         for r in reader:
             if hard_cap is not None and seen >= hard_cap:
                 break
@@ -316,6 +391,7 @@ def get_column_stats(name: str, max_rows: int = 20000) -> Dict[str, Any]:
                 continue
             vals.append(fv)
 
+    record_scan("colstats", seen, time.perf_counter() - t0)
     s = _stats(vals)
     non_missing = max(seen - missing_cnt, 0)
     parse_ratio = (len(vals) / non_missing) if non_missing else 0.0
@@ -328,5 +404,5 @@ def get_column_stats(name: str, max_rows: int = 20000) -> Dict[str, Any]:
         "parsed_count": len(vals),
         "parse_ratio": parse_ratio,
         "stats": s,
-        "parsing_note": "Parsing: treat NA/N/A/null/empty/'-' as missing; remove commas/spaces; remove symbols like $ and %; keep digits, dot, minus.",
+        "parsing_note": "Parsing: treat NA/N/A/null/empty/'-' as missing; plain numbers (incl. 1e2) as is; otherwise remove commas/spaces; remove symbols like $ and %; keep digits, dot, minus.",
     }
\ No newline at end of file
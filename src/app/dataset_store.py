@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import itertools
+import math
+import sys
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from operator import add, mul
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .dataset_corr import _parse
+from .dataset_formats import open_rows
+from .dataset_service import (
+    NUMERIC_THRESHOLD,
+    STATE,
+    _is_missing,
+    get_current_path,
+    get_dataset_version,
+    get_top_values,
+)
+from .metrics import record_scan
+from .workers import BackgroundBuilds
+
+DICT_MAX_DISTINCT = 65535 # коди - uint16; більше різних значень -> колонка не словникова
+# різних значень / рядків у першому chunk, понад яку колонка не словникова (числа -> float64, текст не зберігається):
+# код 2 Б/рядок + ~50 Б на кожне різне значення дешевші за 8 Б/рядок лише при низькій кардинальності
+DICT_MAX_RATIO = 0.1
+DICT_RATIO_MIN_ROWS = 1000 # на менших файлах пам'ять не важлива - словник для top/groupby
+INGEST_CHUNK_ROWS = 50000 # рядків за раз: колонки chunk-а кодуються map-ами на C-рівні
+MEASURE_ROWS = 1000 # рядків для оцінки пам'яті DictReader ("до")
+DEFAULT_TRIM_CAP = 2000 # default датасет - перші 2000 рядків
+STORES_IN_MEMORY = 2
+
+_NAN = math.nan
+
+
+@dataclass
+class DictColumn:
+    """Словникова колонка: коди рядків (uint16) + таблиця різних значень (код = індекс)"""
+    codes: array
+    dictionary: List[str]
+
+    def nbytes(self) -> int:
+        strings = sum(map(sys.getsizeof, self.dictionary)) + sys.getsizeof(self.dictionary)
+        return len(self.codes) * self.codes.itemsize + strings
+
+    def numbers(self) -> array:
+        """Значення як float (пропуск/не число -> NaN): кожне різне значення парситься один раз"""
+        table = [_NAN if (f := _parse(v)) is None else f for v in self.dictionary]
+        return array("d", map(table.__getitem__, self.codes))
+
+
+@dataclass
+class ColumnarTable:
+    """
+    Датасет у пам'яті по колонках: категорії - словникові (DictColumn), числа з великою
+    кількістю різних значень - array('d') (NaN - пропуск), текст з великою кардинальністю не зберігається.
+    """
+    header: List[str]
+    rows: int
+    dict_columns: Dict[str, DictColumn] = field(default_factory=dict)
+    numeric_columns: Dict[str, array] = field(default_factory=dict)
+    dropped: List[str] = field(default_factory=list)
+    dictreader_row_bytes: float = 0.0 # виміряно на перших MEASURE_ROWS рядках
+    build_seconds: float = 0.0
+
+    def numeric(self, name: str) -> Optional[array]:
+        if name in self.numeric_columns:
+            return self.numeric_columns[name]
+        col = self.dict_columns.get(name)
+        return col.numbers() if col is not None else None
+
+    def top_values(self, name: str, limit: int = 10) -> Optional[Tuple[List[str], List[int]]]:
+        """
+        get_top_values через підрахунок кодів (Counter по array на C-рівні) - ті самі мітки,
+        кількості й порядок (перша поява при рівних кількостях). None - колонка не словникова.
+        """
+        col = self.dict_columns.get(name)
+        if col is None:
+            return None
+        cnt: Counter = Counter()
+        for code, c in Counter(col.codes).items(): # порядок - перша поява в файлі
+            v = col.dictionary[code]
+            if _is_missing(v):
+                continue
+            s = v.strip()
+            if s:
+                cnt[s] += c
+        top = cnt.most_common(limit)
+        return [k for k, _ in top], [int(v) for _, v in top]
+
+    def group_keys(self, by: Sequence[str]) -> Optional[Tuple[Sequence[int], Callable[[int], Tuple[str, ...]]]]:
+        """
+        Ключі групування по словникових колонках: код (одна колонка) або code_a * len(dict_b) + code_b,
+        + функція ключ -> сирі значення. None - якщо якась колонка не словникова.
+        """
+        cols = [self.dict_columns.get(c) for c in by]
+        if any(c is None for c in cols):
+            return None
+        if len(cols) == 1:
+            d = cols[0].dictionary
+            return cols[0].codes, lambda k: (d[k],)
+        a, b = cols
+        width = len(b.dictionary)
+        keys = array("L", map(add, map(mul, a.codes, itertools.repeat(width)), b.codes))
+        return keys, lambda k: (a.dictionary[k // width], b.dictionary[k % width])
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Байт на рядок: DictReader (dict + рядки на кожен рядок) проти колонкового сховища"""
+        per_column: Dict[str, Any] = {}
+        total = 0
+        for name, col in self.dict_columns.items():
+            n = col.nbytes()
+            total += n
+            per_column[name] = {"encoding": "dictionary", "distinct": len(col.dictionary), "bytes": n}
+        for name, values in self.numeric_columns.items():
+            n = len(values) * values.itemsize
+            total += n
+            per_column[name] = {"encoding": "float64", "bytes": n}
+        for name in self.dropped:
+            per_column[name] = {"encoding": "not stored", "bytes": 0}
+        return {
+            "rows": self.rows,
+            "columns": per_column,
+            "bytes_total": total,
+            "bytes_per_row": total / self.rows if self.rows else 0.0,
+            "dictreader_bytes_per_row": self.dictreader_row_bytes,
+            "build_seconds": self.build_seconds,
+        }
+
+
+class _ColumnBuilder:
+    """Кодування однієї колонки chunk за chunk-ом; при переповненні словника - перехід на float або відмова"""
+
+    def __init__(self) -> None:
+        self.kind = "dict" # dict | numeric | dropped
+        self.index: Dict[str, int] = {}
+        self.dictionary: List[str] = []
+        self.codes = array("H")
+        self.values = array("d")
+        self.first = True
+
+    def add(self, col: Sequence[str]) -> None:
+        first, self.first = self.first, False
+        if self.kind == "dict":
+            new = set(col).difference(self.index)
+            if len(self.dictionary) + len(new) <= DICT_MAX_DISTINCT:
+                for v in new:
+                    self.index[v] = len(self.dictionary)
+                    self.dictionary.append(v)
+                self.codes.extend(map(self.index.__getitem__, col))
+                if first and len(col) >= DICT_RATIO_MIN_ROWS and len(self.dictionary) > DICT_MAX_RATIO * len(col):
+                    self._spill() # майже унікальна колонка - не чекаємо DICT_MAX_DISTINCT
+                return
+            self._spill()
+        if self.kind == "numeric":
+            table = {v: _NAN if (f := _parse(v)) is None else f for v in set(col)}
+            self.values.extend(map(table.__getitem__, col))
+
+    def _spill(self) -> None:
+        """Забагато різних значень: числова колонка (за NUMERIC_THRESHOLD серед різних непорожніх) -> float"""
+        parsed = [_parse(v) for v in self.dictionary]
+        present = [f for v, f in zip(self.dictionary, parsed) if not _is_missing(v)]
+        ok = sum(f is not None for f in present)
+        if present and ok / len(present) >= NUMERIC_THRESHOLD:
+            self.kind = "numeric"
+            table = [_NAN if f is None else f for f in parsed]
+            self.values = array("d", map(table.__getitem__, self.codes))
+        else:
+            self.kind = "dropped"
+        self.index, self.dictionary, self.codes = {}, [], array("H")
+
+
+def _dictreader_row_bytes(header: List[str], rows: List[List[str]]) -> float:
+    """Скільки пам'яті займає рядок, матеріалізований csv.DictReader (dict + об'єкти рядків)"""
+    if not rows:
+        return 0.0
+    total = 0
+    for r in rows:
+        d = dict(zip(header, r))
+        total += sys.getsizeof(d) + sum(map(sys.getsizeof, d.values()))
+    return total / len(rows)
+
+
+def build_store(path: str, hard_cap: Optional[int] = None) -> ColumnarTable:
+    """Один прохід по CSV: словникове кодування колонок chunk-ами (zip(*rows) -> колонки)"""
+    t0 = time.perf_counter()
+    rows = 0
+    with open_rows(path) as (header, reader):
+        width = len(header)
+        builders = [_ColumnBuilder() for _ in header]
+        measured = 0.0
+        source = reader if hard_cap is None else itertools.islice(reader, hard_cap)
+        while width:
+            chunk = list(itertools.islice(source, INGEST_CHUNK_ROWS))
+            if not chunk:
+                break
+            if rows == 0:
+                measured = _dictreader_row_bytes(header, chunk[:MEASURE_ROWS])
+            chunk = [r if len(r) == width else (r + [""] * width)[:width] for r in chunk]
+            for b, col in zip(builders, zip(*chunk)):
+                b.add(col)
+            rows += len(chunk)
+
+    table = ColumnarTable(header=header, rows=rows, dictreader_row_bytes=measured)
+    for name, b in zip(header, builders):
+        if name in table.dict_columns or name in table.numeric_columns:
+            continue # повторна назва колонки - як і header.index, беремо першу
+        if b.kind == "dict":
+            table.dict_columns[name] = DictColumn(codes=b.codes, dictionary=b.dictionary)
+        elif b.kind == "numeric":
+            table.numeric_columns[name] = b.values
+        else:
+            table.dropped.append(name)
+    table.build_seconds = time.perf_counter() - t0
+    record_scan("store", rows, table.build_seconds)
+    return table
+
+
+_STORES = BackgroundBuilds("dataset-store", keep=STORES_IN_MEMORY)
+
+
+def _build_args() -> Tuple[str, Optional[int]]:
+    hard_cap = DEFAULT_TRIM_CAP if STATE.mode == "default" else None
+    return get_current_path(), hard_cap
+
+
+def start_store() -> None:
+    """Запуск побудови колонкового сховища для активного датасету у фоні (після upload)"""
+    _STORES.submit(get_dataset_version(), build_store, *_build_args())
+
+
+def current_store() -> Optional[ColumnarTable]:
+    """
+    Готове сховище активного датасету або None - тоді запит іде по CSV. Побудова тут не запускається:
+    фоновий прохід у тому ж процесі ділив би GIL із самим запитом (start_store викликається після upload).
+    """
+    return _STORES.peek(get_dataset_version())
+
+
+def store_report() -> Dict[str, Any]:
+    """Звіт про пам'ять сховища; чекає побудову, якщо вона ще йде"""
+    return _STORES.get(get_dataset_version(), build_store, *_build_args()).memory_report()
+
+
+def top_values(name: str, limit: int = 10) -> Tuple[List[str], List[int]]:
+    """Top-N: по кодах, якщо сховище готове і колонка словникова, інакше - скан CSV"""
+    store = current_store()
+    if store is not None:
+        t0 = time.perf_counter()
+        top = store.top_values(name, limit)
+        if top is not None:
+            record_scan("top_codes", store.rows, time.perf_counter() - t0)
+            return top
+    return get_top_values(name=name, limit=limit)
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import base64
+import random
+import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
 
 from .config import Settings
+from .ratelimit import (
+    RETRY_STATUSES,
+    AdaptiveRateLimiter,
+    QueueTimeout,
+    RetryPolicy,
+    parse_retry_after,
+)
+from .metrics import TOKEN_REFRESHES, UPSTREAM_LATENCY, UPSTREAM_REQUESTS
+from .token_cache import FileTokenCache
 
 SCOPE = "https://api.ebay.com/oauth/api_scope"  # scope для client_credentials
+MAX_ITEMS_PER_LOOKUP = 20 # ліміт item_ids у getItems (Browse API)
 
 class EbayAPIError(RuntimeError):
     """Помилка роботи з eBay API"""
@@ -23,14 +35,98 @@ class Token:
 class EbayClient:
     """
     Клієнт eBay Browse API з OAuth (client_credentials) і кешуванням токена.
+    Токен оновлюється single-flight (один запит на процес, а зі спільним
+    файлом - на всі workers) і заздалегідь у фоні, до завершення терміну.
+    Усі виклики йдуть через адаптивний лімітер і повтори з backoff (див. _request).
     Підтримує:
       - search (item_summary/search)
       - get_item (item/{item_id}) для деталей товару
+      - get_items (item/?item_ids=...) для кількох товарів за один запит
     """
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
         self._token: Optional[Token] = None # кеш токена
+        self._token_lock = threading.Lock() # single-flight оновлення в межах процесу
+        self._token_file = FileTokenCache(settings.token_cache_file) if settings.token_cache_file else None
+        self._refresh_timer: Optional[threading.Timer] = None # фонове оновлення
+        self._refresh_ahead = 0.0 # за скільки с до завершення оновлює заплановане фонове оновлення
+        self.token_refreshes = 0 # скільки разів запитували новий токен у eBay
+        self.token_shared_hits = 0 # скільки разів взяли токен зі спільного файлу
+        self.limiter = AdaptiveRateLimiter(
+            rate=settings.rate_limit_rps,
+            burst=settings.rate_limit_burst,
+            daily_quota=settings.daily_quota,
+        )
+        self.retry = RetryPolicy(max_retries=settings.max_retries)
+        self.calls = 0 # скільки HTTP-викликів зроблено
+        self.retries = 0 # скільки з них були повторами
+        self._stats_lock = threading.Lock() # calls/retries оновлюються з потоків пулу
+
+    # HTTP
+    def _request(self, method: str, url: str, *, what: str, limited: bool = True, **kwargs: Any) -> requests.Response:
+        """
+        HTTP-запит до eBay через лімітер:
+          - чекає своєї черги і токена в AdaptiveRateLimiter (limited=False - повз лімітер:
+            OAuth токен не рахується в квоту Browse API, а його 429 не гальмує пошук)
+          - на 429/5xx і мережеві помилки повторює з backoff + jitter (поважає Retry-After)
+        Повертає відповідь з 2xx або кидає EbayAPIError.
+        """
+        attempt = 0
+        while True:
+            if limited:
+                try:
+                    self.limiter.acquire(timeout=self.settings.queue_timeout)
+                except QueueTimeout as e:
+                    raise EbayAPIError(f"{what} request was not sent: {e}") from e
+
+            with self._stats_lock:
+                self.calls += 1
+            t0 = time.perf_counter()
+            try:
+                r = requests.request(method, url, timeout=30, **kwargs)
+            except requests.RequestException as e:
+                UPSTREAM_LATENCY.observe(time.perf_counter() - t0, what=what)
+                UPSTREAM_REQUESTS.inc(what=what, status="error")
+                # мережева помилка / timeout - повторюємо без зміни швидкості
+                if attempt >= self.retry.max_retries:
+                    raise EbayAPIError(f"{what} request failed: {e}. Body: ") from e
+                retry_after = None
+            else:
+                UPSTREAM_LATENCY.observe(time.perf_counter() - t0, what=what)
+                UPSTREAM_REQUESTS.inc(what=what, status=str(r.status_code))
+                if r.status_code not in RETRY_STATUSES:
+                    try:
+                        r.raise_for_status()
+                    except requests.HTTPError as e:
+                        raise EbayAPIError(f"{what} request failed: {e}. Body: {r.text[:500]}") from e
+                    if limited:
+                        self.limiter.on_success()
+                    return r
+
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                if limited:
+                    self.limiter.on_throttle(retry_after) # 429/5xx - пригальмувати
+                if attempt >= self.retry.max_retries:
+                    raise EbayAPIError(
+                        f"{what} request failed: HTTP {r.status_code} after {attempt + 1} attempts. "
+                        f"Body: {r.text[:500]}"
+                    )
+
+            time.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+            with self._stats_lock:
+                self.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Стан клієнта: виклики, повтори, черга лімітера"""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "token_refreshes": self.token_refreshes,
+            "token_shared_hits": self.token_shared_hits,
+            "limiter": self.limiter.stats(),
+        }
 
     # OAuth
     def _basic_auth_header(self) -> str:
@@ -50,18 +146,9 @@ class EbayClient:
             "scope": SCOPE,
         }
 
+        r = self._request("POST", self.settings.oauth_token_url, what="Token", limited=False, headers=headers, data=data)
         try:
-            r = requests.post(self.settings.oauth_token_url, headers=headers, data=data, timeout=30)
-            r.raise_for_status()
             payload = r.json()  # очікування JSON
-        except requests.RequestException as e:
-            # якщо HTTP/timeout/error, додати шматок body у повідомлення
-            body = ""
-            try:
-                body = r.text[:500] # type: ignore[name-defined]
-            except Exception:
-                pass
-            raise EbayAPIError(f"Token request failed: {e}. Body: {body}") from e
         except ValueError as e:
             # якщо відповідь не JSON
             raise EbayAPIError("Token response was not valid JSON") from e
@@ -75,11 +162,84 @@ class EbayClient:
         expires_at = time.time() + int(expires_in) - 60  # оновлення на 60с раніше
         return Token(access_token=str(token), expires_at=expires_at)
 
+    def _token_key(self) -> str:
+        """Ключ токена у спільному файлі (щоб не взяти токен іншого env/app)"""
+        return f"{self.settings.api_base}|{self.settings.client_id}"
+
+    def _refresh_token(self, min_valid_for: float) -> Token:
+        """
+        Оновлення під lock: якщо інший потік/процес уже оновив токен,
+        і він дійсний ще хоча б min_valid_for секунд - беремо його.
+        """
+        with self._token_lock:
+            tok = self._token
+            if tok is not None and tok.expires_at - time.time() > min_valid_for:
+                return tok # хтось уже оновив, поки ми чекали lock
+
+            if self._token_file is None:
+                tok = self._fetch_token()
+                self.token_refreshes += 1
+                TOKEN_REFRESHES.inc()
+            else:
+                key = self._token_key()
+                with self._token_file.locked():
+                    shared = self._token_file.load(key)
+                    if shared and shared["expires_at"] - time.time() > min_valid_for:
+                        tok = Token(access_token=shared["access_token"], expires_at=float(shared["expires_at"]))
+                        self.token_shared_hits += 1
+                    else:
+                        tok = self._fetch_token()
+                        self.token_refreshes += 1
+                        TOKEN_REFRESHES.inc()
+                        try:
+                            self._token_file.store(key, tok.access_token, tok.expires_at)
+                        except OSError:
+                            pass # файл - лише оптимізація, токен у пам'яті вже є
+
+            self._token = tok
+            self._schedule_refresh(tok)
+            return tok
+
+    def _schedule_refresh(self, tok: Token) -> None:
+        """
+        Планує фонове оновлення за token_refresh_ahead секунд до завершення (з jitter), але не раніше
+        половини терміну токена: інакше короткий токен (expires_in <= ahead) одразу знову "застарілий",
+        і фонове оновлення запитувало б новий кожні кілька секунд
+        """
+        ahead = self.settings.token_refresh_ahead
+        if ahead <= 0:
+            return
+        remaining = tok.expires_at - time.time()
+        ahead = min(ahead, remaining / 2)
+        self._refresh_ahead = ahead
+        delay = remaining - ahead
+        delay = max(delay, 0.0) + random.uniform(0, min(30.0, max(ahead, 0.0) / 4)) # jitter між workers
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        timer = threading.Timer(delay, self._background_refresh)
+        timer.daemon = True
+        self._refresh_timer = timer
+        timer.start()
+
+    def _background_refresh(self) -> None:
+        """Фонове оновлення: запити не чекають на токен"""
+        try:
+            self._refresh_token(min_valid_for=self._refresh_ahead)
+        except EbayAPIError:
+            # не вдалося - наступний запит оновить синхронно; пробуємо ще раз пізніше
+            tok = self._token
+            if tok is not None and tok.expires_at > time.time():
+                timer = threading.Timer(min(60.0, max(tok.expires_at - time.time(), 1.0)), self._background_refresh)
+                timer.daemon = True
+                self._refresh_timer = timer
+                timer.start()
+
     def get_token(self) -> str:
         """Повертає кешований токен або отримує новий, якщо протермінований"""
-        if self._token is None or time.time() >= self._token.expires_at:
-            self._token = self._fetch_token()
-        return self._token.access_token
+        tok = self._token
+        if tok is None or time.time() >= tok.expires_at:
+            tok = self._refresh_token(min_valid_for=0.0)
+        return tok.access_token
 
     # Helpers
     def _auth_headers(self) -> Dict[str, str]:
@@ -94,11 +254,9 @@ class EbayClient:
         """
         Вибір host для Browse API за середовищем.
         Sandbox:    https://api.sandbox.ebay.com
+        EBAY_API_BASE (якщо задано) має пріоритет - напр. локальний fake-сервер.
         """
-        env = (getattr(self.settings, "ebay_env", "") or "").lower()
-        if env == "sandbox":
-            return "https://api.sandbox.ebay.com"
-        return "https://api.ebay.com"
+        return self.settings.api_base
 
     # Browse API
     def search(
@@ -122,18 +280,9 @@ class EbayClient:
         if filter_expr:
             params["filter"] = filter_expr
 
+        r = self._request("GET", self.settings.browse_search_url, what="Search", headers=headers, params=params)
         try:
-            r = requests.get(self.settings.browse_search_url, headers=headers, params=params, timeout=30)
-            r.raise_for_status()
             return r.json()
-        except requests.RequestException as e:
-            # фрагмент body, щоб бачити причину
-            body = ""
-            try:
-                body = r.text[:500]
-            except Exception:
-                pass
-            raise EbayAPIError(f"Search request failed: {e}. Body: {body}") from e
         except ValueError as e:
             raise EbayAPIError("Search response was not valid JSON") from e
 
@@ -152,16 +301,29 @@ class EbayClient:
         if fieldgroups:
             params["fieldgroups"] = fieldgroups # додаткові поля (якщо підтримуються)
 
+        r = self._request("GET", url, what="Get item", headers=headers, params=params)
+        try:
+            return r.json()
+        except ValueError as e:
+            raise EbayAPIError("Get item response was not valid JSON") from e
+
+    def get_items(self, *, item_ids: List[str]) -> Dict[str, Any]:
+        """
+        Деталі кількох товарів одним запитом (getItems):
+          GET /buy/browse/v1/item/?item_ids=id1,id2,...
+        Не більше MAX_ITEMS_PER_LOOKUP id за виклик.
+        """
+        if len(item_ids) > MAX_ITEMS_PER_LOOKUP:
+            raise ValueError(f"get_items accepts at most {MAX_ITEMS_PER_LOOKUP} item ids")
+
+        headers = self._auth_headers()
+
+        base = self._browse_base()
+        url = f"{base}/buy/browse/v1/item/"
+        params: Dict[str, Any] = {"item_ids": ",".join(item_ids)}
+
+        r = self._request("GET", url, what="Get items", headers=headers, params=params)
         try:
-            r = requests.get(url, headers=headers, params=params, timeout=30)
-            r.raise_for_status()
             return r.json()
-        except requests.RequestException as e:
-            body = ""
-            try:
-                body = r.text[:500]
-            except Exception:
-                pass
-            raise EbayAPIError(f"Get item request failed: {e}. Body: {body}") from e
         except ValueError as e:
-            raise EbayAPIError("Get item response was not valid JSON") from e
\ No newline at end of file
+            raise EbayAPIError("Get items response was not valid JSON") from e
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Sequence
 
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font
@@ -12,6 +12,9 @@ from openpyxl.chart import BarChart, Reference
 from openpyxl.chart.label import DataLabelList
 
 from .analytics import compute_analytics
+from .export_formats import ITEM_HEADERS, item_rows
+from .metrics import stage, timed
+from .transform import ItemSummary
 
 
 def _autosize_columns(ws) -> None:
@@ -26,24 +29,16 @@ def _autosize_columns(ws) -> None:
         ws.column_dimensions[get_column_letter(col_idx)].width = min(max(10, max_len + 2), 60)
 
 
-def _fmt_float(x: Optional[float]) -> Optional[float]:
-    """Безпечне перетворення в float (інакше None)"""
-    if x is None:
-        return None
-    try:
-        return float(x)
-    except Exception:
-        return None
-
-
+@timed("excel")
 def build_excel(
     *,
     query: str, # пошуковий запит
-    items: List[Dict[str, Any]], # нормалізовані товари
+    items: Sequence[ItemSummary], # нормалізовані товари
     total: int | None = None, # total з API
     limit: int | None = None, # limit з API
     offset: int | None = None, # offset з API
     sort: str | None = None, # сортування
+    filters: str | None = None, # фільтри eBay (filter= / category_ids)
 ) -> bytes:
     """Excel експорт: Items + Analytics + Charts"""
     wb = Workbook()
@@ -53,54 +48,16 @@ def build_excel(
     ws = wb.active
     ws.title = "Items"
 
-    headers = [
-        "#",
-        "Title",
-        "Category",
-        "Condition",
-        "Price Value",
-        "Price Currency",
-        "Shipping Value",
-        "Shipping Currency",
-        "Total (Price+Ship)",
-        "Currency",
-        "Country",
-        "Seller feedback",
-        "Item ID",
-        "Web URL",
-    ]
-    ws.append(headers)
+    ws.append(ITEM_HEADERS)
 
     # формат заголовків
     for cell in ws[1]:
         cell.font = header_font
         cell.alignment = Alignment(vertical="center", wrap_text=True)
 
-    # запис рядків товарів
-    for idx, it in enumerate(items or [], start=1):
-        pv = _fmt_float(it.get("price_value"))
-        sv = _fmt_float(it.get("shipping_value"))
-        cur = (it.get("price_currency") or it.get("shipping_currency") or "") or None # валюта
-        total_val = (pv or 0.0) + (sv or 0.0) if (pv is not None or sv is not None) else None # total
-
-        ws.append(
-            [
-                idx,
-                it.get("title"),
-                it.get("category"),
-                it.get("condition"),
-                pv,
-                it.get("price_currency"),
-                sv,
-                it.get("shipping_currency"),
-                total_val,
-                cur,
-                it.get("location_country"),
-                _fmt_float(it.get("seller_feedback")),
-                it.get("itemId"),
-                it.get("web_url"),
-            ]
-        )
+    # запис рядків товарів (ті самі рядки, що й у csv/parquet експорті)
+    for row in item_rows(items):
+        ws.append(row)
 
     # formats для числових колонок + вирівнювання
     for row in ws.iter_rows(min_row=2):
@@ -133,6 +90,7 @@ def build_excel(
         ("Generated at", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
         ("Query", query),
         ("Sort", sort or ""),
+        ("Filters", filters or ""),
         ("API total", total),
         ("Limit", limit),
         ("Offset", offset),
@@ -257,5 +215,6 @@ def build_excel(
     _autosize_columns(ws3) # підбір ширин для Charts
 
     bio = BytesIO() # запис xlsx в пам’ять
-    wb.save(bio)
+    with stage("excel_save"): # окремо: серіалізація openpyxl часто найдовша
+        wb.save(bio)
     return bio.getvalue() # bytes для StreamingResponse
\ No newline at end of file
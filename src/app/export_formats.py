@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import itertools
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from .transform import ItemSummary
+
+# pyarrow - опційно (без нього format=parquet недоступний); імпортується лише в stream_parquet
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+CSV_CHUNK_ROWS = 5000 # рядків на один шматок відповіді
+PARQUET_ROW_GROUP_ROWS = 65536 # рядків в одній row group (= шматок відповіді)
+
+# колонки таблиці товарів (Items у xlsx, csv, parquet) і їх типи для parquet
+ITEM_COLUMNS = [
+    ("#", "int64"),
+    ("Title", "string"),
+    ("Category", "string"),
+    ("Condition", "string"),
+    ("Price Value", "float64"),
+    ("Price Currency", "string"),
+    ("Shipping Value", "float64"),
+    ("Shipping Currency", "string"),
+    ("Total (Price+Ship)", "float64"),
+    ("Currency", "string"),
+    ("Country", "string"),
+    ("Seller feedback", "float64"),
+    ("Item ID", "string"),
+    ("Web URL", "string"),
+]
+ITEM_HEADERS = [h for h, _ in ITEM_COLUMNS]
+ITEM_TYPES = [t for _, t in ITEM_COLUMNS]
+
+
+def check_export_format(fmt: str) -> None:
+    """ValueError, якщо формат невідомий або для нього не встановлена опційна залежність"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if fmt == "parquet" and not HAS_PYARROW:
+        raise ValueError("format=parquet requires the 'pyarrow' package")
+
+
+def _fmt_float(x: Any) -> Optional[float]:
+    """Безпечне перетворення в float (інакше None)"""
+    if x is None:
+        return None
+    try:
+        return float(x)
+    except Exception:
+        return None
+
+
+def item_rows(items: Sequence[ItemSummary]) -> Iterator[List[Any]]:
+    """Рядки таблиці товарів у порядку ITEM_HEADERS"""
+    for idx, it in enumerate(items or [], start=1):
+        pv = _fmt_float(it.price_value)
+        sv = _fmt_float(it.shipping_value)
+        cur = (it.price_currency or it.shipping_currency or "") or None # валюта
+        total_val = (pv or 0.0) + (sv or 0.0) if (pv is not None or sv is not None) else None # total
+        yield [
+            idx,
+            it.title,
+            it.category,
+            it.condition,
+            pv,
+            it.price_currency,
+            sv,
+            it.shipping_currency,
+            total_val,
+            cur,
+            it.location_country,
+            _fmt_float(it.seller_feedback),
+            it.itemId,
+            it.web_url,
+        ]
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """CSV шматками по CSV_CHUNK_ROWS рядків: пам'ять не залежить від кількості рядків (None -> "")"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    it = iter(rows)
+    while True:
+        chunk = list(itertools.islice(it, CSV_CHUNK_ROWS))
+        writer.writerows(chunk)
+        yield buf.getvalue().encode("utf-8")
+        if len(chunk) < CSV_CHUNK_ROWS:
+            return
+        buf.seek(0)
+        buf.truncate()
+
+
+class _Sink(io.RawIOBase):
+    """Файл лише для запису: ParquetWriter пише сюди, а відповідь забирає накопичені байти"""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts = []
+        return out
+
+
+def stream_parquet(header: Sequence[str], rows: Iterable[Sequence[Any]], types: Optional[Sequence[str]] = None) -> Iterator[bytes]:
+    """
+    Parquet по row group: кожні PARQUET_ROW_GROUP_ROWS рядків записуються і віддаються одразу
+    (footer - в кінці), без workbook чи повної таблиці в пам'яті. types - назви типів Arrow
+    по колонках (за замовчуванням усі string).
+    """
+    import pyarrow as pa # лінивий імпорт (~170 мс на старті процесу)
+    import pyarrow.parquet as pq
+    schema = pa.schema([(h, pa.type_for_alias(t)) for h, t in zip(header, types or ["string"] * len(header))])
+    sink = _Sink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    width = len(header)
+    it = iter(rows)
+    try:
+        while True:
+            chunk = list(itertools.islice(it, PARQUET_ROW_GROUP_ROWS))
+            if not chunk:
+                break
+            chunk = [r if len(r) == width else (list(r) + [None] * width)[:width] for r in chunk]
+            columns = list(zip(*chunk))
+            writer.write_batch(pa.record_batch(
+                [pa.array(col, type=f.type) for col, f in zip(columns, schema)], schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
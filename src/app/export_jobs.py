@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .dataset_service import STATE, iter_export_rows, set_default, set_uploaded_path
+from .export_formats import ITEM_HEADERS, ITEM_TYPES, MEDIA_TYPES, item_rows, stream_csv, stream_parquet
+
+PROGRESS_EVERY_ROWS = 10000 # як часто рядки датасету рахуються в прогрес
+PROGRESS_MIN_INTERVAL = 0.5 # не частіше за це (с) файл прогресу перезаписується
+CLEANUP_INTERVAL = 60.0 # TTL-прибирання не частіше раз на хвилину
+RETRY_AFTER_SECONDS = 5 # підказка клієнту, коли черга повна
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_FINAL = ("done", "error")
+
+
+class QueueFull(Exception):
+    """Забагато незавершених експортів - новий не приймається"""
+
+
+# побудова файлу експорту: спільна для синхронних ендпоінтів і фонових задач
+def dataset_state() -> Dict[str, str]:
+    """Активний датасет у вигляді, який можна передати в інший процес"""
+    return {"mode": STATE.mode, "path": STATE.path, "sha256": STATE.sha256, "display_name": STATE.display_name}
+
+
+def _use_dataset(state: Dict[str, str]) -> None:
+    if state["mode"] == "upload":
+        set_uploaded_path(state["path"], sha256=state["sha256"], display_name=state["display_name"])
+    else:
+        set_default()
+
+
+def _counted(rows: Iterable[Any], on_rows: Optional[Callable[[int], None]]) -> Iterator[Any]:
+    """Рядки без змін + on_rows(скільки вже віддано) кожні PROGRESS_EVERY_ROWS"""
+    if on_rows is None:
+        yield from rows
+        return
+    n = 0
+    for r in rows:
+        yield r
+        n += 1
+        if n % PROGRESS_EVERY_ROWS == 0:
+            on_rows(n)
+    on_rows(n)
+
+
+def build_export(kind: str, fmt: str, params: Dict[str, Any], on_rows: Optional[Callable[[int], None]] = None) -> Iterable[bytes]:
+    """
+    Вміст файлу експорту шматками.
+    kind: search (товари пошуку) | filtered (сторінка таблиці) | report (xlsx-звіт) | dataset (весь датасет).
+    csv/parquet - потоково; xlsx - один шматок після побудови workbook.
+    """
+    if kind == "search":
+        items = params["items"]
+        if fmt == "csv":
+            return stream_csv(ITEM_HEADERS, item_rows(items))
+        if fmt == "parquet":
+            return stream_parquet(ITEM_HEADERS, item_rows(items), ITEM_TYPES)
+        from .excel_export import build_excel # лінивий імпорт (openpyxl)
+        return [build_excel(**params)]
+
+    if kind == "filtered":
+        if fmt != "xlsx":
+            columns = params["columns"]
+            rows = ([r.get(c, "") for c in columns] for r in params["rows"])
+            return (stream_csv if fmt == "csv" else stream_parquet)(columns, rows)
+        from .dataset_excel import build_filtered_excel # лінивий імпорт (openpyxl)
+        return [build_filtered_excel(**params)]
+
+    if kind == "report":
+        from .dataset_excel import build_report_excel # лінивий імпорт (openpyxl)
+        return [build_report_excel(**params)]
+
+    if kind == "dataset":
+        if "dataset" in params: # у процесі пулу - відновити активний датасет батьківського процесу
+            _use_dataset(params["dataset"])
+        columns: List[str] = params["columns"]
+        rows = _counted(iter_export_rows(columns), on_rows)
+        if fmt == "csv":
+            return stream_csv(columns, rows)
+        if fmt == "parquet":
+            return stream_parquet(columns, rows)
+        from .dataset_excel import build_dataset_excel # лінивий імпорт (openpyxl)
+        return [build_dataset_excel(
+            dataset_name=params["dataset_name"], mode_text=params["mode_text"], columns=columns, rows=rows,
+        )]
+
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+# стан задачі - JSON-файл поруч із результатом: його бачать усі uvicorn workers і процеси пулу
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    root = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(prefix=".job-", dir=root)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class _Progress:
+    """Оновлення файлу стану з процесу пулу (не частіше PROGRESS_MIN_INTERVAL)"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.state = _read_json(path) or {}
+        self._last = 0.0
+
+    def update(self, force: bool = True, **fields: Any) -> None:
+        self.state.update(fields, updated=time.time())
+        total, done = self.state.get("rows_total"), self.state.get("rows_done")
+        if self.state.get("status") == "done":
+            self.state["progress"] = 1.0
+        elif total and done is not None:
+            self.state["progress"] = min(1.0, done / total)
+        now = time.monotonic()
+        if force or now - self._last >= PROGRESS_MIN_INTERVAL:
+            self._last = now
+            _write_json(self.path, self.state)
+
+
+def run_job(root: str, job_id: str, kind: str, fmt: str, params: Dict[str, Any]) -> int:
+    """Виконується в процесі пулу: пише файл у <id>.part, після успіху - rename у <id>.<fmt>. Повертає розмір"""
+    progress = _Progress(os.path.join(root, f"{job_id}.json"))
+    progress.update(status="running", stage="building", started=time.time())
+    part = os.path.join(root, f"{job_id}.part")
+    size = 0
+    try:
+        with open(part, "wb") as f:
+            on_rows = lambda n: progress.update(force=False, rows_done=n) # noqa: E731
+            for chunk in build_export(kind, fmt, params, on_rows=on_rows):
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(part, os.path.join(root, f"{job_id}.{fmt}"))
+    except Exception as e:
+        try:
+            os.unlink(part)
+        except OSError:
+            pass
+        progress.update(status="error", stage="error", error=f"{type(e).__name__}: {e}", finished=time.time())
+        raise
+    done = progress.state.get("rows_done")
+    progress.update(status="done", stage="done", size=size, finished=time.time(),
+                    rows_done=progress.state.get("rows_total") if done is None else done)
+    return size
+
+
+class ExportJobs:
+    """
+    Фонові експорти: обмежений пул процесів (openpyxl не конкурує з обробкою запитів за GIL),
+    стан і прогрес у <root>/<id>.json, результат у <root>/<id>.<format>, TTL-прибирання.
+    """
+
+    def __init__(self, root: str, workers: int, queue_max: int, ttl: float) -> None:
+        self.root = root
+        self.workers = workers
+        self.queue_max = queue_max
+        self.ttl = ttl
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, як і workers.get_pool: fork з потоками uvicorn може успадкувати захоплені lock-и
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def submit(self, kind: str, fmt: str, params: Dict[str, Any], filename: str, rows_total: Optional[int] = None) -> Dict[str, Any]:
+        """Створює задачу і ставить у пул; QueueFull, якщо незавершених уже queue_max"""
+        self.cleanup()
+        os.makedirs(self.root, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        state = {
+            "id": job_id,
+            "kind": kind,
+            "format": fmt,
+            "status": "queued",
+            "stage": "queued",
+            "filename": filename,
+            "media_type": MEDIA_TYPES[fmt],
+            "rows_total": rows_total,
+            "rows_done": None,
+            "progress": 0.0,
+            "created": now,
+            "updated": now,
+        }
+        with self._lock:
+            pending = sum(1 for fut in self._futures.values() if not fut.done())
+            if pending >= self.queue_max:
+                raise QueueFull(f"{pending} exports are already queued")
+            if self._pool is None:
+                self._pool = self._new_pool()
+            _write_json(self._status_path(job_id), state)
+            try:
+                fut = self._pool.submit(run_job, self.root, job_id, kind, fmt, params)
+            except BrokenProcessPool: # процес пулу впав (OOM на великому workbook) - новий пул
+                self._pool = self._new_pool()
+                fut = self._pool.submit(run_job, self.root, job_id, kind, fmt, params)
+            self._futures[job_id] = fut
+        fut.add_done_callback(lambda f, job_id=job_id: self._finished(job_id, f))
+        return state
+
+    def _finished(self, job_id: str, fut: Future) -> None:
+        """Процес пулу впав (BrokenProcessPool, pickle) і не записав стан - записуємо помилку тут"""
+        with self._lock:
+            self._futures.pop(job_id, None)
+        exc = None if fut.cancelled() else fut.exception()
+        if exc is None:
+            return
+        state = _read_json(self._status_path(job_id))
+        if state is not None and state.get("status") not in _FINAL:
+            now = time.time()
+            state.update(status="error", stage="error", error=f"{type(exc).__name__}: {exc}", finished=now, updated=now)
+            _write_json(self._status_path(job_id), state)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Стан задачі або None (невідома / прибрана за TTL)"""
+        if not _JOB_ID_RE.match(job_id):
+            return None
+        self.cleanup()
+        return _read_json(self._status_path(job_id))
+
+    def result_path(self, job_id: str) -> Optional[str]:
+        state = self.status(job_id)
+        if state is None or state.get("status") != "done":
+            return None
+        path = os.path.join(self.root, f"{job_id}.{state['format']}")
+        return path if os.path.exists(path) else None
+
+    def cleanup(self, force: bool = False) -> int:
+        """Видаляє задачі, завершені довше ніж ttl тому (і зависші/осиротілі файли), повертає кількість"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_cleanup < CLEANUP_INTERVAL:
+                return 0
+            self._last_cleanup = now
+            live = set(self._futures)
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return 0
+        removed = 0
+        for name in names:
+            job_id, _, ext = name.partition(".")
+            if not _JOB_ID_RE.match(job_id) or job_id in live:
+                continue
+            path = os.path.join(self.root, name)
+            if ext == "json":
+                state = _read_json(path) or {}
+                since = state.get("finished") or state.get("updated") or 0.0
+                expired = now - since > self.ttl
+            else:
+                expired = not os.path.exists(self._status_path(job_id)) and now - _mtime(path) > self.ttl
+            if expired:
+                for other in (f"{job_id}.json", f"{job_id}.part", *(f"{job_id}.{f}" for f in MEDIA_TYPES)):
+                    try:
+                        os.unlink(os.path.join(self.root, other))
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+_JOBS: Optional[ExportJobs] = None
+_JOBS_LOCK = threading.Lock()
+
+
+def get_jobs() -> ExportJobs:
+    """Спільна черга експортів процесу (налаштування - APP_EXPORT_*)"""
+    global _JOBS
+    from .config import get_settings
+    with _JOBS_LOCK:
+        if _JOBS is None:
+            s = get_settings()
+            _JOBS = ExportJobs(s.export_dir, s.export_workers, s.export_queue_max, s.export_ttl)
+        return _JOBS
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# значення, які приймає Browse API у filter=
+CONDITIONS = {"NEW", "USED", "UNSPECIFIED"} # conditions:{...}
+BUYING_OPTIONS = {"FIXED_PRICE", "AUCTION", "BEST_OFFER", "CLASSIFIED_AD"} # buyingOptions:{...}
+
+_country_re = re.compile(r"^[A-Z]{2}$") # ISO 3166 alpha-2
+_currency_re = re.compile(r"^[A-Z]{3}$") # ISO 4217
+_category_re = re.compile(r"^\d+$")
+
+
+def _split_csv(raw: Optional[str]) -> List[str]:
+    """'a, b,,c' -> ['a', 'b', 'c']"""
+    return [p.strip() for p in (raw or "").split(",") if p.strip()]
+
+
+def _fmt_num(x: float) -> str:
+    """10.0 -> '10', 9.5 -> '9.5'"""
+    return f"{x:.2f}".rstrip("0").rstrip(".")
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """
+    Фільтри пошуку, які виконує сам eBay (filter= / category_ids),
+    замість того щоб тягнути широкі сторінки і відкидати товари у нас.
+    """
+    price_min: Optional[float] = None # мінімальна ціна
+    price_max: Optional[float] = None # максимальна ціна
+    currency: str = "" # валюта для price (обов'язкова для eBay, якщо є price)
+    conditions: Tuple[str, ...] = () # NEW / USED / UNSPECIFIED
+    item_location_country: str = "" # країна розташування товару (US, GB...)
+    buying_options: Tuple[str, ...] = () # FIXED_PRICE / AUCTION / BEST_OFFER ...
+    category_ids: Tuple[str, ...] = () # ID категорій eBay
+
+    @classmethod
+    def parse(
+        cls,
+        *,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        currency: Optional[str] = None,
+        condition: Optional[str] = None,
+        item_location_country: Optional[str] = None,
+        buying_options: Optional[str] = None,
+        category_ids: Optional[str] = None,
+        default_currency: str = "USD",
+    ) -> "SearchFilters":
+        """Валідація сирих query-параметрів; ValueError з поясненням, якщо щось не так"""
+        if price_min is not None and price_max is not None and price_min > price_max:
+            raise ValueError("price_min must not be greater than price_max")
+
+        cur = (currency or "").strip().upper()
+        if cur and not _currency_re.match(cur):
+            raise ValueError(f"Invalid currency: {currency!r}")
+        if not cur and (price_min is not None or price_max is not None):
+            cur = default_currency # eBay вимагає priceCurrency разом з price
+
+        conds = tuple(sorted({c.upper() for c in _split_csv(condition)}))
+        bad = [c for c in conds if c not in CONDITIONS]
+        if bad:
+            raise ValueError(f"Invalid condition(s): {', '.join(bad)}. Allowed: {', '.join(sorted(CONDITIONS))}")
+
+        opts = tuple(sorted({o.upper() for o in _split_csv(buying_options)}))
+        bad = [o for o in opts if o not in BUYING_OPTIONS]
+        if bad:
+            raise ValueError(f"Invalid buying option(s): {', '.join(bad)}. Allowed: {', '.join(sorted(BUYING_OPTIONS))}")
+
+        country = (item_location_country or "").strip().upper()
+        if country and not _country_re.match(country):
+            raise ValueError(f"Invalid item_location_country: {item_location_country!r}")
+
+        cats = tuple(dict.fromkeys(_split_csv(category_ids)))
+        bad = [c for c in cats if not _category_re.match(c)]
+        if bad:
+            raise ValueError(f"Invalid category id(s): {', '.join(bad)}")
+
+        return cls(
+            price_min=price_min,
+            price_max=price_max,
+            currency=cur,
+            conditions=conds,
+            item_location_country=country,
+            buying_options=opts,
+            category_ids=cats,
+        )
+
+    def filter_expr(self) -> Optional[str]:
+        """Компіляція у eBay filter= (None, якщо фільтрів немає)"""
+        parts: List[str] = []
+        if self.price_min is not None or self.price_max is not None:
+            lo = _fmt_num(self.price_min) if self.price_min is not None else ""
+            hi = _fmt_num(self.price_max) if self.price_max is not None else ""
+            parts.append(f"price:[{lo}..{hi}]" if hi else f"price:[{lo}]")
+            parts.append(f"priceCurrency:{self.currency}")
+        if self.conditions:
+            parts.append("conditions:{" + "|".join(self.conditions) + "}")
+        if self.item_location_country:
+            parts.append(f"itemLocationCountry:{self.item_location_country}")
+        if self.buying_options:
+            parts.append("buyingOptions:{" + "|".join(self.buying_options) + "}")
+        return ",".join(parts) or None
+
+    def category_param(self) -> Optional[str]:
+        """category_ids= для eBay (None, якщо не задано)"""
+        return ",".join(self.category_ids) or None
+
+    def cache_key(self) -> Tuple[str, str]:
+        """Частина ключа кешу: скомпільовані filter + category_ids"""
+        return (self.filter_expr() or "", self.category_param() or "")
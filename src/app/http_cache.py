@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# браузер може зберегти відповідь, але перед використанням перепитує сервер (If-None-Match)
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Сильний ETag з частин ключа (версія датасету, параметри...)"""
+    h = hashlib.blake2b(digest_size=12)
+    for p in parts:
+        h.update(repr(p).encode("utf-8", "replace"))
+        h.update(b"\x1f")
+    return f'"{h.hexdigest()}"'
+
+
+def body_etag(body: bytes) -> str:
+    """ETag з вмісту відповіді"""
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Optional[Request], etag: str) -> bool:
+    """Чи збігається If-None-Match запиту з etag (W/ ігнорується, як дозволяє RFC 9110)"""
+    if request is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """304 без тіла"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
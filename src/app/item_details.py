@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from .cache import TTLCache
+from .ebay_client import EbayAPIError, EbayClient, MAX_ITEMS_PER_LOOKUP
+from .transform import normalize_item_details
+
+DETAIL_CACHE_TTL = 15 * 60 # деталі товару живуть у кеші 15 хв
+DETAIL_CACHE_MAXSIZE = 5000 # максимум товарів у кеші
+MAX_BATCH_IDS = 200 # максимум id в одному batch-запиті
+DEFAULT_CONCURRENCY = 8 # скільки одночасних запитів до eBay
+ITEM_DETAIL_FIELDS = ("itemId", "shortDescription", "description", "aspects") # поля normalize_item_details
+
+DETAIL_CACHE = TTLCache(maxsize=DETAIL_CACHE_MAXSIZE, ttl=DETAIL_CACHE_TTL, name="item_details")
+
+
+def get_item_details(client: EbayClient, item_id: str) -> Dict[str, Any]:
+    """Деталі одного товару (з кешу або через get_item)"""
+    cached = DETAIL_CACHE.get(item_id)
+    if cached is not None:
+        return cached
+    details = normalize_item_details(client.get_item(item_id=item_id))
+    DETAIL_CACHE.set(item_id, details)
+    return details
+
+
+def _fetch_chunk(client: EbayClient, chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Один запит getItems на до MAX_ITEMS_PER_LOOKUP id -> {itemId: details}"""
+    payload = client.get_items(item_ids=chunk)
+    out: Dict[str, Dict[str, Any]] = {}
+    for raw in payload.get("items") or []:
+        if not isinstance(raw, dict):
+            continue
+        details = normalize_item_details(raw)
+        if details.get("itemId"):
+            out[details["itemId"]] = details
+    return out
+
+
+def _fetch_one(client: EbayClient, item_id: str) -> Tuple[str, Dict[str, Any] | None, str | None]:
+    """Fallback: один get_item -> (id, details, error)"""
+    try:
+        return item_id, normalize_item_details(client.get_item(item_id=item_id)), None
+    except EbayAPIError as e:
+        return item_id, None, str(e)
+
+
+def fetch_item_details(
+    client: EbayClient,
+    item_ids: List[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Деталі багатьох товарів:
+      1) беремо все, що є в кеші
+      2) решту - пачками по MAX_ITEMS_PER_LOOKUP через getItems, паралельно
+      3) пачки, які впали, добираємо поштучно через get_item (теж паралельно)
+    """
+    ids = list(dict.fromkeys(i for i in item_ids if i)) # без дублів, порядок зберігається
+
+    details: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    missing: List[str] = []
+    for item_id in ids:
+        cached = DETAIL_CACHE.get(item_id)
+        if cached is not None:
+            details[item_id] = cached
+        else:
+            missing.append(item_id)
+
+    cached_count = len(details)
+
+    if missing:
+        chunks = [missing[i:i + MAX_ITEMS_PER_LOOKUP] for i in range(0, len(missing), MAX_ITEMS_PER_LOOKUP)]
+        workers = max(1, min(concurrency, len(missing)))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # пачки getItems
+            fallback: List[str] = []
+            futures = [(chunk, pool.submit(_fetch_chunk, client, chunk)) for chunk in chunks]
+            for chunk, fut in futures:
+                try:
+                    got = fut.result()
+                except EbayAPIError:
+                    fallback.extend(chunk) # getItems недоступний/впав - поштучно
+                    continue
+                for item_id in chunk:
+                    if item_id in got:
+                        details[item_id] = got[item_id]
+                        DETAIL_CACHE.set(item_id, got[item_id])
+                    else:
+                        errors[item_id] = "Item was not returned by getItems"
+
+            # поштучний fallback
+            for item_id, d, err in pool.map(lambda i: _fetch_one(client, i), fallback):
+                if d is not None:
+                    details[item_id] = d
+                    DETAIL_CACHE.set(item_id, d)
+                else:
+                    errors[item_id] = err or "Unknown error"
+
+    return {
+        "items": [details[i] for i in ids if i in details], # у порядку запиту
+        "errors": errors, # itemId -> текст помилки
+        "requested": len(ids),
+        "cached": cached_count, # скільки взято з кешу
+        "fetched": len(details) - cached_count, # скільки отримано з eBay
+    }
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from .cache import TTLCache
+from .http_cache import REVALIDATE, body_etag, etag_matches, not_modified
+
+try: # orjson - швидкий серіалізатор (опційно, є fallback на stdlib json)
+    import orjson
+except ImportError: # pragma: no cover
+    orjson = None # type: ignore[assignment]
+
+ENCODED_CACHE_TTL = 60 # готові JSON-байти живуть у кеші 60 с (за замовчуванням)
+ENCODED_CACHE_MAX_BYTES = 64 * 1024 * 1024 # сумарно байтів відповідей (колонки/preview великих датасетів - мегабайти)
+ENCODED_CACHE = TTLCache(
+    maxsize=512,
+    ttl=ENCODED_CACHE_TTL,
+    name="encoded_json",
+    maxbytes=ENCODED_CACHE_MAX_BYTES,
+    sizeof=lambda entry: len(entry[0]), # (body, etag)
+)
+
+
+def _default(obj: Any) -> Any:
+    """Типи, які серіалізатор не знає сам (ItemSummary, set...)"""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Об'єкт -> компактні JSON-байти (orjson, якщо доступний); bytes - вже готовий JSON"""
+    if isinstance(content, bytes):
+        return content
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse через orjson (або компактний stdlib json)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def cached_json_response(
+    key: Hashable,
+    build: Callable[[], Any],
+    ttl: Optional[float] = None,
+    request: Optional[Request] = None,
+    etag: Optional[str] = None,
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Відповідь з кешу готових JSON-байтів: на hit не кодуємо нічого взагалі.
+    build() викликається тільки на miss.
+    etag - відомий наперед ETag (напр. з версії датасету): при збігу з If-None-Match
+    одразу 304, без кешу і без build(). Без etag - ETag рахується з вмісту і кешується разом з байтами.
+    build() може повернути вже готові bytes (напр. бінарну колонку) - тоді потрібен свій media_type.
+    """
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+
+    entry = ENCODED_CACHE.get(key)
+    if entry is None:
+        body = dumps(build())
+        entry = (body, etag or body_etag(body))
+        ENCODED_CACHE.set(key, entry, ttl=ttl)
+    body, tag = entry
+
+    if etag_matches(request, tag):
+        return not_modified(tag)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": tag, "Cache-Control": REVALIDATE},
+    )
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import server_timing
+
+# межі бакетів гістограм (секунди) - від кешованих відповідей до повільних eBay/Excel
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8" # Prometheus text exposition format
+
+LabelKey = Tuple[str, ...]
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Лічильник, що тільки зростає"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Значення, яке рахується в момент scrape (callback) або задається явно"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelKey, float]]] = None,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelKey, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        if self._collect is not None:
+            values.update(self._collect())
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """
+    Гістограма тривалостей: кумулятивні бакети + sum + count.
+    timing_prefix - якщо задано, кожне спостереження потрапляє ще й у Server-Timing запиту
+    (назва етапу: prefix + значення labels).
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        timing_prefix: Optional[str] = None,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.timing_prefix = timing_prefix
+        self._series: Dict[LabelKey, List[float]] = {} # key -> [count_b0..count_bn, count_inf, sum]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        if self.timing_prefix is not None:
+            server_timing.record(self.timing_prefix + "-".join(key), value)
+        idx = bisect.bisect_left(self.buckets, value) # перший бакет з le >= value
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        out: List[str] = []
+        for key, series in items:
+            acc = 0.0
+            for le, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                acc += n
+                le_label = 'le="' + _fmt_value(le) + '"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le_label)} {_fmt_value(acc)}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(series[-1])}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {_fmt_value(acc)}")
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing # повторний імпорт модуля - та сама метрика
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labels)) # type: ignore[return-value]
+
+
+def gauge(name: str, help: str, labels: Sequence[str] = (), collect: Optional[Callable[[], Dict[LabelKey, float]]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labels, collect)) # type: ignore[return-value]
+
+
+def histogram(
+    name: str,
+    help: str,
+    labels: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+    timing_prefix: Optional[str] = None,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labels, buckets, timing_prefix)) # type: ignore[return-value]
+
+
+# --- метрики застосунку (модулі імпортують і викликають ці об'єкти напряму) ---
+
+HTTP_REQUESTS = counter("http_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+HTTP_LATENCY = histogram("http_request_duration_seconds", "HTTP request latency by route", ("route", "method"))
+
+UPSTREAM_REQUESTS = counter("ebay_upstream_requests_total", "eBay API calls by operation and HTTP status", ("what", "status"))
+UPSTREAM_LATENCY = histogram(
+    "ebay_upstream_duration_seconds",
+    "eBay API call latency (one attempt)",
+    ("what",),
+    timing_prefix="ebay-",
+)
+TOKEN_REFRESHES = counter("ebay_token_refreshes_total", "OAuth tokens requested from eBay")
+
+STAGE_DURATION = histogram(
+    "app_stage_duration_seconds",
+    "Duration of CPU-heavy stages (normalize, analytics, excel)",
+    ("stage",),
+    timing_prefix="",
+)
+
+DATASET_ROWS = counter("dataset_rows_scanned_total", "CSV rows read by dataset scans", ("op",))
+DATASET_SCAN_SECONDS = counter("dataset_scan_seconds_total", "Time spent in dataset scans", ("op",))
+DATASET_ROWS_PER_SEC = gauge("dataset_scan_rows_per_second", "Throughput of the last dataset scan", ("op",))
+
+_CACHES: List[object] = [] # TTLCache-и, які реєструються самі при створенні
+
+
+def register_cache(cache: object) -> None:
+    _CACHES.append(cache)
+
+
+def _cache_stat(field: str) -> Callable[[], Dict[LabelKey, float]]:
+    def collect() -> Dict[LabelKey, float]:
+        return {(c.name,): float(c.stats()[field]) for c in _CACHES} # type: ignore[attr-defined]
+    return collect
+
+
+gauge("cache_hits", "Cache hits since start", ("cache",), collect=_cache_stat("hits"))
+gauge("cache_misses", "Cache misses since start", ("cache",), collect=_cache_stat("misses"))
+gauge("cache_hit_ratio", "Cache hit ratio since start", ("cache",), collect=_cache_stat("hit_ratio"))
+gauge("cache_entries", "Entries currently in cache", ("cache",), collect=_cache_stat("size"))
+gauge("cache_bytes", "Bytes held by caches with a size bound (0 - not tracked)", ("cache",), collect=_cache_stat("bytes"))
+
+
+def stage(name: str):
+    """with stage("normalize"): ... - тривалість етапу в app_stage_duration_seconds"""
+    return STAGE_DURATION.time(stage=name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Декоратор: кожен виклик функції - спостереження етапу name"""
+    def deco(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGE_DURATION.observe(time.perf_counter() - t0, stage=name)
+        return wrapper # type: ignore[return-value]
+    return deco
+
+
+def record_scan(op: str, rows: int, seconds: float) -> None:
+    """Результат одного проходу по CSV: рядки, час і швидкість (рядків/с)"""
+    server_timing.record("scan-" + op, seconds)
+    DATASET_ROWS.inc(rows, op=op)
+    DATASET_SCAN_SECONDS.inc(seconds, op=op)
+    if seconds > 0:
+        DATASET_ROWS_PER_SEC.set(rows / seconds, op=op)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """
+    Латентність і статуси по шаблону маршруту (/api/item/{item_id}, а не конкретний id),
+    щоб кількість серій не росла з кожним новим url.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None)
+            if path is None:
+                path = "/static" if scope.get("path", "").startswith("/static/") else "unmatched"
+            method = scope.get("method", "")
+            HTTP_LATENCY.observe(time.perf_counter() - t0, route=path, method=method)
+            HTTP_REQUESTS.inc(route=path, method=method, status=str(status))
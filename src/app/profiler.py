@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+from starlette.datastructures import MutableHeaders, QueryParams
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+DEFAULT_INTERVAL = 0.005 # період семплювання, с
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_SAFE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _frame_label(code) -> str:
+    """Назва кадру для folded-формату: файл відносно проєкту + функція"""
+    path = code.co_filename
+    if path.startswith(_PROJECT_ROOT):
+        path = os.path.relpath(path, _PROJECT_ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Семплюючий профайлер: фоновий потік кожні interval секунд знімає стеки всіх потоків
+    (sys._current_frames) і рахує однакові стеки. Беруться тільки стеки, де є код проєкту -
+    так відсікаються пусті воркери threadpool і цикл подій у простої.
+    Результат - folded stacks ("a;b;c N"), які читають flamegraph.pl, speedscope, inferno.
+    На навантаженому інстансі в профіль потрапляють і інші запити - профілюйте локально.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: List[str] = []
+                ours = False
+                f = frame
+                while f is not None:
+                    code = f.f_code
+                    if not ours and code.co_filename.startswith(_PROJECT_ROOT):
+                        ours = True
+                    stack.append(_frame_label(code))
+                    f = f.f_back
+                if ours:
+                    self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def folded(self) -> str:
+        """Folded stacks: один рядок на унікальний стек, "root;...;leaf count" """
+        return "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+
+
+def _authorized(scope: Scope, token: str) -> bool:
+    if not token:
+        return False # без APP_ADMIN_TOKEN профілювання вимкнене
+    for name, value in scope.get("headers") or []:
+        if name == b"x-admin-token":
+            return hmac.compare_digest(value.decode("latin-1"), token)
+    return False
+
+
+def _profile_name(scope: Scope) -> str:
+    path = _SAFE_RE.sub("_", scope.get("path", "").strip("/")) or "root"
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{path}_{os.getpid()}.folded"
+
+
+class ProfileMiddleware:
+    """
+    ?profile=1 + заголовок X-Admin-Token: запит виконується під SamplingProfiler,
+    профіль зберігається у APP_PROFILE_DIR, ім'я файлу - у заголовку X-Profile.
+    Без правильного токена - 403; без ?profile - нуль накладних витрат, крім розбору query.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or b"profile=" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+        if QueryParams(scope["query_string"]).get("profile") not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        if not _authorized(scope, settings.admin_token):
+            await JSONResponse({"detail": "Profiling requires a valid X-Admin-Token"}, status_code=403)(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        stopped = False
+
+        def finish() -> str:
+            nonlocal stopped
+            profiler.stop()
+            stopped = True
+            os.makedirs(settings.profile_dir, exist_ok=True)
+            name = _profile_name(scope)
+            with open(os.path.join(settings.profile_dir, name), "w", encoding="utf-8") as f:
+                f.write(profiler.folded())
+            return name
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and not stopped:
+                # тіло вже пораховане (звичайні відповіді) - профіль готовий до заголовків
+                name = finish()
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile"] = name
+                headers["X-Profile-Samples"] = str(profiler.sample_count)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not stopped:
+                finish()
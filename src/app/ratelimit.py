@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+RETRY_STATUSES = {429, 500, 502, 503, 504} # статуси, на які робимо повтор
+
+
+class QueueTimeout(RuntimeError):
+    """Запит не дочекався своєї черги в лімітері"""
+    pass
+
+
+class QuotaExhausted(QueueTimeout):
+    """Вичерпано добову квоту викликів eBay"""
+    pass
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket з адаптивною швидкістю і чесною (FIFO) чергою.
+    - rate: поточна швидкість (запитів/с), зменшується вдвічі на 429,
+      повільно росте назад до max_rate на успішних відповідях (AIMD)
+    - burst: скільки запитів можна зробити підряд без очікування
+    - Retry-After від eBay блокує всю чергу до вказаного часу
+    - daily_quota: добовий ліміт викликів (0 - без обмеження)
+    - rate <= 0 - без обмеження швидкості (квота і Retry-After все одно діють)
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 5,
+        min_rate: float = 0.2,
+        daily_quota: int = 0,
+    ) -> None:
+        self.max_rate = max(float(rate), 0.0)
+        self.unlimited = self.max_rate == 0.0
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.burst = max(1, int(burst))
+        self.daily_quota = int(daily_quota)
+
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0 # monotonic-час, до якого чекаємо (Retry-After)
+
+        self._cond = threading.Condition()
+        self._next_ticket = 0 # наступний номер у черзі
+        self._serving = 0 # номер, чия зараз черга
+        self._abandoned: set[int] = set() # номери, що вийшли з черги по timeout
+
+        self._quota_day = ""
+        self.calls_today = 0
+        self.throttled = 0 # скільки разів отримали 429/5xx
+
+    # черга
+    def _refill(self, now: float) -> None:
+        """Поповнення токенів за час, що минув"""
+        self._tokens = min(float(self.burst), self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def _count_call(self) -> None:
+        """Облік добової квоти (UTC-доба)"""
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        if day != self._quota_day:
+            self._quota_day = day
+            self.calls_today = 0
+        if self.daily_quota and self.calls_today >= self.daily_quota:
+            raise QuotaExhausted(f"Daily eBay call quota exhausted ({self.daily_quota})")
+        self.calls_today += 1
+
+    def acquire(self, timeout: Optional[float] = None) -> None:
+        """Чекає своєї черги і вільного токена; QueueTimeout якщо не встигли"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if ticket == self._serving:
+                        self._refill(now)
+                        wait = max(self._blocked_until - now, 0.0)
+                        if wait <= 0 and (self.unlimited or self._tokens >= 1.0):
+                            self._count_call()
+                            self._tokens -= 1.0
+                            return
+                        if wait <= 0:
+                            wait = (1.0 - self._tokens) / self.rate # час до наступного токена
+                    else:
+                        wait = None # чекаємо, поки черга дійде до нас
+
+                    if deadline is not None:
+                        left = deadline - now
+                        if left <= 0:
+                            raise QueueTimeout("Timed out waiting for eBay rate limiter")
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                if ticket == self._serving:
+                    self._serving += 1 # передаємо чергу наступному
+                else:
+                    self._abandoned.add(ticket) # вийшли з черги раніше (timeout)
+                while self._serving in self._abandoned:
+                    self._abandoned.discard(self._serving)
+                    self._serving += 1
+                self._cond.notify_all()
+
+    # адаптація
+    def on_success(self) -> None:
+        """Успішна відповідь: повільно повертаємо швидкість (additive increase)"""
+        with self._cond:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """429/5xx: зменшуємо швидкість вдвічі і поважаємо Retry-After"""
+        with self._cond:
+            self.throttled += 1
+            if not self.unlimited:
+                self.rate = max(self.min_rate, self.rate / 2.0)
+                self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+    @property
+    def queue_depth(self) -> int:
+        """Скільки викликів зараз чекають у черзі"""
+        return max(self._next_ticket - self._serving, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "queue_depth": self.queue_depth,
+            "throttled": self.throttled,
+            "calls_today": self.calls_today,
+            "daily_quota": self.daily_quota,
+            "blocked_for": round(max(self._blocked_until - time.monotonic(), 0.0), 3),
+        }
+
+
+class RetryPolicy:
+    """Експоненційний backoff з full jitter і підтримкою Retry-After"""
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0) -> None:
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Пауза перед повтором attempt (0, 1, 2...)"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            return min(max(retry_after, backoff), self.max_delay)
+        return backoff
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After у секундах (число або HTTP-дата) -> секунди"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return max((dt - datetime.now(timezone.utc)).total_seconds(), 0.0)
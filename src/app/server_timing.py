@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# етапи поточного запиту: [(назва, секунди)]; None - поза запитом (скрипти, bench)
+_TIMINGS: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("server_timings", default=None)
+
+_TOKEN_RE = re.compile(r"[^a-z0-9_-]+")
+
+
+def record(name: str, seconds: float) -> None:
+    """Додає етап до Server-Timing поточного запиту (дешево, якщо запиту немає)"""
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def begin() -> List[Tuple[str, float]]:
+    """Починає збір етапів для нового запиту (контекст копіюється у threadpool FastAPI)"""
+    timings: List[Tuple[str, float]] = []
+    _TIMINGS.set(timings)
+    return timings
+
+
+def header_value(timings: List[Tuple[str, float]], total: float) -> str:
+    """
+    [(назва, с)] -> "ebay-search;dur=812.4, normalize;dur=3.1, total;dur=830.0"
+    Однакові етапи сумуються (повтори до eBay, кілька пачок getItems), кількість - у desc.
+    """
+    agg: Dict[str, List[float]] = {}
+    for name, sec in timings:
+        key = _TOKEN_RE.sub("-", name.lower()).strip("-") or "stage"
+        slot = agg.setdefault(key, [0.0, 0])
+        slot[0] += sec
+        slot[1] += 1
+    parts = []
+    for key, (sec, n) in agg.items():
+        desc = f';desc="x{n}"' if n > 1 else ""
+        parts.append(f"{key};dur={sec * 1000:.1f}{desc}")
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Додає заголовок Server-Timing з тривалістю етапів до кожної відповіді /api/*"""
+
+    def __init__(self, app: ASGIApp, path_prefix: str = "/api/") -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope.get("path", "").startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        timings = begin()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", header_value(timings, time.perf_counter() - t0))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# поля, зміна яких вважається зміною ціни
+PRICE_FIELDS = ("price_value", "price_currency", "shipping_value", "shipping_currency")
+
+# поля, які входять у повний відбиток товару (крім ціни)
+CONTENT_FIELDS = ("title", "category", "category_id", "condition", "seller_feedback", "location_country")
+
+MAX_SNAPSHOTS = 500 # скільки запитів тримати в пам'яті (LRU)
+
+
+def _digest(values: Iterable[Any]) -> str:
+    """Короткий хеш від набору значень (порядок важливий)"""
+    h = hashlib.blake2b(digest_size=8)
+    for v in values:
+        h.update(repr(v).encode("utf-8", "replace"))
+        h.update(b"\x1f") # роздільник полів
+    return h.hexdigest()
+
+
+def fingerprint(item: Any) -> Tuple[str, str]:
+    """Відбиток товару: (hash ціни, hash решти полів)"""
+    price_fp = _digest(item.get(k) for k in PRICE_FIELDS)
+    content_fp = _digest(item.get(k) for k in CONTENT_FIELDS)
+    return price_fp, content_fp
+
+
+@dataclass
+class Snapshot:
+    version: int # номер знімка для цього запиту
+    taken_at: float # час створення (epoch seconds)
+    prints: Dict[str, Tuple[str, str]] # itemId -> (price_fp, content_fp)
+    prices: Dict[str, Dict[str, Any]] = field(default_factory=dict) # itemId -> поля ціни
+
+
+class SnapshotStore:
+    """
+    Сховище останніх знімків пошуку (в пам'яті).
+    Ключ - параметри запиту, значення - відбитки товарів за itemId.
+    """
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS) -> None:
+        self.max_snapshots = max_snapshots
+        self._data: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def diff_and_store(self, key: str, items: List[Any]) -> Dict[str, Any]:
+        """Порівнює items з останнім знімком, зберігає новий і повертає тільки дельту"""
+        prints: Dict[str, Tuple[str, str]] = {}
+        prices: Dict[str, Dict[str, Any]] = {}
+        by_id: Dict[str, Any] = {}
+        for it in items:
+            item_id = it.get("itemId")
+            if not item_id:
+                continue # без itemId порівнювати нема за чим
+            prints[item_id] = fingerprint(it)
+            prices[item_id] = {k: it.get(k) for k in PRICE_FIELDS}
+            by_id[item_id] = it
+
+        with self._lock:
+            prev = self._data.get(key)
+            version = (prev.version + 1) if prev else 1
+            self._data[key] = Snapshot(version=version, taken_at=time.time(), prints=prints, prices=prices)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_snapshots:
+                self._data.popitem(last=False) # викидаємо найстаріший запит
+
+        if prev is None:
+            # перший знімок: все вважається новим
+            return {
+                "since_version": None,
+                "version": version,
+                "since": None,
+                "added": [by_id[i] for i in prints],
+                "removed": [],
+                "price_changed": [],
+                "changed": [],
+                "unchanged_count": 0,
+            }
+
+        added = [by_id[i] for i in prints if i not in prev.prints]
+        removed = [i for i in prev.prints if i not in prints]
+
+        price_changed: List[Dict[str, Any]] = []
+        changed: List[Any] = []
+        unchanged = 0
+        for item_id, (price_fp, content_fp) in prints.items():
+            old = prev.prints.get(item_id)
+            if old is None:
+                continue
+            if old == (price_fp, content_fp):
+                unchanged += 1
+                continue
+            if old[0] != price_fp:
+                price_changed.append({
+                    "itemId": item_id,
+                    "before": prev.prices.get(item_id) or {},
+                    "after": prices[item_id],
+                })
+            if old[1] != content_fp:
+                changed.append(by_id[item_id]) # змінились інші поля (назва, стан...)
+
+        return {
+            "since_version": prev.version,
+            "version": version,
+            "since": prev.taken_at,
+            "added": added,
+            "removed": removed,
+            "price_changed": price_changed,
+            "changed": changed,
+            "unchanged_count": unchanged,
+        }
+
+    def clear(self, key: Optional[str] = None) -> None:
+        """Очищення одного знімка або всього сховища"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+
+STORE = SnapshotStore() # глобальне сховище знімків
+
+
+def snapshot_key(**params: Any) -> str:
+    """Ключ знімка з параметрів запиту (порядок параметрів не важливий)"""
+    return _digest(f"{k}={params[k]}" for k in sorted(params))
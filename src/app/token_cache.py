@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try: # fcntl є тільки на POSIX; на Windows працюємо без міжпроцесного lock
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None # type: ignore[assignment]
+
+
+class FileTokenCache:
+    """
+    Спільний кеш OAuth токена у файлі для кількох worker-процесів.
+    - lock-файл (flock) робить оновлення single-flight між процесами
+    - запис атомарний (tmp + os.replace), права 0600
+    - токен прив'язаний до key (env + client_id), чужі записи ігноруються
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Ексклюзивний міжпроцесний lock на час перевірки/оновлення токена"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.lock_path, "a+") as lf:
+            if fcntl is not None:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Запис {"access_token", "expires_at"} для key або None"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("key") != key:
+            return None
+        if not data.get("access_token") or not isinstance(data.get("expires_at"), (int, float)):
+            return None
+        return data
+
+    def store(self, key: str, access_token: str, expires_at: float) -> None:
+        """Атомарний запис токена у файл"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".token-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "access_token": access_token, "expires_at": expires_at}, f)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
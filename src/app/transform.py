@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .metrics import timed
 
 def _get(cur: Any, path: List[Any], default=None):
     """Безпечний доступ до вкладених полів dict/list за шляхом (ключі та індекси)"""
@@ -19,7 +22,10 @@ def _get(cur: Any, path: List[Any], default=None):
 
 
 def normalize_item_summary(item: Dict[str, Any]) -> Dict[str, Any]:
-    """Нормалізація одного itemSummary з eBay Browse Search API"""
+    """
+    Нормалізація одного itemSummary з eBay Browse Search API (dict).
+    Еталонна реалізація; гарячий шлях - normalize_item_compact (нижче).
+    """
     price_val = _get(item, ["price", "value"]) # price.value
     price_cur = _get(item, ["price", "currency"]) # price.currency
 
@@ -46,10 +52,182 @@ def normalize_item_summary(item: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def normalize_search_response(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Нормалізація відповіді пошуку: meta + список нормалізованих items"""
+# Декларативна специфікація полів itemSummary:
+#   (назва поля, шлях, [запасні шляхи...]) - запасний шлях береться, якщо основний дав falsy
+ITEM_SUMMARY_FIELDS: Tuple[Tuple[Any, ...], ...] = (
+    ("itemId", ("itemId",)), # ID товару
+    ("title", ("title",)), # назва
+    ("category", ("categories", 0, "categoryName")), # назва категорії
+    ("category_id", ("categories", 0, "categoryId"), ("leafCategoryIds", 0)), # ID категорії (fallback leafCategoryIds)
+    ("condition", ("condition",)), # стан (New/Used...)
+    ("price_value", ("price", "value")), # ціна (value)
+    ("price_currency", ("price", "currency")), # валюта ціни
+    ("shipping_value", ("shippingOptions", 0, "shippingCost", "value")), # доставка (value)
+    ("shipping_currency", ("shippingOptions", 0, "shippingCost", "currency")), # валюта доставки
+    ("seller_feedback", ("seller", "feedbackScore")), # рейтинг продавця
+    ("web_url", ("itemWebUrl",)), # URL у браузері
+    ("item_href", ("itemHref",)), # API href
+    ("location_country", ("itemLocation", "country")), # країна
+)
+
+ITEM_SUMMARY_FIELD_NAMES: Tuple[str, ...] = tuple(f[0] for f in ITEM_SUMMARY_FIELDS)
+
+
+class ItemSummary(NamedTuple):
+    """
+    Компактний нормалізований товар (tuple, без dict на кожен item).
+    Поля - як у normalize_item_summary; у JSON перетворюється тільки на краю (to_dict).
+    """
+    itemId: Any
+    title: Any
+    category: Any
+    category_id: Any
+    condition: Any
+    price_value: Any
+    price_currency: Any
+    shipping_value: Any
+    shipping_currency: Any
+    seller_feedback: Any
+    web_url: Any
+    item_href: Any
+    location_country: Any
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict-подібний доступ за назвою поля"""
+        if key in self._fields:
+            return getattr(self, key)
+        return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """dict для JSON-відповіді"""
+        return dict(zip(self._fields, self))
+
+
+def _compile_extractor(
+    fields: Sequence[Tuple[Any, ...]],
+    build: str,
+    namespace: Dict[str, Any],
+    name: str,
+) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Генерує одну функцію item -> результат зі специфікації полів.
+    Спільні префікси шляхів (price.value / price.currency) читаються один раз,
+    а тип кожного проміжного вузла перевіряється один раз,
+    замість _get по кожному полю з isinstance на кожному кроці.
+    build - шаблон результату: {values} - вирази значень полів через кому,
+            {pairs} - те саме у вигляді 'назва': вираз (для dict).
+    """
+    # trie шляхів: вузол = {крок: вузол}; у "__leaf__" - змінні, що отримують значення вузла
+    trie: Dict[Any, Any] = {}
+    exprs: List[str] = []
+    var_no = 0
+    for spec in fields:
+        alt_vars = []
+        for path in spec[1:]:
+            var = f"p{var_no}"
+            var_no += 1
+            node = trie
+            for step in path:
+                node = node.setdefault(step, {})
+            node.setdefault("__leaf__", []).append(var)
+            alt_vars.append(var)
+        exprs.append(" or ".join(alt_vars)) # запасні шляхи - як `a or b`
+
+    lines = [f"def {name}(item):"]
+    if var_no:
+        lines.append("    " + " = ".join(f"p{i}" for i in range(var_no)) + " = None")
+
+    cur_no = 0
+
+    def emit(node: Dict[Any, Any], src: str, indent: int) -> None:
+        nonlocal cur_no
+        steps = [k for k in node if k != "__leaf__"]
+        keys = [k for k in steps if not isinstance(k, int)]
+        idxs = [k for k in steps if isinstance(k, int)]
+        for kind, group in (("dict", keys), ("list", idxs)):
+            if not group:
+                continue
+            pad = "    " * indent
+            lines.append(f"{pad}if _isinstance({src}, {kind}):")
+            for step in group:
+                child = node[step]
+                leaves = child.get("__leaf__", [])
+                has_children = any(k != "__leaf__" for k in child)
+                if kind == "dict" and not has_children:
+                    # лист без нащадків: відсутній ключ і так дає None
+                    lines.append(f"{pad}    {' = '.join(leaves)} = {src}.get({step!r})")
+                    continue
+                cur_no += 1
+                c = f"c{cur_no}"
+                if kind == "dict":
+                    # відсутній ключ -> None, далі isinstance і так не пройде
+                    lines.append(f"{pad}    {c} = {src}.get({step!r})")
+                    inner = indent + 1
+                else:
+                    lines.append(f"{pad}    if len({src}) > {step}:")
+                    lines.append(f"{pad}        {c} = {src}[{step}]")
+                    inner = indent + 2
+                for var in leaves:
+                    lines.append(f"{'    ' * inner}{var} = {c}")
+                if has_children:
+                    emit(child, c, inner)
+
+    emit(trie, "item", 1)
+    pairs = ", ".join(f"{spec[0]!r}: {expr}" for spec, expr in zip(fields, exprs))
+    lines.append("    return " + build.format(values=", ".join(exprs), pairs=pairs))
+
+    source = "\n".join(lines)
+    ns = dict(namespace, _isinstance=isinstance)
+    exec(source, ns) # компіляція один раз, при імпорті
+    fn = ns[name]
+    fn.__source__ = source # для дебагу
+    return fn
+
+
+_tuple_new = tuple.__new__
+
+# item -> ItemSummary (скомпільовано з ITEM_SUMMARY_FIELDS)
+normalize_item_compact = _compile_extractor(
+    ITEM_SUMMARY_FIELDS,
+    "_new(_cls, ({values},))",
+    {"_new": _tuple_new, "_cls": ItemSummary},
+    "normalize_item_compact",
+)
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    'title,price_value' -> ('title', 'price_value') у порядку ITEM_SUMMARY_FIELDS.
+    None/порожньо - усі поля; ValueError на невідомі назви.
+    """
+    names = {p.strip() for p in (raw or "").split(",") if p.strip()}
+    if not names:
+        return None
+    unknown = sorted(names - set(ITEM_SUMMARY_FIELD_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(ITEM_SUMMARY_FIELD_NAMES)}")
+    return tuple(n for n in ITEM_SUMMARY_FIELD_NAMES if n in names)
+
+
+@lru_cache(maxsize=64)
+def compile_projection(fields: Tuple[str, ...]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """item -> dict тільки з полями fields (нормалізуються лише вони); компілюється один раз на набір"""
+    spec = tuple(f for f in ITEM_SUMMARY_FIELDS if f[0] in fields)
+    return _compile_extractor(spec, "{{{pairs}}}", {}, "normalize_item_projected")
+
+
+@timed("normalize")
+def normalize_search_response(
+    payload: Dict[str, Any],
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, Any]:
+    """
+    Нормалізація відповіді пошуку: meta + список нормалізованих items.
+    Без fields - items як ItemSummary; з fields (parse_fields) - dict тільки з цими полями.
+    """
     items = payload.get("itemSummaries") or []  # список item summary
-    norm = [normalize_item_summary(i) for i in items if isinstance(i, dict)] # тільки dict
+    fn = normalize_item_compact if fields is None else compile_projection(fields)
+    norm = [fn(i) for i in items if isinstance(i, dict)] # тільки dict
 
     return {
         "total": payload.get("total", 0), # total з API
@@ -61,6 +239,14 @@ def normalize_search_response(payload: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def search_response_to_json(norm: Dict[str, Any]) -> Dict[str, Any]:
+    """Нормалізована відповідь -> JSON-сумісний dict (items як dict)"""
+    items = norm.get("items") or []
+    if items and not isinstance(items[0], ItemSummary):
+        return norm # вже dict (проєкція fields)
+    return {**norm, "items": [it.to_dict() for it in items]}
+
+
 def normalize_item_details(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Нормалізація деталей товару з Browse Item API"""
     # основні текстові поля
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try: # fcntl є тільки на POSIX; на Windows - тільки lock у межах процесу
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None # type: ignore[assignment]
+
+ARTIFACT_VERSION = "2" # змінити, якщо змінився формат dataset-відповідей (старі артефакти стануть невалідними)
+TOUCH_INTERVAL = 60.0 # last_used у index.json оновлюється не частіше (с) на sha256 в процесі
+ACTIVE_SECONDS = 3600.0 # використані за останню годину не видаляються за квотою (активні датасети інших workers)
+
+
+class UploadStore:
+    """
+    Content-addressed сховище завантажених датасетів (CSV, CSV.gz/zst, Parquet, Arrow):
+      - файл зберігається як <root>/blobs/<sha256>.bin (формат - за вмістом), однаковий вміст - один файл
+      - index.json: sha256 -> {path, size, names, created, last_used}
+      - готові JSON-відповіді (summary, colstats, ...) лежать у <root>/.artifacts/<sha256>/
+        і переживають повторний upload та рестарт
+      - gc(): видалення за віком (retention) і LRU (last_used - upload і читання) до квоти диска
+    Оновлення індексу - під flock, тож кілька uvicorn workers можуть ділити одну папку.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.lock_path = os.path.join(root, ".index.lock")
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.artifacts_dir = os.path.join(root, ".artifacts")
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {} # sha256 -> коли цей процес востаннє оновив last_used
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blobs_dir, f"{sha256}.bin")
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Ексклюзивний lock (потоки + процеси) на час читання-зміни індексу"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(self.lock_path, "a+") as lf:
+            if fcntl is not None:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self, index: Dict[str, Dict[str, Any]]) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=".index-", dir=self.root)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def add(self, tmp_path: str, sha256: str, size: int, filename: str) -> Tuple[Dict[str, Any], bool]:
+        """
+        Реєструє щойно записаний tmp-файл. Якщо такий вміст уже є - tmp видаляється,
+        повертається існуючий запис і reused=True.
+        """
+        now = time.time()
+        with self.locked():
+            index = self._load()
+            entry = index.get(sha256)
+            # старі записи мають path <sha256>.csv - беремо шлях із запису
+            reused = entry is not None and os.path.exists(entry.get("path") or self.blob_path(sha256))
+            if reused:
+                os.remove(tmp_path)
+            else:
+                path = self.blob_path(sha256)
+                os.makedirs(self.blobs_dir, exist_ok=True)
+                os.replace(tmp_path, path)
+                entry = {"path": path, "size": size, "names": [], "created": now}
+            if filename and filename not in entry["names"]:
+                entry["names"].append(filename)
+            entry["last_used"] = now
+            index[sha256] = entry
+            self._save(index)
+        return entry, reused
+
+    def discard(self, sha256: str) -> None:
+        """Видаляє запис, файл і артефакти (upload відхилено після збереження - не займає квоту до gc)"""
+        with self.locked():
+            index = self._load()
+            entry = index.pop(sha256, None)
+            if entry is not None:
+                self._remove(sha256, entry)
+                self._save(index)
+        self._touched.pop(sha256, None)
+
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(sha256)
+
+    def touch(self, sha256: str) -> None:
+        """Датасет читається: оновлює last_used для LRU (не частіше TOUCH_INTERVAL, помилки диска не критичні)"""
+        now = time.time()
+        if now - self._touched.get(sha256, 0.0) < TOUCH_INTERVAL:
+            return
+        self._touched[sha256] = now
+        try:
+            with self.locked():
+                index = self._load()
+                entry = index.get(sha256)
+                if entry is not None:
+                    entry["last_used"] = now
+                    self._save(index)
+        except OSError:
+            pass
+
+    # артефакти
+    def _artifact_path(self, sha256: str, name: str) -> str:
+        return os.path.join(self.artifacts_dir, sha256, f"v{ARTIFACT_VERSION}-{name}.json")
+
+    def load_artifact(self, sha256: str, name: str) -> Optional[bytes]:
+        try:
+            with open(self._artifact_path(sha256, name), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        self.touch(sha256)
+        return body
+
+    def save_artifact(self, sha256: str, name: str, body: bytes) -> None:
+        """Атомарний запис артефакту; помилки диска не критичні (це лише кеш)"""
+        path = self._artifact_path(sha256, name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".artifact-", dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _artifacts_size(self, sha256: str) -> int:
+        total = 0
+        directory = os.path.join(self.artifacts_dir, sha256)
+        try:
+            for name in os.listdir(directory):
+                try:
+                    total += os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    pass
+        except OSError:
+            pass
+        return total
+
+    def _remove(self, sha256: str, entry: Dict[str, Any]) -> None:
+        try:
+            os.remove(entry.get("path") or self.blob_path(sha256))
+        except OSError:
+            pass
+        shutil.rmtree(os.path.join(self.artifacts_dir, sha256), ignore_errors=True)
+
+    def usage(self) -> int:
+        """Скільки байтів займають файли з індексу разом з артефактами"""
+        return sum(int(e.get("size", 0)) + self._artifacts_size(sha) for sha, e in self._load().items())
+
+    def gc(self, quota_bytes: int, retention_days: float, keep: Iterable[str] = ()) -> List[str]:
+        """
+        Прибирання:
+          1) записи, не використані довше за retention_days (0 - без обмеження за віком)
+          2) далі найдавніші за last_used, поки загальний розмір > quota_bytes (0 - без квоти);
+             використані за останні ACTIVE_SECONDS не видаляються - квота може тимчасово перевищуватись
+        keep - sha256, які не можна видаляти (активний датасет). Повертає видалені sha256.
+        """
+        keep = set(keep)
+        removed: List[str] = []
+        now = time.time()
+        with self.locked():
+            index = self._load()
+            if retention_days > 0:
+                cutoff = now - retention_days * 86400
+                for sha, entry in list(index.items()):
+                    if sha not in keep and entry.get("last_used", 0) < cutoff:
+                        self._remove(sha, entry)
+                        del index[sha]
+                        removed.append(sha)
+            if quota_bytes > 0:
+                sizes = {sha: int(e.get("size", 0)) + self._artifacts_size(sha) for sha, e in index.items()}
+                total = sum(sizes.values())
+                for sha, entry in sorted(index.items(), key=lambda kv: kv[1].get("last_used", 0)):
+                    if total <= quota_bytes:
+                        break
+                    if sha in keep or entry.get("last_used", 0) >= now - ACTIVE_SECONDS:
+                        continue
+                    self._remove(sha, entry)
+                    del index[sha]
+                    total -= sizes[sha]
+                    removed.append(sha)
+            stale = [sha for sha, e in index.items() if not os.path.exists(e.get("path") or self.blob_path(sha))]
+            for sha in stale: # файл видалили вручну - прибираємо запис і артефакти
+                shutil.rmtree(os.path.join(self.artifacts_dir, sha), ignore_errors=True)
+                del index[sha]
+            if removed or stale:
+                self._save(index)
+        return removed
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from .upload_store import UploadStore
+
+try: # python-multipart - тільки для розбору Content-Type / Content-Disposition
+    from multipart.multipart import parse_options_header
+except ImportError: # pragma: no cover
+    parse_options_header = None # type: ignore[assignment]
+
+UPLOAD_DIR = "uploads"
+UPLOAD_FIELD = "file" # ім'я поля форми (FormData.append("file", f))
+MULTIPART_OVERHEAD = 64 * 1024 # запас на заголовки частин і boundary при перевірці Content-Length
+MAX_PART_HEADERS = 16 * 1024 # заголовки однієї частини форми
+
+UPLOADS = UploadStore(UPLOAD_DIR) # content-addressed сховище (uploads/blobs/<sha256>.bin)
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """Результат збереження: шлях, ім'я від клієнта, розмір, sha256 вмісту і чи файл уже був"""
+    path: str
+    filename: str
+    size: int
+    sha256: str
+    reused: bool
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File is larger than the {max_bytes} bytes upload limit")
+
+
+class _MultipartFile:
+    """
+    Потоковий розбір multipart/form-data через bytes.find (C-швидкість, без циклу по байтах).
+    feed(chunk) повертає байти файлу з поля UPLOAD_FIELD, що з'явилися в цьому chunk;
+    решта полів форми пропускається. У буфері тримається лише хвіст < len(boundary) + 4.
+    """
+
+    def __init__(self, boundary: bytes) -> None:
+        self.delim = b"--" + boundary
+        self.sep = b"\r\n" + self.delim # межа перед наступною частиною
+        self.buf = b""
+        self.state = "preamble" # preamble -> after_delim -> headers -> data -> after_delim ... -> end
+        self.in_file = False
+        self.found = False
+        self.filename = ""
+
+    def _on_headers(self, raw: bytes) -> None:
+        disposition = b""
+        for line in raw.split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-disposition":
+                disposition = value.strip()
+        _, options = parse_options_header(disposition)
+        filename = options.get(b"filename")
+        self.in_file = (
+            not self.found
+            and filename is not None
+            and options.get(b"name", b"").decode("utf-8", "replace") == UPLOAD_FIELD
+        )
+        if self.in_file:
+            self.found = True
+            self.filename = filename.decode("utf-8", "replace")
+
+    def feed(self, chunk: bytes) -> bytes:
+        buf = self.buf + chunk if self.buf else chunk
+        out: List[bytes] = []
+        while True:
+            if self.state == "preamble":
+                i = buf.find(self.delim)
+                if i < 0:
+                    buf = buf[-(len(self.delim) - 1):]
+                    break
+                buf = buf[i + len(self.delim):]
+                self.state = "after_delim"
+            elif self.state == "after_delim":
+                if len(buf) < 2:
+                    break
+                if buf[:2] == b"--":
+                    self.state, buf = "end", b""
+                    break
+                if buf[:2] != b"\r\n":
+                    raise ValueError("invalid boundary line")
+                buf = buf[2:]
+                self.state = "headers"
+            elif self.state == "headers":
+                i = buf.find(b"\r\n\r\n")
+                if i < 0:
+                    if len(buf) > MAX_PART_HEADERS:
+                        raise ValueError("part headers are too large")
+                    break
+                self._on_headers(buf[:i])
+                buf = buf[i + 4:]
+                self.state = "data"
+            elif self.state == "data":
+                i = buf.find(self.sep)
+                if i < 0:
+                    keep = len(self.sep) - 1 # межа може бути розрізана між chunk-ами
+                    if len(buf) > keep:
+                        if self.in_file:
+                            out.append(buf[:-keep])
+                        buf = buf[-keep:]
+                    break
+                if self.in_file:
+                    out.append(buf[:i])
+                buf = buf[i + len(self.sep):]
+                self.in_file = False
+                self.state = "after_delim"
+            else: # end - епілог ігнорується
+                buf = b""
+                break
+        self.buf = buf
+        return b"".join(out) if len(out) != 1 else out[0]
+
+    def finalize(self) -> None:
+        if self.state != "end":
+            raise ValueError("unexpected end of multipart body")
+
+
+def _write_chunk(f: BinaryIO, h: "hashlib._Hash", data: bytes) -> None:
+    h.update(data)
+    f.write(data)
+
+
+def _discard(f: Optional[BinaryIO], tmp_path: str) -> None:
+    if f is not None:
+        f.close()
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+
+
+async def receive_upload(request: Request, max_bytes: int) -> StoredUpload:
+    """
+    Потокове збереження multipart-файлу з request.stream():
+      - Content-Length більший за ліміт -> 413 одразу, тіло не читається
+      - кожен chunk хешується (sha256) і пишеться на диск у threadpool - event loop не блокується
+      - понад max_bytes під час читання -> 413, тимчасовий файл видаляється
+      - готовий файл реєструється в UPLOADS за sha256: однаковий вміст зберігається один раз
+    У пам'яті ніколи не більше одного мережевого chunk.
+    """
+    if parse_options_header is None:
+        raise HTTPException(status_code=500, detail="python-multipart is not installed")
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data with a file field")
+
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > max_bytes + MULTIPART_OVERHEAD:
+        raise _too_large(max_bytes)
+
+    part = _MultipartFile(boundary)
+
+    await run_in_threadpool(os.makedirs, UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_DIR, f".incoming-{uuid.uuid4().hex}")
+    f: Optional[BinaryIO] = await run_in_threadpool(open, tmp_path, "wb")
+    h = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            data = part.feed(chunk)
+            if not data:
+                continue
+            size += len(data)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            await run_in_threadpool(_write_chunk, f, h, data)
+        part.finalize()
+
+        if not part.found:
+            raise HTTPException(status_code=400, detail=f"Multipart field '{UPLOAD_FIELD}' with a file is required")
+
+        await run_in_threadpool(f.close)
+        f = None
+        entry, reused = await run_in_threadpool(UPLOADS.add, tmp_path, h.hexdigest(), size, part.filename)
+    except (HTTPException, ClientDisconnect):
+        await run_in_threadpool(_discard, f, tmp_path)
+        raise
+    except Exception as e:
+        await run_in_threadpool(_discard, f, tmp_path)
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}") from e
+
+    return StoredUpload(
+        path=entry["path"],
+        filename=part.filename or "dataset.csv",
+        size=size,
+        sha256=h.hexdigest(),
+        reused=reused,
+    )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import get_settings
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def worker_count() -> int:
+    """Скільки процесів для CPU-важких сканів датасету (APP_DATASET_WORKERS, 0 - за кількістю CPU)"""
+    n = get_settings().dataset_workers
+    return n if n > 0 else (os.cpu_count() or 1)
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Спільний пул процесів (створюється при першому виклику і живе до кінця процесу).
+    None, якщо процес один - тоді рахуємо в поточному потоці без накладних витрат на pickle.
+    spawn замість fork: uvicorn має потоки, а fork з потоками може успадкувати захоплені lock-и.
+    """
+    global _POOL
+    workers = worker_count()
+    if workers <= 1:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+
+class BackgroundBuilds:
+    """
+    Результати, що будуються у фоновому потоці один раз на версію датасету
+    (вибірка, колонкове сховище). Паралельні запити чекають той самий Future,
+    готові результати тримаються для keep останніх версій.
+    """
+
+    def __init__(self, name: str, keep: int = 2) -> None:
+        self.keep = keep
+        self._done: "OrderedDict[str, Any]" = OrderedDict()
+        self._building: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def peek(self, version: str) -> Optional[Any]:
+        """Готовий результат або None (нічого не запускає)"""
+        with self._lock:
+            return self._done.get(version)
+
+    def submit(self, version: str, fn: Callable[..., Any], *args: Any) -> Optional[Future]:
+        """Запускає побудову, якщо її ще немає; None - результат уже готовий"""
+        with self._lock:
+            if version in self._done:
+                return None
+            fut = self._building.get(version)
+            if fut is None:
+                fut = self._executor.submit(self._run, version, fn, *args)
+                self._building[version] = fut
+            return fut
+
+    def get(self, version: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Результат для версії: готовий, або чекаємо (запущену чи нову) побудову"""
+        while True:
+            done = self.peek(version)
+            if done is not None:
+                return done
+            fut = self.submit(version, fn, *args)
+            if fut is not None:
+                return fut.result()
+            # None - побудова щойно завершилась між peek і submit: беремо готовий результат
+
+    def _run(self, version: str, fn: Callable[..., Any], *args: Any) -> Any:
+        try:
+            result = fn(*args)
+            with self._lock:
+                self._done[version] = result
+                self._done.move_to_end(version)
+                while len(self._done) > self.keep:
+                    self._done.popitem(last=False)
+            return result
+        finally:
+            with self._lock:
+                self._building.pop(version, None)
@@ -69,6 +69,12 @@ function renderAnalytics(boxEl, payload) { // рендерить аналіти
   boxEl.style.display = "flex"; // показати блок
 }
 
+const TABLE_FIELDS = [ // поля, які реально використовує таблиця результатів і графіки
+  "itemId", "title", "category", "condition",
+  "price_value", "price_currency", "shipping_value", "shipping_currency",
+  "seller_feedback", "web_url", "location_country",
+];
+
 /* Charts */
 let _priceHistChart = null; // графіка гістограми total
 let _countryChart = null;   // графіка топ-країн
@@ -186,6 +192,7 @@ document.addEventListener("DOMContentLoaded", () => { // старт після 
   const sortEl = document.querySelector("#sort");
 
   const exportBtn = document.querySelector("#exportBtn");
+  const exportFormat = document.querySelector("#exportFormat");
   const analyticsBox = document.querySelector("#analyticsBox");
 
   const table = document.querySelector("#resultsTable");
@@ -215,7 +222,7 @@ document.addEventListener("DOMContentLoaded", () => { // старт після 
     analyticsBox.style.display = "none";
     analyticsBox.innerHTML = "";
     try {
-      const res = await fetch("/api/analytics?" + params.toString(), { cache: "no-store" });
+      const res = await fetch("/api/analytics?" + params.toString(), { cache: "no-cache" });
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
       const data = await res.json();
       renderAnalytics(analyticsBox, data);
@@ -228,7 +235,9 @@ document.addEventListener("DOMContentLoaded", () => { // старт після 
   if (exportBtn) { // кнопка експорту Excel
     exportBtn.addEventListener("click", () => {
       if (!lastParams) return;
-      const url = "/api/export?" + lastParams.toString();
+      const params = new URLSearchParams(lastParams);
+      if (exportFormat) params.set("format", exportFormat.value); // xlsx | csv | parquet
+      const url = "/api/export?" + params.toString();
       window.location.href = url; // завантаження файлу
     });
   }
@@ -258,7 +267,9 @@ document.addEventListener("DOMContentLoaded", () => { // старт після 
     const params = buildParams(); // зібрати params
 
     try {
-      const res = await fetch("/api/search?" + params.toString(), { cache: "no-store" });
+      const searchParams = new URLSearchParams(params); // + проєкція: тільки поля, які показує таблиця/графіки
+      searchParams.set("fields", TABLE_FIELDS.join(","));
+      const res = await fetch("/api/search?" + searchParams.toString(), { cache: "no-cache" });
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
 
       const data = await res.json();
@@ -14,15 +14,41 @@ function fmtNum(x, digits = 2) { // формат числа до N знаків
   return n.toFixed(digits);
 }
 
+function fmtCi(ci, digits = 2) { // " [a; b]" для approx-відповідей, інакше ""
+  if (!ci || ci.length !== 2) return "";
+  return ` [${fmtNum(ci[0], digits)}; ${fmtNum(ci[1], digits)}]`;
+}
+
 let histChart = null; // Chart.js гістограми
 let topChart = null; // Chart.js top-значеня
 
 async function apiGet(url) { // GET -> JSON з вимкненим кешем
-  const res = await fetch(url, { cache: "no-store" });
+  const res = await fetch(url, { cache: "no-cache" });
   if (!res.ok) throw new Error(`HTTP ${res.status}`);
   return await res.json();
 }
 
+async function apiGetColumn(url) { // GET бінарної колонки (format=f64/f32) -> типізований масив тільки з валідних значень
+  const res = await fetch(url, { cache: "no-cache" });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  const buf = await res.arrayBuffer();
+  // заголовок DCOL: magic(4) | length u32 | null_count u32 | itemsize u8 | 3 байти 0; далі значення, потім bitmap
+  const head = new DataView(buf, 0, 16);
+  const n = head.getUint32(4, true);
+  const nulls = head.getUint32(8, true);
+  const itemsize = head.getUint8(12);
+  const values = itemsize === 4 ? new Float32Array(buf, 16, n) : new Float64Array(buf, 16, n);
+  if (!nulls) return values; // без пропусків - без копії
+  const bitsOffset = 16 + Math.ceil((n * itemsize) / 8) * 8;
+  const bits = new Uint8Array(buf, bitsOffset, Math.ceil(n / 8));
+  const out = new Float64Array(n - nulls);
+  let j = 0;
+  for (let i = 0; i < n; i++) {
+    if (bits[i >> 3] & (1 << (i & 7))) out[j++] = values[i];
+  }
+  return out;
+}
+
 async function apiPostBlob(url, payload) { // POST JSON -> Blob (Excel)
   const res = await fetch(url, {
     method: "POST",
@@ -33,6 +59,28 @@ async function apiPostBlob(url, payload) { // POST JSON -> Blob (Excel)
   return await res.blob();
 }
 
+async function runExportJob(url, init, btn) { // фоновий експорт (?job=true): опитування прогресу, потім завантаження файлу
+  const res = await fetch(url + (url.includes("?") ? "&" : "?") + "job=true", init);
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  let job = await res.json();
+  const label = btn ? btn.textContent : "";
+  try {
+    while (job.status !== "done") {
+      if (job.status === "error") throw new Error(job.error || "export job failed");
+      if (btn) {
+        btn.textContent = job.rows_total
+          ? `${label} (${Math.round(job.progress * 100)}%)`
+          : `${label} (${job.rows_done ? job.rows_done.toLocaleString() + " рядків" : job.status})`;
+      }
+      await new Promise((r) => setTimeout(r, 1000));
+      job = await apiGet(job.status_url);
+    }
+  } finally {
+    if (btn) btn.textContent = label;
+  }
+  window.location.href = job.download_url;
+}
+
 function downloadBlob(blob, filename = "export.xlsx") { // завантаження Blob як файл
   const url = URL.createObjectURL(blob);
   const a = document.createElement("a");
@@ -105,11 +153,17 @@ function renderTable(tableEl, headEl, bodyEl, columns, rows) { // рендер 
 }
 
 function buildHistogramBins(values, bins = 12) { // будує біни гістограми (labels + counts)
-  const nums = (values || []).map(Number).filter(v => Number.isFinite(v));
+  const nums = ArrayBuffer.isView(values) // типізований масив з бінарної колонки - вже числа без пропусків
+    ? values
+    : (values || []).map(Number).filter(v => Number.isFinite(v));
   if (!nums.length) return { labels: [], counts: [] };
 
-  const mn = Math.min(...nums);
-  const mx = Math.max(...nums);
+  let mn = Infinity;
+  let mx = -Infinity;
+  for (const v of nums) { // без Math.min(...nums): spread великого масиву впирається в ліміт аргументів
+    if (v < mn) mn = v;
+    if (v > mx) mx = v;
+  }
   if (mn === mx) return { labels: [`${mn}`], counts: [nums.length] }; // всі однакові
 
   const step = (mx - mn) / bins;
@@ -373,33 +427,47 @@ async function updateChartsAndStats() { // оновлює графіки + cards
     return;
   }
 
+  const approx = document.getElementById("approxMode").checked; // відповіді з вибірки (approx=true)
+  const aq = approx ? "&approx=true" : "";
+
   if (numCol) { // якщо є numeric колонка -> stats + histogram
-    const cs = await apiGet(`/api/dataset/colstats?name=${encodeURIComponent(numCol)}`);
+    const cs = await apiGet(`/api/dataset/colstats?name=${encodeURIComponent(numCol)}${aq}`);
     lastColStats = cs;
     const st = cs.stats || {};
+    const ci = cs.approx?.ci || {}; // 95% інтервали (тільки approx)
+    const pre = cs.approx && !cs.approx.exact ? "≈ " : "";
 
     dsMeta.textContent =
-      `Колонка: ${numCol} | parsed: ${cs.parsed_count} | missing: ${cs.missing_count} | unparsable: ${cs.unparsable_count} | parse ratio: ${(cs.parse_ratio * 100).toFixed(1)}%`;
+      `Колонка: ${numCol} | parsed: ${pre}${cs.parsed_count} | missing: ${pre}${cs.missing_count} | unparsable: ${pre}${cs.unparsable_count} | parse ratio: ${(cs.parse_ratio * 100).toFixed(1)}%` +
+      (cs.approx ? ` | вибірка ${cs.approx.sample_rows} з ${cs.approx.total_rows} рядків` : "");
 
     renderCards(dsCards, [ // статистика numeric колонки
       { title: "Колонка", value: numCol },
-      { title: "avg / median", value: `${fmtNum(st.avg)} / ${fmtNum(st.median)}` },
+      { title: "avg / median", value: `${pre}${fmtNum(st.avg)}${fmtCi(ci.avg)} / ${fmtNum(st.median)}${fmtCi(ci.median)}` },
       { title: "min / max", value: `${fmtNum(st.min)} / ${fmtNum(st.max)}` },
-      { title: "std", value: `${fmtNum(st.std)}` },
-      { title: "Q1 / Q3", value: `${fmtNum(st.q1)} / ${fmtNum(st.q3)}` },
-      { title: "IQR", value: `${fmtNum(st.iqr)}` },
-      { title: "Parsed", value: String(cs.parsed_count ?? "—") },
-      { title: "Missing", value: String(cs.missing_count ?? "—") },
-      { title: "Unparsable", value: String(cs.unparsable_count ?? "—") },
+      { title: "std", value: `${pre}${fmtNum(st.std)}` },
+      { title: "Q1 / Q3", value: `${pre}${fmtNum(st.q1)}${fmtCi(ci.q1)} / ${fmtNum(st.q3)}${fmtCi(ci.q3)}` },
+      { title: "IQR", value: `${pre}${fmtNum(st.iqr)}` },
+      { title: "Parsed", value: `${pre}${cs.parsed_count ?? "—"}${fmtCi(ci.parsed_count, 0)}` },
+      { title: "Missing", value: `${pre}${cs.missing_count ?? "—"}${fmtCi(ci.missing_count, 0)}` },
+      { title: "Unparsable", value: `${pre}${cs.unparsable_count ?? "—"}${fmtCi(ci.unparsable_count, 0)}` },
     ]);
 
-    const histValues = await apiGet(`/api/dataset/column?name=${encodeURIComponent(numCol)}&limit=20000`); // значення для гістограми
-    const histData = buildHistogramBins(histValues.values || [], 12);
+    // approx: біни з оцінкою кількості на весь файл (сервер, JSON);
+    // інакше - бінарна колонка float32 і біни в браузері без парсингу рядків
+    let histData;
+    if (approx) {
+      const histValues = await apiGet(`/api/dataset/column?name=${encodeURIComponent(numCol)}&limit=20000${aq}`);
+      histData = { labels: histValues.histogram.labels, counts: histValues.histogram.counts };
+    } else {
+      const values = await apiGetColumn(`/api/dataset/column?name=${encodeURIComponent(numCol)}&limit=20000&format=f32`); // float32 - точності досить для бінів, удвічі менше байтів
+      histData = buildHistogramBins(values, 12);
+    }
     lastHist = histData;
 
     let topData = { labels: [], counts: [] };
     if (catCol) { // якщо ще й categorical - top values
-      const top = await apiGet(`/api/dataset/top?name=${encodeURIComponent(catCol)}&limit=10`);
+      const top = await apiGet(`/api/dataset/top?name=${encodeURIComponent(catCol)}&limit=10${aq}`);
       topData = { labels: top.labels || [], counts: top.counts || [] };
       lastTop = topData;
     }
@@ -409,7 +477,7 @@ async function updateChartsAndStats() { // оновлює графіки + cards
   }
 
   if (catCol) { // якщо тільки categorical (без numeric) - тільки top графік
-    const top = await apiGet(`/api/dataset/top?name=${encodeURIComponent(catCol)}&limit=10`);
+    const top = await apiGet(`/api/dataset/top?name=${encodeURIComponent(catCol)}&limit=10${aq}`);
     const topData = { labels: top.labels || [], counts: top.counts || [] };
     lastTop = topData;
 
@@ -462,8 +530,14 @@ async function exportFiltered() { // експорт таблиці (поточн
         : fs.filter_text,
   };
 
-  const blob = await apiPostBlob("/api/dataset/export_filtered", payload);
-  downloadBlob(blob, "dataset_filtered.xlsx");
+  const format = document.getElementById("exportFormat").value; // xlsx | csv | parquet
+  const blob = await apiPostBlob(`/api/dataset/export_filtered?format=${format}`, payload);
+  downloadBlob(blob, `dataset_filtered.${format}`);
+}
+
+async function exportDataset() { // весь датасет фоновою задачею на сервері, без фільтра сторінки
+  const format = document.getElementById("exportFormat").value;
+  await runExportJob(`/api/dataset/export?format=${format}`, {}, document.getElementById("exportDatasetBtn"));
 }
 
 async function exportReport() { // експорт звіту (таблиця + stats + графіки) в Excel
@@ -488,8 +562,11 @@ async function exportReport() { // експорт звіту (таблиця + s
     top_counts: (lastTop && lastTop.counts) ? lastTop.counts : [],
   };
 
-  const blob = await apiPostBlob("/api/dataset/export_report", payload);
-  downloadBlob(blob, "dataset_report.xlsx");
+  await runExportJob("/api/dataset/export_report", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  }, document.getElementById("exportReportBtn"));
 }
 
 document.addEventListener("DOMContentLoaded", () => { // ініціалізація після завантаження DOM
@@ -508,11 +585,13 @@ document.addEventListener("DOMContentLoaded", () => { // ініціалізац
 
   const exportFilteredBtn = document.getElementById("exportFilteredBtn");
   const exportReportBtn = document.getElementById("exportReportBtn");
+  const exportDatasetBtn = document.getElementById("exportDatasetBtn");
 
   reloadBtn.addEventListener("click", refreshAll); // ручне оновлення
 
   numCol.addEventListener("change", updateChartsAndStats); // оновити stats при зміні numeric
   catCol.addEventListener("change", updateChartsAndStats); // оновити top при зміні categorical
+  document.getElementById("approxMode").addEventListener("change", updateChartsAndStats); // exact <-> approx
 
   filterCol.addEventListener("change", onFilterColumnChange); // перемикнути режим фільтра
 
@@ -571,6 +650,11 @@ document.addEventListener("DOMContentLoaded", () => { // ініціалізац
     try { await exportFiltered(); } catch (e) { console.error(e); alert("Export failed. See console."); }
   });
 
+  // export dataset
+  exportDatasetBtn.addEventListener("click", async () => {
+    try { await exportDataset(); } catch (e) { console.error(e); alert("Export failed. See console."); }
+  });
+
   // export report
   exportReportBtn.addEventListener("click", async () => {
     try {
@@ -595,7 +679,8 @@ document.addEventListener("DOMContentLoaded", () => { // ініціалізац
 
     const res = await fetch("/api/dataset/upload", { method: "POST", body: fd });
     if (!res.ok) {
-      alert("Upload error: HTTP " + res.status);
+      const err = await res.json().catch(() => ({}));
+      alert("Upload error: HTTP " + res.status + (err.detail ? " - " + err.detail : ""));
       return;
     }
 